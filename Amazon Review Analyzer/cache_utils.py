@@ -0,0 +1,466 @@
+"""
+cache_utils.py: Contains the caches used to avoid repeating expensive work, such as downloading the same page twice
+or analyzing the same review again.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+# Create a class to store values persistently on disk
+class DiskCache:
+    """
+    A persistent key-value cache stored in a SQLite database. Every entry can have its own time to live,
+    and when the total size of the stored values exceeds max_bytes, the least recently used entries are
+    evicted. The cache counts hits and misses, and can be shared between threads.
+
+    The total size is tracked in memory instead of being summed on every write. The access time of a read entry
+    is only updated if it is older than access_resolution, and these updates are written in batches, so that
+    most reads do not start write transactions. The database may also be
+    used by other processes (e.g. the workers parsing review pages); if it is locked for longer than the
+    timeout, reads are counted as misses and writes are skipped, as losing a cache entry is always safe.
+
+    Arguments:
+    path (str): the path of the SQLite database file, created if it does not exist.
+    max_bytes (int): the maximum total size of the stored values in bytes.
+    timeout (float): the number of seconds to wait for a lock held by another connection.
+    access_resolution (float): the number of seconds within which the access times of entries are not updated.
+    """
+
+    # The number of read entries whose access time is kept in memory before it is written to the database
+    ACCESS_FLUSH_ENTRIES = 256
+    # The number of keys looked up with one query, below the default limit of SQLite query parameters
+    QUERY_BATCH_SIZE = 500
+
+    def __init__(self, path: str, max_bytes: int, timeout: float = 5.0, access_resolution: float = 60.0) -> None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.access_resolution = access_resolution
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._accessed: Dict[str, float] = {}
+        self._connection = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        with self._connection:
+            # Write-ahead logging lets other processes read while an entry is being written
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL, last_access REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+        self._size = self._query_size()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Returns the value stored for the given key, or None if there is no entry or it has expired.
+
+        Arguments:
+        key (str): the key of the entry.
+
+        Returns:
+        bytes or None: the stored value.
+        """
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """
+        Returns the values stored for the given keys, looking them up with one query per QUERY_BATCH_SIZE keys.
+        Keys without an entry or whose entry has expired are left out of the result.
+
+        Arguments:
+        keys (Iterable[str]): the keys of the entries.
+
+        Returns:
+        Dict[str, bytes]: the stored values, by key.
+        """
+        keys = list(dict.fromkeys(keys))
+        now = time.time()
+        values: Dict[str, bytes] = {}
+        expired: List[str] = []
+
+        with self._lock:
+            try:
+                for start in range(0, len(keys), self.QUERY_BATCH_SIZE):
+                    batch = keys[start : start + self.QUERY_BATCH_SIZE]
+                    rows = self._connection.execute(
+                        f"SELECT key, value, expires_at, last_access FROM entries "
+                        f"WHERE key IN ({', '.join('?' * len(batch))})",
+                        batch,
+                    ).fetchall()
+                    for key, value, expires_at, last_access in rows:
+                        if expires_at is not None and expires_at <= now:
+                            expired.append(key)
+                            continue
+                        values[key] = bytes(value)
+                        if last_access < now - self.access_resolution:
+                            self._accessed[key] = now
+            except sqlite3.OperationalError:
+                # The database is locked by another process: answer from what was read so far
+                pass
+
+            self.hits += len(values)
+            self.misses += len(keys) - len(values)
+
+            if expired or len(self._accessed) >= self.ACCESS_FLUSH_ENTRIES:
+                self._write(lambda: self._delete_keys(expired))
+        return values
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """
+        Stores a value for the given key, replacing any previous entry, and evicts the least recently
+        used entries if the cache has become too large. Values larger than the whole cache are not stored.
+
+        Arguments:
+        key (str): the key of the entry.
+        value (bytes): the value to store.
+        ttl (float): the number of seconds the entry stays valid, or None if it never expires.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, items: Dict[str, bytes], ttl: Optional[float] = None) -> None:
+        """
+        Stores the given values in a single transaction, replacing any previous entries, and evicts the least
+        recently used entries if the cache has become too large. Values larger than the whole cache are not stored.
+
+        Arguments:
+        items (Dict[str, bytes]): the values to store, by key.
+        ttl (float): the number of seconds the entries stay valid, or None if they never expire.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        items = {key: value for key, value in items.items() if len(value) <= self.max_bytes}
+        if not items:
+            return
+
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+
+        def insert() -> None:
+            # Replaced entries no longer count towards the total size
+            self._delete_keys(list(items))
+            self._connection.executemany(
+                "INSERT INTO entries (key, value, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                [(key, sqlite3.Binary(value), len(value), expires_at, now) for key, value in items.items()],
+            )
+            self._size += sum(len(value) for value in items.values())
+            if self._size > self.max_bytes:
+                self._evict()
+
+        with self._lock:
+            self._write(insert)
+
+    def delete(self, key: str) -> None:
+        """
+        Removes the entry stored for the given key, if any.
+
+        Arguments:
+        key (str): the key of the entry.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        with self._lock:
+            self._write(lambda: self._delete_keys([key]))
+
+    def clear(self) -> None:
+        """
+        Removes all entries and resets the hit and miss counters.
+
+        Arguments:
+        None: this function does not take any arguments.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM entries")
+            self._accessed.clear()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the hit and miss counters together with the number and total size of the stored entries.
+
+        Arguments:
+        None: this function does not take any arguments.
+
+        Returns:
+        Dict[str, int]: a dictionary with the keys 'hits', 'misses', 'entries' and 'size'.
+        """
+        with self._lock:
+            entries, size = self._connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            return {"hits": self.hits, "misses": self.misses, "entries": entries, "size": size}
+
+    def close(self) -> None:
+        """
+        Writes the pending access times and closes the underlying database connection.
+
+        Arguments:
+        None: this function does not take any arguments.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        with self._lock:
+            self._write(lambda: None)
+            self._connection.close()
+
+    def _write(self, operation: Callable[[], None]) -> None:
+        # Run the operation and write the pending access times in one transaction. If another process holds the
+        # lock for too long, the write is skipped and the tracked size is restored, as the transaction was rolled back
+        size = self._size
+        try:
+            with self._connection:
+                if self._accessed:
+                    self._connection.executemany(
+                        "UPDATE entries SET last_access = ? WHERE key = ?",
+                        [(last_access, key) for key, last_access in self._accessed.items()],
+                    )
+                operation()
+        except sqlite3.OperationalError:
+            self._size = size
+        self._accessed.clear()
+
+    def _delete_keys(self, keys: List[str]) -> None:
+        for start in range(0, len(keys), self.QUERY_BATCH_SIZE):
+            batch = keys[start : start + self.QUERY_BATCH_SIZE]
+            placeholders = ", ".join("?" * len(batch))
+            deleted_size = self._connection.execute(
+                f"SELECT COALESCE(SUM(size), 0) FROM entries WHERE key IN ({placeholders})", batch
+            ).fetchone()[0]
+            self._connection.execute(f"DELETE FROM entries WHERE key IN ({placeholders})", batch)
+            self._size -= deleted_size
+
+    def _query_size(self) -> int:
+        return self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _evict(self) -> None:
+        # Delete expired entries first, then the least recently used ones until the cache fits into max_bytes.
+        # Other processes may have written to the database, so the total size is read again before evicting
+        self._connection.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+        self._size = self._query_size()
+        if self._size <= self.max_bytes:
+            return
+
+        evicted_keys = []
+        excess_size = self._size - self.max_bytes
+        for key, size in self._connection.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            evicted_keys.append(key)
+            excess_size -= size
+            if excess_size <= 0:
+                break
+        self._delete_keys(evicted_keys)
+
+
+# Create a class to keep the most recently used values in memory
+class LRUCache:
+    """
+    A thread-safe in-memory key-value cache holding at most max_entries entries. When it is full,
+    the least recently used entry is evicted. The cache counts hits and misses.
+
+    Arguments:
+    max_entries (int): the maximum number of entries.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Returns the value stored for the given key and marks it as the most recently used one.
+
+        Arguments:
+        key (str): the key of the entry.
+
+        Returns:
+        bytes or None: the stored value, or None if there is no entry.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        """
+        Stores a value for the given key, and evicts the least recently used entry if the cache is full.
+
+        Arguments:
+        key (str): the key of the entry.
+        value (bytes): the value to store.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Removes all entries and resets the hit and miss counters.
+
+        Arguments:
+        None: this function does not take any arguments.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the hit and miss counters together with the number of stored entries.
+
+        Arguments:
+        None: this function does not take any arguments.
+
+        Returns:
+        Dict[str, int]: a dictionary with the keys 'hits', 'misses' and 'entries'.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+# Create a class to combine a fast in-memory cache with a persistent cache on disk
+class TieredCache:
+    """
+    A two-level cache: values are looked up in an in-memory LRUCache first and then in a DiskCache.
+    Values found on disk are copied into memory, so repeated lookups do not query the database.
+
+    Arguments:
+    memory (LRUCache): the in-memory tier.
+    disk (DiskCache): the persistent tier, or None to only keep values in memory.
+    """
+
+    def __init__(self, memory: LRUCache, disk: Optional[DiskCache] = None) -> None:
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Returns the value stored for the given key in either tier.
+
+        Arguments:
+        key (str): the key of the entry.
+
+        Returns:
+        bytes or None: the stored value, or None if neither tier has an entry.
+        """
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """
+        Stores a value for the given key in both tiers.
+
+        Arguments:
+        key (str): the key of the entry.
+        value (bytes): the value to store.
+        ttl (float): the number of seconds the entry stays valid on disk, or None if it never expires.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """
+        Returns the values stored for the given keys in either tier. The keys missing from memory are looked
+        up on disk together, with one query per batch instead of one query per key.
+
+        Arguments:
+        keys (Iterable[str]): the keys of the entries.
+
+        Returns:
+        Dict[str, bytes]: the stored values, by key. Keys that neither tier has an entry for are left out.
+        """
+        values: Dict[str, bytes] = {}
+        missing_keys = []
+        for key in dict.fromkeys(keys):
+            value = self.memory.get(key)
+            if value is not None:
+                values[key] = value
+            else:
+                missing_keys.append(key)
+
+        if missing_keys and self.disk is not None:
+            disk_values = self.disk.get_many(missing_keys)
+            for key, value in disk_values.items():
+                self.memory.set(key, value)
+            values.update(disk_values)
+        return values
+
+    def set_many(self, items: Dict[str, bytes], ttl: Optional[float] = None) -> None:
+        """
+        Stores the given values in both tiers, writing them to disk in a single transaction.
+
+        Arguments:
+        items (Dict[str, bytes]): the values to store, by key.
+        ttl (float): the number of seconds the entries stay valid on disk, or None if they never expire.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        for key, value in items.items():
+            self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set_many(items, ttl)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the number of lookups answered by each tier and the overall hit rate.
+
+        Arguments:
+        None: this function does not take any arguments.
+
+        Returns:
+        Dict[str, float]: a dictionary with the keys 'memory_hits', 'disk_hits', 'misses', 'hit_rate',
+                          'memory_entries' and 'disk_entries'.
+        """
+        memory_stats = self.memory.stats()
+        disk_stats = self.disk.stats() if self.disk is not None else {"hits": 0, "misses": 0, "entries": 0}
+        # Every disk lookup follows a memory miss, so the misses of the last tier are the overall misses
+        misses = disk_stats["misses"] if self.disk is not None else memory_stats["misses"]
+        lookups = memory_stats["hits"] + memory_stats["misses"]
+        return {
+            "memory_hits": memory_stats["hits"],
+            "disk_hits": disk_stats["hits"],
+            "misses": misses,
+            "hit_rate": (lookups - misses) / lookups if lookups else 0.0,
+            "memory_entries": memory_stats["entries"],
+            "disk_entries": disk_stats["entries"],
+        }
@@ -3,16 +3,48 @@ chatgpt_integration.py: This script manages the integration with the ChatGPT API
 It includes functions to send requests and process responses from the ChatGPT service for generating summaries and suggestions.
 """
 
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
 import openai
 
+from cache_utils import DiskCache
+from config import (
+    CACHE_DIR,
+    CHATGPT_API_BASE,
+    CHATGPT_CACHE_ENABLED,
+    CHATGPT_CACHE_MATCHING,
+    CHATGPT_CACHE_MAX_BYTES,
+    CHATGPT_CACHE_TTL,
+    CHATGPT_MAX_CONCURRENT_REQUESTS,
+    CHATGPT_MODEL,
+    CHATGPT_SYSTEM_MESSAGE,
+    CHATGPT_TEMPERATURE,
+)
+
+# Initialize the cache of the answers of Chat GPT, created lazily by get_response_cache()
+_response_cache: Optional[DiskCache] = None
+_response_cache_lock = threading.Lock()
+
 
 # Create a function to access the OpenAI API and return the answer from Chat GPT
-def ask_chatgpt(question_to_chatgpt: str) -> str:
+def ask_chatgpt(
+    question_to_chatgpt: str, force_refresh: bool = False, on_delta: Optional[Callable[[str], None]] = None
+) -> str:
     """
-    Accesses the API of Chat GPT and returns the generated content
+    Accesses the API of Chat GPT and returns the generated content, or a message describing the error
+    if the question could not be answered. If on_delta is given, the answer is streamed, and every piece
+    of it is passed to on_delta as soon as it arrives.
 
     Arguments:
     question_to_chatgpt (str): the input question for chat GPT
+    force_refresh (bool): if True, the question is sent again even if its answer is cached.
+    on_delta (Callable[[str], None]): called with every piece of the answer, in the calling thread.
 
     Returns:
     generated_content (str): a string containing the content generated by chat GPT
@@ -20,23 +52,14 @@ def ask_chatgpt(question_to_chatgpt: str) -> str:
 
     # error handling
     try:
-        # Insert the key for Open AI
-        openai.api_key = "xx"
+        if on_delta is None:
+            return request_chatgpt(question_to_chatgpt, force_refresh)
 
-        # Accesses the API of Chat GPT to ask the question_to_chatgpt generated earlier
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an informative assistant."},
-                {"role": "user", "content": question_to_chatgpt},
-            ],
-            temperature=0.7,
-        )
-
-        # Save and return the generated content
-        generated_content = response["choices"][0]["message"]["content"]
-
-        return str(generated_content.strip())
+        generated_parts = []
+        for delta in stream_chatgpt(question_to_chatgpt, force_refresh):
+            generated_parts.append(delta)
+            on_delta(delta)
+        return "".join(generated_parts).strip()
 
     except openai.error.AuthenticationError as e:
         print(f"OpenAI API error: {e}")
@@ -47,3 +70,248 @@ def ask_chatgpt(question_to_chatgpt: str) -> str:
     except Exception as ex:
         print(f"An unexpected error occurred: {ex}")
         return "An unexpected error occurred while processing your request."
+
+
+# Create a function to send a question to Chat GPT, raising the errors of the API
+def request_chatgpt(question_to_chatgpt: str, force_refresh: bool = False) -> str:
+    """
+    Sends a question to Chat GPT and returns the generated content. Answers are kept in the response cache,
+    so that asking the same question again with the same model, system message and temperature returns
+    the cached answer without sending a request. Unlike ask_chatgpt, errors are raised, so that callers
+    combining several answers can tell them apart from answers.
+
+    Arguments:
+    question_to_chatgpt (str): the input question for chat GPT
+    force_refresh (bool): if True, the question is sent again even if its answer is cached.
+
+    Returns:
+    str: the content generated by chat GPT.
+    """
+    cache = get_response_cache()
+    cache_key = get_response_cache_key(CHATGPT_MODEL, CHATGPT_SYSTEM_MESSAGE, question_to_chatgpt, CHATGPT_TEMPERATURE)
+    cached_answer = get_cached_answer(cache, cache_key) if not force_refresh else None
+    if cached_answer is not None:
+        return cached_answer
+
+    response = create_chat_completion(question_to_chatgpt)
+
+    # Save and return the generated content
+    generated_content = str(response["choices"][0]["message"]["content"].strip())
+
+    # Only answers are cached, errors are raised before reaching the cache
+    if cache is not None:
+        cache.set(cache_key, generated_content.encode("utf-8"), ttl=CHATGPT_CACHE_TTL)
+
+    return generated_content
+
+
+# Create a function to send a question to Chat GPT and receive its answer piece by piece
+def stream_chatgpt(question_to_chatgpt: str, force_refresh: bool = False) -> Iterator[str]:
+    """
+    Sends a question to Chat GPT with streaming enabled and yields the pieces of the answer as they are
+    generated, so that the beginning of the answer can be shown long before its end is generated. Cached
+    answers are yielded as a single piece, and complete answers are stored in the response cache. Errors
+    of the API are raised, also after the first pieces.
+
+    Arguments:
+    question_to_chatgpt (str): the input question for chat GPT
+    force_refresh (bool): if True, the question is sent again even if its answer is cached.
+
+    Returns:
+    Iterator[str]: the pieces of the answer.
+    """
+    cache = get_response_cache()
+    cache_key = get_response_cache_key(CHATGPT_MODEL, CHATGPT_SYSTEM_MESSAGE, question_to_chatgpt, CHATGPT_TEMPERATURE)
+    cached_answer = get_cached_answer(cache, cache_key) if not force_refresh else None
+    if cached_answer is not None:
+        yield cached_answer
+        return
+
+    generated_parts = []
+    for chunk in create_chat_completion(question_to_chatgpt, stream=True):
+        # The first chunk only carries the role of the answer, and the last one its finish reason
+        delta = chunk["choices"][0]["delta"].get("content")
+        if delta:
+            generated_parts.append(delta)
+            yield delta
+
+    if cache is not None:
+        cache.set(cache_key, "".join(generated_parts).strip().encode("utf-8"), ttl=CHATGPT_CACHE_TTL)
+
+
+# Create a function to send a question to the chat completions endpoint of the OpenAI API
+def create_chat_completion(question_to_chatgpt: str, stream: bool = False) -> Any:
+    """
+    Sends a question to Chat GPT with the model, system message and temperature of the configuration,
+    to CHATGPT_API_BASE if it is set (e.g. a proxy or a local server compatible with the OpenAI API).
+
+    Arguments:
+    question_to_chatgpt (str): the input question for chat GPT
+    stream (bool): if True, the answer is returned as an iterator of chunks as they are generated.
+
+    Returns:
+    Any: the response of the API, or an iterator of its chunks if stream is True.
+    """
+
+    # Insert the key for Open AI
+    openai.api_key = "xx"
+
+    # Accesses the API of Chat GPT to ask the question_to_chatgpt generated earlier
+    return openai.ChatCompletion.create(
+        model=CHATGPT_MODEL,
+        messages=[
+            {"role": "system", "content": CHATGPT_SYSTEM_MESSAGE},
+            {"role": "user", "content": question_to_chatgpt},
+        ],
+        temperature=CHATGPT_TEMPERATURE,
+        stream=stream,
+        api_base=CHATGPT_API_BASE,
+    )
+
+
+# Create a function to look up an answer in the response cache
+def get_cached_answer(cache: Optional[DiskCache], cache_key: str) -> Optional[str]:
+    """
+    Returns the cached answer for the given key and logs the hit rate of the response cache.
+
+    Arguments:
+    cache (DiskCache or None): the response cache, or None if caching is disabled.
+    cache_key (str): the cache key of the question, as returned by get_response_cache_key.
+
+    Returns:
+    str or None: the cached answer, or None if it is not cached.
+    """
+    if cache is None:
+        return None
+
+    cached_answer = cache.get(cache_key)
+    stats = cache.stats()
+    logging.info(
+        f"ChatGPT response cache {'hit' if cached_answer is not None else 'miss'} "
+        f"(hits {stats['hits']}, misses {stats['misses']}, "
+        f"hit rate {stats['hits'] / (stats['hits'] + stats['misses']):.0%})"
+    )
+    return cached_answer.decode("utf-8") if cached_answer is not None else None
+
+
+# Create a function to get the cache of the answers of Chat GPT
+def get_response_cache() -> Optional[DiskCache]:
+    """
+    Returns the shared response cache, creating it on first use in the CACHE_DIR folder.
+
+    Arguments:
+    None: this function does not take any arguments.
+
+    Returns:
+    DiskCache or None: the response cache, or None if caching is disabled in the configuration.
+    """
+    global _response_cache
+
+    if not CHATGPT_CACHE_ENABLED:
+        return None
+
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = DiskCache(os.path.join(CACHE_DIR, "chatgpt_cache.sqlite3"), CHATGPT_CACHE_MAX_BYTES)
+        return _response_cache
+
+
+# Create a function to build the cache key of an answer of Chat GPT
+def get_response_cache_key(
+    model: str, system_message: str, prompt: str, temperature: float, matching: str = CHATGPT_CACHE_MATCHING
+) -> str:
+    """
+    Builds the cache key of the answer to a question, a hash of everything the answer depends on. With
+    'whitespace' matching, the runs of spaces and line breaks of the messages are replaced by single spaces
+    before hashing, so that questions differing only in their whitespace share their answer. The matching
+    is part of the key, so that both kinds of keys never mix.
+
+    Arguments:
+    model (str): the name of the model answering the question.
+    system_message (str): the system message sent with the question.
+    prompt (str): the question.
+    temperature (float): the sampling temperature of the request.
+    matching (str): 'exact' or 'whitespace', CHATGPT_CACHE_MATCHING by default.
+
+    Returns:
+    str: the cache key.
+    """
+    if matching not in ("exact", "whitespace"):
+        raise ValueError(f"Unknown cache matching: {matching}")
+    if matching == "whitespace":
+        system_message, prompt = " ".join(system_message.split()), " ".join(prompt.split())
+
+    request_hash = hashlib.sha256(json.dumps([model, system_message, prompt, temperature]).encode("utf-8"))
+    return f"{matching}:{request_hash.hexdigest()}"
+
+
+# Create a function to ask Chat GPT several independent questions at the same time
+def ask_chatgpt_concurrently(
+    questions: Dict[str, str],
+    on_answer: Optional[Callable[[str, str], None]] = None,
+    max_workers: int = CHATGPT_MAX_CONCURRENT_REQUESTS,
+    on_delta: Optional[Callable[[str, str], None]] = None,
+) -> Dict[str, str]:
+    """
+    Sends each question to Chat GPT with ask_chatgpt, up to max_workers questions at the same time, so that
+    answering all questions takes about as long as answering the slowest one.
+
+    Arguments:
+    questions (Dict[str, str]): the questions, keyed by a name identifying each of them.
+    on_answer (Callable[[str, str], None]): called with the name of a question and its answer as soon as the
+                                            answer arrives, in the thread that called this function.
+    max_workers (int): the maximum number of questions sent at the same time.
+    on_delta (Callable[[str, str], None]): if given, the answers are streamed, and this is called with the name
+                                           of a question and every piece of its answer as soon as it arrives,
+                                           in the thread asking that question.
+
+    Returns:
+    Dict[str, str]: the answers, keyed by the name of their question.
+    """
+    answers: Dict[str, str] = {}
+    if not questions:
+        return answers
+
+    def ask(name: str, question: str) -> str:
+        if on_delta is None:
+            return ask_chatgpt(question)
+        return ask_chatgpt(question, on_delta=lambda delta: on_delta(name, delta))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(questions)))) as executor:
+        futures = {executor.submit(ask, name, question): name for name, question in questions.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            answers[name] = future.result()
+            if on_answer is not None:
+                on_answer(name, answers[name])
+
+    return answers
+
+
+# Create a function to turn a review into the text attached to the questions for Chat GPT
+def format_review_for_prompt(review: Dict[str, str]) -> str:
+    """
+    Builds the text listing the title, date and text of a review.
+
+    Arguments:
+    review (Dict[str, str]): the review, with the keys 'review_title', 'review_date' and 'review_text'.
+
+    Returns:
+    str: the text of the review.
+    """
+    return f"Title: {review['review_title']}\nDate: {review['review_date']}\nReview: {review['review_text']}\n"
+
+
+# Create a function to turn reviews into the text attached to the questions for Chat GPT
+def format_reviews_for_prompt(reviews: List[Dict[str, str]]) -> str:
+    """
+    Builds the text listing the title, date and text of each review, which is shared by all questions
+    about the reviews.
+
+    Arguments:
+    reviews (List[Dict[str, str]]): the reviews, each with the keys 'review_title', 'review_date' and 'review_text'.
+
+    Returns:
+    str: the text of the reviews.
+    """
+    return "".join(format_review_for_prompt(review) for review in reviews)
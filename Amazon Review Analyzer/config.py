@@ -2,6 +2,7 @@
 config.py: Contains configuration settings and constants used throughout the application.
 """
 
+import os
 import random
 
 # Dictionary mapping search_param options to corresponding categories on the Amazon website
@@ -60,3 +61,154 @@ HEADERS = {
     "sec-fetch-dest": "document",
     "accept-language": "en-GB,en-US;q=0.9,en;q=0.8",
 }
+
+# Maximum number of review pages that are downloaded at the same time
+MAX_CONCURRENT_REQUESTS = 4
+
+# Maximum number of requests per second sent to a single host (0 disables the limit)
+REQUESTS_PER_SECOND_PER_HOST = 2.0
+
+# Number of connections kept alive per host by the shared HTTP session (should be >= MAX_CONCURRENT_REQUESTS)
+HTTP_POOL_SIZE = 10
+
+# Number of retries for requests answered with 429 or 5xx, and the base of the exponential backoff in seconds
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5
+
+# Folder where the persistent caches of the application are stored
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".amazon_review_analyzer")
+
+# Cache downloaded pages on disk, so that pages opened again are not downloaded a second time
+HTTP_CACHE_ENABLED = True
+
+# Maximum total size of the cached pages in bytes, least recently used pages are evicted first
+HTTP_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Number of seconds a cached page stays valid, depending on the kind of page
+HTTP_CACHE_TTLS = {
+    "search": 60 * 60,
+    "product": 24 * 60 * 60,
+    "reviews": 6 * 60 * 60,
+}
+
+# Texts of the pages Amazon sends instead of the requested page, e.g. to ask for a captcha. These pages are never cached
+HTTP_CACHE_BLOCKED_MARKERS = (
+    "/errors/validateCaptcha",
+    "Robot Check",
+    "Enter the characters you see below",
+    "api-services-support@amazon.com",
+)
+
+# Texts found on complete pages of each kind, a page is only cached if it contains one of the texts of its kind
+HTTP_CACHE_CONTENT_MARKERS = {
+    "search": ('data-component-type="s-search-result"', "data-asin="),
+    "product": ('id="productTitle"', 'id="dp"', 'id="dp-container"'),
+    "reviews": ('data-hook="review"', 'id="cm_cr-review_list"'),
+}
+
+# Folder where incremental scrapes store the reviews of each product, to only fetch newer reviews next time
+REVIEW_STORE_DIR = os.path.join(CACHE_DIR, "reviews")
+
+# Maximum number of reviews stored per product, the most recent reviews are kept
+REVIEW_STORE_MAX_REVIEWS = 5000
+
+# Number of seconds after which the stored reviews of a product that was not scraped again are deleted (90 days)
+REVIEW_STORE_MAX_AGE = 90 * 24 * 60 * 60
+
+# Number of worker processes that extract and analyze the downloaded review pages (0 analyzes them in the
+# scraping thread). One core is left free for the user interface.
+PARSE_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+# Scrapes with fewer review pages are analyzed in the scraping thread, where they finish faster than
+# the transfer of the pages to the worker processes
+PARSE_POOL_MIN_PAGES = 4
+
+# Engine of the sentiment analysis: 'textblob' scores each review with its own TextBlob, 'batch' scores all
+# reviews of a page at once with the same lexicon and NumPy, which is faster and gives very close scores
+SENTIMENT_ENGINE = "textblob"
+
+# Keep the sentiment of analyzed review texts, so that unchanged reviews are not analyzed again
+SENTIMENT_CACHE_ENABLED = True
+
+# Number of sentiment results kept in memory, and maximum size in bytes of the sentiment cache on disk
+SENTIMENT_CACHE_MEMORY_ENTRIES = 50000
+SENTIMENT_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Keep the products found on each search page, so that repeating a search or asking for more pages of it does
+# not download and parse the pages found before again
+SEARCH_CACHE_ENABLED = True
+
+# Maximum size in bytes of the search cache on disk, and number of seconds the products of a search page stay valid
+SEARCH_CACHE_MAX_BYTES = 10 * 1024 * 1024
+SEARCH_CACHE_TTL = 60 * 60
+
+# Number of reviews written into the review list at a time, the other reviews are shown while scrolling
+REVIEW_WINDOW_SIZE = 10
+
+# Orders of the review list offered in the GUI: the sorted column (None keeps the scraping order) and
+# whether the highest values come first
+REVIEW_SORT_OPTIONS = {
+    "Scraping order": (None, False),
+    "Stars (highest first)": ("stars", True),
+    "Stars (lowest first)": ("stars", False),
+    "Date (newest first)": ("date", True),
+    "Date (oldest first)": ("date", False),
+    "Polarity (highest first)": ("polarity", True),
+    "Polarity (lowest first)": ("polarity", False),
+}
+
+# Maximum number of requests sent to ChatGPT at the same time, e.g. the summary and the improvement suggestions
+CHATGPT_MAX_CONCURRENT_REQUESTS = 4
+
+# Address of the OpenAI API, or of a compatible server (e.g. a proxy), None for the default address of the
+# openai package
+CHATGPT_API_BASE = None
+
+# Model, system message and temperature of the requests sent to ChatGPT
+CHATGPT_MODEL = "gpt-3.5-turbo"
+CHATGPT_SYSTEM_MESSAGE = "You are an informative assistant."
+CHATGPT_TEMPERATURE = 0.7
+
+# Keep the answers of ChatGPT, so that asking the same question about the same reviews again is answered at once
+CHATGPT_CACHE_ENABLED = True
+
+# Maximum size in bytes of the answer cache on disk, and number of seconds an answer stays valid
+CHATGPT_CACHE_MAX_BYTES = 20 * 1024 * 1024
+CHATGPT_CACHE_TTL = 7 * 24 * 60 * 60
+
+# How questions are matched with cached answers: 'exact' only reuses the answer to the very same question,
+# 'whitespace' also reuses it for questions differing only in their spaces and line breaks
+CHATGPT_CACHE_MATCHING = "exact"
+
+# Maximum number of tokens of the reviews attached to a question for ChatGPT. Longer reviews are split into
+# chunks of this size, which are summarized and combined until the summaries fit into one question.
+CHATGPT_PROMPT_MAX_TOKENS = 3000
+
+# Number of seconds allowed for summarizing the chunks of the reviews. Chunks not summarized in time are left out,
+# so that large sets of reviews do not delay the answers of ChatGPT indefinitely.
+CHATGPT_SUMMARY_TIME_BUDGET = 60
+
+# Only attach representative reviews to the questions for ChatGPT: similar reviews are grouped, and a few reviews
+# of each group are selected within CHATGPT_SELECTION_MAX_TOKENS tokens. A budget above CHATGPT_PROMPT_MAX_TOKENS
+# selects more reviews, which are then summarized in chunks.
+CHATGPT_REVIEW_SELECTION = True
+CHATGPT_SELECTION_MAX_TOKENS = CHATGPT_PROMPT_MAX_TOKENS
+
+# Number of reviews selected from each group of similar reviews
+CHATGPT_REPRESENTATIVES_PER_CLUSTER = 3
+
+# Number of threads running the network and analysis tasks started from the user interface
+TASK_WORKERS = 4
+
+# Number of milliseconds between two checks of the user interface for finished tasks and progress updates
+TASK_POLL_INTERVAL_MS = 50
+
+# Number of search results whose product description is downloaded in the background after a search, so that
+# selecting one of them shows its description at once
+PREFETCH_TOP_RESULTS = 5
+
+# Number of threads downloading product descriptions and review pages ahead of time
+PREFETCH_WORKERS = 2
+
+# Number of prefetched product descriptions kept in memory
+PREFETCH_CACHE_ENTRIES = 200
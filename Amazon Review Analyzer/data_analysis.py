@@ -2,13 +2,46 @@
 data_analysis.py: Provides functionalities for analyzing and visualizing data extracted from Amazon reviews. 
 """
 
-from typing import Any, Dict, List, Tuple
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import namedtuple
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+import textblob
 from textblob import TextBlob
+from textblob.en import sentiment as pattern_sentiment
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 
+from cache_utils import DiskCache, LRUCache, TieredCache
+from config import (
+    CACHE_DIR,
+    SENTIMENT_CACHE_ENABLED,
+    SENTIMENT_CACHE_MAX_BYTES,
+    SENTIMENT_CACHE_MEMORY_ENTRIES,
+    SENTIMENT_ENGINE,
+)
 
+# Result of the batch sentiment analysis, with the same fields as the sentiment returned by TextBlob
+Sentiment = namedtuple("Sentiment", ["polarity", "subjectivity"])
+
+# Splits lowercased text into words, "n't" contractions and punctuation like the TextBlob tokenizer
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?=n't)|n't|[a-z0-9]+(?:[-'][a-z0-9]+)*|[^\sa-z0-9]")
+
+# Words that invert the polarity of the next known word, as in TextBlob
+NEGATIONS = ("no", "not", "n't", "never")
+
+# Words short enough not to break a negation ("not a good product")
+SHORT_WORDS = ("a", "i", "'")
+
+# Initialize the shared sentiment cache, created lazily by get_sentiment_cache() in each process
+_sentiment_cache: Optional[TieredCache] = None
+_sentiment_cache_pid: Optional[int] = None
+_sentiment_cache_lock = threading.Lock()
 
 
 # Create a function to perform sentiment analysis
@@ -26,6 +59,266 @@ def analyze_sentiment_with_textblob(text: str):
     return testimonial.sentiment
 
 
+# Create a class to analyze the sentiment of many texts at once
+class BatchSentimentAnalyzer:
+    """
+    Scores the polarity and subjectivity of many texts at once with the lexicon used by TextBlob. The lexicon is
+    loaded once into NumPy arrays indexed by word, and the rules of TextBlob (intensifiers such as "very",
+    negations and exclamation marks) are applied to all the words of all the texts with array operations.
+    Only tokenization runs per text, which makes the analyzer several times faster than one TextBlob per review.
+
+    The scores closely follow TextBlob but are not always identical: emoticons and phrases of several
+    words are not scored, and a negation is only carried across one short word.
+    """
+
+    # Increase the version whenever a change of the rules changes the scores, to invalidate cached scores
+    version = "1"
+
+    def __init__(self) -> None:
+        self._vocabulary: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, int]:
+        # Build the arrays of the lexicon on first use, the last row stands for all unknown words
+        with self._lock:
+            if self._vocabulary is not None:
+                return self._vocabulary
+
+            words = [word for word in pattern_sentiment.keys() if " " not in word]
+            vocabulary = {word: index for index, word in enumerate(words)}
+            for word in NEGATIONS + SHORT_WORDS + ("!",):
+                vocabulary.setdefault(word, len(vocabulary))
+            size = len(vocabulary) + 1
+
+            self._polarity = np.zeros(size)
+            self._subjectivity = np.zeros(size)
+            self._intensity = np.ones(size)
+            self._known = np.zeros(size, dtype=bool)
+            self._modifier = np.zeros(size, dtype=bool)
+            for word in words:
+                index = vocabulary[word]
+                self._polarity[index], self._subjectivity[index], self._intensity[index] = pattern_sentiment[word][None]
+                self._known[index] = True
+                # Adverbs modify the score of the next known word ("very good")
+                self._modifier[index] = "RB" in pattern_sentiment[word]
+
+            self._negation = np.zeros(size, dtype=bool)
+            self._negation[[vocabulary[word] for word in NEGATIONS]] = True
+            self._short = np.zeros(size, dtype=bool)
+            self._short[[vocabulary[word] for word in SHORT_WORDS if not self._known[vocabulary[word]]]] = True
+            self._exclamation = np.zeros(size, dtype=bool)
+            self._exclamation[vocabulary["!"]] = True
+
+            self._vocabulary = vocabulary
+            return vocabulary
+
+    def analyze(self, texts: List[str]) -> List[Sentiment]:
+        """
+        Analyzes the sentiment of all the given texts.
+
+        Args:
+        texts (List[str]): the texts to analyze.
+
+        Returns:
+        List[Sentiment]: the polarity (-1 to 1) and subjectivity (0 to 1) of each text, in the order of the texts.
+        """
+        if not texts:
+            return []
+
+        vocabulary = self._load()
+        unknown = len(vocabulary)
+
+        # Turn all texts into one array of word indexes, and remember which text each word belongs to
+        token_lists = [TOKEN_PATTERN.findall(text.lower()) for text in texts]
+        lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(texts))
+        ids = np.fromiter(
+            (vocabulary.get(token, unknown) for tokens in token_lists for token in tokens),
+            dtype=np.int64,
+            count=int(lengths.sum()),
+        )
+        documents = np.repeat(np.arange(len(texts)), lengths)
+
+        # Index of the two previous words, replaced by an unknown word across texts
+        same_text = np.zeros(len(ids), dtype=bool)
+        same_text[1:] = documents[1:] == documents[:-1]
+        previous_ids = np.where(same_text, np.roll(ids, 1), unknown)
+        second_ids = np.where(same_text & np.roll(same_text, 1), np.roll(ids, 2), unknown)
+
+        known = self._known[ids]
+        polarity = self._polarity[ids]
+        subjectivity = self._subjectivity[ids]
+
+        # "really good": the intensity of the adverb multiplies the scores, and both words count as one.
+        # A negated adverb weakens the next word instead ("not very good").
+        modified = known & self._known[previous_ids] & self._modifier[previous_ids]
+        intensity = np.where(modified, self._intensity[previous_ids], 1.0)
+        intensity = np.where(modified & self._negation[second_ids], 1.0 / intensity, intensity)
+        polarity = np.clip(polarity * intensity, -1.0, 1.0)
+        subjectivity = np.clip(subjectivity * intensity, -1.0, 1.0)
+        assessed = known & ~np.roll(modified, -1)
+
+        # "good!!": every exclamation mark boosts the polarity of the last assessed word before it
+        positions = np.arange(len(ids))
+        last_assessed = np.maximum.accumulate(np.where(assessed, positions, -1))
+        exclamation_positions = positions[self._exclamation[ids]]
+        boosted = last_assessed[exclamation_positions]
+        boosted = boosted[(boosted >= 0) & (documents[boosted] == documents[exclamation_positions])]
+        exclamations = np.bincount(boosted, minlength=len(ids))
+        polarity = np.clip(polarity * 1.25**exclamations, -1.0, 1.0)
+
+        # "not good" is slightly bad and "not bad" slightly good, also across an adverb or a short word
+        negated = self._negation[previous_ids] | (self._negation[second_ids] & (modified | self._short[previous_ids]))
+        polarity = np.where(negated, polarity * -0.5, polarity)
+
+        # Average the scores of the assessed words of each text
+        assessed_documents = documents[assessed]
+        counts = np.maximum(np.bincount(assessed_documents, minlength=len(texts)), 1)
+        average_polarity = np.bincount(assessed_documents, weights=polarity[assessed], minlength=len(texts)) / counts
+        average_subjectivity = (
+            np.bincount(assessed_documents, weights=subjectivity[assessed], minlength=len(texts)) / counts
+        )
+        return [Sentiment(float(p), float(s)) for p, s in zip(average_polarity, average_subjectivity)]
+
+
+# Initialize the shared batch analyzer, which loads the lexicon on first use
+batch_sentiment_analyzer = BatchSentimentAnalyzer()
+
+
+# Create a function to perform sentiment analysis on many texts at once
+def analyze_sentiment_batch(texts: List[str]) -> List[Sentiment]:
+    """
+    Analyzes the sentiment of the given texts together with the shared BatchSentimentAnalyzer.
+
+    Args:
+    texts (List[str]): the texts to analyze.
+
+    Returns:
+    List[Sentiment]: the sentiment analysis result of each text, including polarity and subjectivity scores.
+    """
+    return batch_sentiment_analyzer.analyze(texts)
+
+
+# Create a function to return the version of a sentiment engine
+def get_analyzer_version(engine: str) -> str:
+    """
+    Returns the version of the given sentiment engine. Both engines use the lexicon shipped with TextBlob,
+    so a new TextBlob version changes the version of both.
+
+    Args:
+    engine (str): 'textblob' or 'batch'.
+
+    Returns:
+    str: the version of the engine.
+    """
+    if engine == "batch":
+        return f"{BatchSentimentAnalyzer.version}+textblob-{textblob.__version__}"
+    if engine == "textblob":
+        return textblob.__version__
+    raise ValueError(f"Unknown sentiment engine: {engine}")
+
+
+# Create a function to return the cache of sentiment analysis results
+def get_sentiment_cache() -> Optional[TieredCache]:
+    """
+    Returns the shared sentiment cache, creating it on first use: recent results are kept in memory, and
+    all results are stored in the CACHE_DIR folder. Worker processes create their own cache, as a database
+    connection cannot be shared between processes.
+
+    Args:
+    None: this function does not take any arguments.
+
+    Returns:
+    TieredCache or None: the sentiment cache, or None if caching is disabled in the configuration.
+    """
+    global _sentiment_cache, _sentiment_cache_pid
+
+    if not SENTIMENT_CACHE_ENABLED:
+        return None
+
+    with _sentiment_cache_lock:
+        if _sentiment_cache is None or _sentiment_cache_pid != os.getpid():
+            _sentiment_cache = TieredCache(
+                LRUCache(SENTIMENT_CACHE_MEMORY_ENTRIES),
+                DiskCache(os.path.join(CACHE_DIR, "sentiment_cache.sqlite3"), SENTIMENT_CACHE_MAX_BYTES),
+            )
+            _sentiment_cache_pid = os.getpid()
+        return _sentiment_cache
+
+
+# Create a function to build the cache key of a text
+def get_sentiment_cache_key(text: str, engine: str) -> str:
+    """
+    Builds the cache key of the sentiment of a text. The key contains the name and version of the engine,
+    so that results of an older version are never returned and are eventually evicted.
+
+    Args:
+    text (str): the analyzed text.
+    engine (str): 'textblob' or 'batch'.
+
+    Returns:
+    str: the cache key.
+    """
+    text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{engine}:{get_analyzer_version(engine)}:{text_hash}"
+
+
+# Create a function to perform sentiment analysis with the configured engine
+def analyze_sentiments(texts: List[str], engine: str = SENTIMENT_ENGINE) -> List[Sentiment]:
+    """
+    Analyzes the sentiment of the given texts, either with one TextBlob per text or with the batch analyzer.
+    Texts whose sentiment is in the sentiment cache are not analyzed again, and each distinct text
+    is only analyzed once.
+
+    Args:
+    texts (List[str]): the texts to analyze.
+    engine (str): 'textblob' or 'batch', SENTIMENT_ENGINE by default.
+
+    Returns:
+    List[Sentiment]: the sentiment analysis result of each text, including polarity and subjectivity scores.
+    """
+    if engine not in ("textblob", "batch"):
+        raise ValueError(f"Unknown sentiment engine: {engine}")
+
+    cache = get_sentiment_cache()
+    sentiments: Dict[str, Sentiment] = {}
+    keys = {text: get_sentiment_cache_key(text, engine) for text in texts} if cache is not None else {}
+
+    if cache is not None:
+        cached_sentiments = cache.get_many(keys.values())
+        for text, key in keys.items():
+            if key in cached_sentiments:
+                sentiments[text] = Sentiment(*json.loads(cached_sentiments[key]))
+
+    missing_texts = [text for text in dict.fromkeys(texts) if text not in sentiments]
+    if missing_texts:
+        if engine == "batch":
+            new_sentiments = analyze_sentiment_batch(missing_texts)
+        else:
+            new_sentiments = [analyze_sentiment_with_textblob(text) for text in missing_texts]
+
+        for text, sentiment in zip(missing_texts, new_sentiments):
+            sentiments[text] = Sentiment(sentiment.polarity, sentiment.subjectivity)
+        if cache is not None:
+            cache.set_many({keys[text]: json.dumps(sentiments[text]).encode("utf-8") for text in missing_texts})
+
+    return [sentiments[text] for text in texts]
+
+
+# Create a function to report how often the sentiment cache was used
+def get_sentiment_cache_stats() -> Dict[str, float]:
+    """
+    Returns the hit and miss counters of the sentiment cache and its hit rate.
+
+    Args:
+    None: this function does not take any arguments.
+
+    Returns:
+    Dict[str, float]: the statistics returned by TieredCache.stats() (empty if caching is disabled).
+    """
+    cache = get_sentiment_cache()
+    return cache.stats() if cache is not None else {}
+
+
 # Create function to calculate average polarity score and output corresponding color
 def get_polarity_color(reviews: List[Dict[str, Any]]) -> Tuple[float, str]:
     """
@@ -43,7 +336,21 @@ def get_polarity_color(reviews: List[Dict[str, Any]]) -> Tuple[float, str]:
     """
     total_polarity = sum(review.get("textblob_polarity", 0) for review in reviews)
     average_polarity = total_polarity / len(reviews) if reviews else 0
+    return average_polarity, get_sentiment_color(average_polarity)
+
+
+# Create function to output the color corresponding to an average polarity score
+def get_sentiment_color(average_polarity: float) -> str:
+    """
+    Assigns a color to an average polarity: red for negative sentiment (less than -0.25), green for positive
+    sentiment (greater than 0.25), and orange for neutral sentiment (between -0.25 and 0.25).
+
+    Arguments:
+    average_polarity (float): the average polarity of the reviews.
 
+    Returns:
+    str: the color corresponding to the average polarity.
+    """
     # Determine the color based on average polarity
     if average_polarity < -0.25:
         color = "red"  # Red light for negative sentiment
@@ -52,7 +359,7 @@ def get_polarity_color(reviews: List[Dict[str, Any]]) -> Tuple[float, str]:
     else:
         color = "orange"  # Orange light for neutral sentiment
 
-    return average_polarity, color
+    return color
 
 
 # Create a function to preprocess text for the word cloud
@@ -77,12 +384,21 @@ def generate_filtered_text(all_results: List[Dict[str, Any]]) -> str:
         return ""
 
     # Combine all review texts into a single string
-    text = " ".join(review["review_text"] for review in all_results)
+    return filter_stopwords(" ".join(review["review_text"] for review in all_results))
+
+
+# Create a function to remove stopwords and non-alphabetical words from a text
+def filter_stopwords(text: str) -> str:
+    """
+    Tokenizes the text and keeps only the purely alphabetical words that are not common English stopwords.
+
+    Arguments:
+    text (str): the text to filter, e.g. the texts of all reviews joined together.
 
+    Returns:
+    str: the remaining words separated by spaces.
+    """
     # Tokenize the text and remove stopwords
     words = word_tokenize(text)
     stop_words = set(stopwords.words("english"))
     return " ".join(word for word in words if word.lower() not in stop_words and word.isalpha())
-
-
-
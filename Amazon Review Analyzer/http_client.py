@@ -0,0 +1,263 @@
+"""
+http_client.py: Provides the shared HTTP session used by all scraping functions. The session keeps connections
+alive in a connection pool, negotiates compressed responses and retries failed requests with exponential backoff.
+Downloaded pages are kept in a persistent cache, so that pages opened again are served from disk.
+"""
+
+import os
+import random
+import re
+import threading
+from typing import Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+from cache_utils import DiskCache
+from config import (
+    CACHE_DIR,
+    HEADERS,
+    HTTP_BACKOFF_FACTOR,
+    HTTP_CACHE_BLOCKED_MARKERS,
+    HTTP_CACHE_CONTENT_MARKERS,
+    HTTP_CACHE_ENABLED,
+    HTTP_CACHE_MAX_BYTES,
+    HTTP_CACHE_TTLS,
+    HTTP_MAX_RETRIES,
+    HTTP_POOL_SIZE,
+    USER_AGENTS,
+)
+
+# HTTP status codes that are worth retrying: rate limiting and temporary server errors
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Query parameters Amazon adds for tracking only, which do not change the content of the page
+TRACKING_PARAMETERS = {"ref", "ref_", "qid", "sr", "crid", "sprefix", "pd_rd_i", "pd_rd_r", "pd_rd_w", "pd_rd_wg"}
+
+# Initialize the shared session and page cache, created lazily by get_session() and get_http_cache()
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_http_cache: Optional[DiskCache] = None
+_http_cache_lock = threading.Lock()
+
+
+# Create a function to build a session with a connection pool and retries
+def create_session(
+    pool_size: int = HTTP_POOL_SIZE, max_retries: int = HTTP_MAX_RETRIES, backoff_factor: float = HTTP_BACKOFF_FACTOR
+) -> requests.Session:
+    """
+    Creates a requests session that keeps up to pool_size connections per host alive and retries
+    requests answered with 429 or 5xx status codes, waiting exponentially longer between attempts.
+    Compressed responses (gzip, deflate and brotli if the brotli package is installed) are requested.
+
+    Arguments:
+    pool_size (int): the maximum number of connections kept alive for each host.
+    max_retries (int): the maximum number of retries for a single request.
+    backoff_factor (float): the base factor of the exponential backoff between retries, in seconds.
+
+    Returns:
+    requests.Session: the configured session.
+    """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        # Return the last response instead of raising, so that the caller can report the status code
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # requests only advertises brotli ("br") if a brotli decoder is installed
+    session.headers["accept-encoding"] = DEFAULT_ACCEPT_ENCODING
+    session.headers["connection"] = "keep-alive"
+    return session
+
+
+# Create a function to return the session shared by all scraping functions
+def get_session() -> requests.Session:
+    """
+    Returns the shared session, creating it on first use. The session is safe to share between the
+    threads that download pages concurrently.
+
+    Arguments:
+    None: this function does not take any arguments.
+
+    Returns:
+    requests.Session: the shared session.
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+# Create a function to return the persistent cache of downloaded pages
+def get_http_cache() -> Optional[DiskCache]:
+    """
+    Returns the shared page cache, creating it on first use in the CACHE_DIR folder.
+
+    Arguments:
+    None: this function does not take any arguments.
+
+    Returns:
+    DiskCache or None: the page cache, or None if caching is disabled in the configuration.
+    """
+    global _http_cache
+
+    if not HTTP_CACHE_ENABLED:
+        return None
+
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = DiskCache(os.path.join(CACHE_DIR, "http_cache.sqlite3"), HTTP_CACHE_MAX_BYTES)
+        return _http_cache
+
+
+# Create a function to turn equivalent URLs into the same cache key
+def normalize_url(url: str) -> str:
+    """
+    Normalizes a URL so that URLs pointing to the same content share a cache entry: the scheme and
+    host are lowercased, Amazon "/ref=..." path segments, tracking parameters and fragments are removed,
+    and the remaining query parameters are sorted.
+
+    Arguments:
+    url (str): the URL to normalize.
+
+    Returns:
+    str: the normalized URL.
+    """
+    parts = urlsplit(url.strip())
+    path = re.sub(r"/ref=[^/]*", "", parts.path).rstrip("/") or "/"
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMETERS
+    )
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+# Create a function to check whether a downloaded page may be cached
+def is_cacheable_page(page: str, kind: str) -> bool:
+    """
+    Checks that a downloaded page is a complete page of its kind: it must not be a captcha or robot check page,
+    which Amazon sends with a 200 status code, and it must contain one of the texts expected on its kind of page.
+    Other pages are returned to the caller but not cached, so that the next request downloads them again.
+
+    Arguments:
+    page (str): the body of the response.
+    kind (str): the kind of page: 'search', 'product' or 'reviews'.
+
+    Returns:
+    bool: True if the page may be cached, False otherwise.
+    """
+    if not page or any(marker in page for marker in HTTP_CACHE_BLOCKED_MARKERS):
+        return False
+    content_markers = HTTP_CACHE_CONTENT_MARKERS.get(kind)
+    return not content_markers or any(marker in page for marker in content_markers)
+
+
+# Create a function to download a page with the shared session
+def fetch_url(
+    url: str,
+    kind: Optional[str] = None,
+    force_refresh: bool = False,
+    timeout: int = 10,
+    before_request: Optional[Callable[[str], None]] = None,
+) -> str:
+    """
+    Requests the given URL with the shared session and a randomly chosen user agent. If a kind of page
+    is given ('search', 'product' or 'reviews'), the page is served from the page cache while its entry
+    is younger than the time to live configured for that kind, and successful responses passing
+    is_cacheable_page() are cached. before_request is only called when the page is not served from the
+    cache, so that pages read from disk are not slowed down by a rate limiter.
+
+    Arguments:
+    url (str): the URL to request.
+    kind (str): the kind of page, which selects its time to live in HTTP_CACHE_TTLS. None disables caching.
+    force_refresh (bool): if True, the cached page is ignored and replaced by a freshly downloaded one.
+    timeout (int): the timeout of the request in seconds.
+    before_request (Callable[[str], None]): called with the URL right before it is requested, e.g. the wait
+                                            method of a rate limiter.
+
+    Returns:
+    str: the body of the response.
+
+    Raises:
+    requests.RequestException: if the request fails or the final response has an error status code.
+    """
+    cache = get_http_cache() if kind is not None else None
+    cache_key = f"{kind}:{normalize_url(url)}"
+
+    if cache is not None and not force_refresh:
+        cached_page = cache.get(cache_key)
+        if cached_page is not None:
+            return cached_page.decode("utf-8")
+
+    if before_request is not None:
+        before_request(url)
+    headers = {**HEADERS, "user-agent": random.choice(USER_AGENTS)}
+    response = get_session().get(url, headers=headers, timeout=timeout)
+    response.raise_for_status()  # Raises HTTPError for bad responses
+    page = str(response.text)
+
+    if cache is not None and is_cacheable_page(page, str(kind)):
+        cache.set(cache_key, page.encode("utf-8"), HTTP_CACHE_TTLS.get(str(kind)))
+    return page
+
+
+# Create a function to report how often the page cache was used
+def get_cache_stats() -> Dict[str, int]:
+    """
+    Returns the hit and miss counters of the page cache, together with the number and size of cached pages.
+
+    Arguments:
+    None: this function does not take any arguments.
+
+    Returns:
+    Dict[str, int]: a dictionary with the keys 'hits', 'misses', 'entries' and 'size' (empty if caching is disabled).
+    """
+    cache = get_http_cache()
+    return cache.stats() if cache is not None else {}
+
+
+# Create a function to report how many connections were reused
+def get_connection_stats(session: Optional[requests.Session] = None) -> Dict[str, int]:
+    """
+    Counts the requests sent through the connection pools of the session and how many of them
+    needed a new connection. Every other request reused a kept-alive connection and saved a TCP and TLS handshake.
+
+    Arguments:
+    session (requests.Session): the session to inspect, the shared session by default.
+
+    Returns:
+    Dict[str, int]: a dictionary with the keys 'requests', 'new_connections' and 'reused_connections'.
+    """
+    session = session or get_session()
+    total_requests = 0
+    new_connections = 0
+
+    # The same adapter is mounted for http and https, so every adapter is only counted once
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+    for adapter in adapters.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                total_requests += pool.num_requests
+                new_connections += pool.num_connections
+
+    return {
+        "requests": total_requests,
+        "new_connections": new_connections,
+        "reused_connections": total_requests - new_connections,
+    }
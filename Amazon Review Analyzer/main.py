@@ -3,63 +3,94 @@ main.py: This script serves as the entry point of the Amazon Review Analyzer app
 It contains the main GUI setup using Tkinter, event handling, and orchestration of various components.
 """
 
-import threading
 import tkinter as tk
 import tkinter.font as tkFont
 from tkinter import ttk
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional
 from wordcloud import WordCloud
 import matplotlib.pyplot as plt
 
-import pandas as pd
-
-from chatgpt_integration import ask_chatgpt
-from config import SEARCH_PARAMS
-from data_analysis import get_polarity_color, generate_filtered_text
-from scraping_utils import get_amazon_product_data, scrape_amazon_product_description, scrape_data
+import numpy as np
+
+from chatgpt_integration import ask_chatgpt_concurrently
+from config import CHATGPT_REVIEW_SELECTION, PREFETCH_TOP_RESULTS, REVIEW_SORT_OPTIONS, SEARCH_PARAMS
+from data_analysis import filter_stopwords, get_sentiment_color
+from prefetcher import Prefetcher
+from review_selector import select_representative_reviews
+from review_store import ReviewStore
+from review_summarizer import condense_reviews
+from review_viewer import ReviewListView
+from scraping_utils import iter_amazon_product_pages, iter_scrape_data, start_parse_pool
+from task_runner import Task, TaskRunner
+from text_streamer import TextStreamer
 from utils import is_valid_asin, open_amazon, value_to_key
 
 # Initialize global variables
-all_results: List[Dict[str, Any]] = []
-product_df = pd.DataFrame()
+review_store = ReviewStore()
+filtered_positions = np.arange(0)
+search_results: Dict[str, Dict[str, str]] = {}
 product_id: str = ""
 product_url = ""
+scraping_task: Optional[Task] = None
+text_streamers: Dict[tk.Text, TextStreamer] = {}
 
 
 # Function definitions
-def display_review(review: dict) -> None:
+# Create a function to read the value of a filter entry
+def read_filter_value(entry: tk.Entry, default: float) -> Optional[float]:
+    """
+    Reads the number typed in a filter entry.
+
+    Arguments:
+    entry (tk.Entry): the filter entry.
+    default (float): the value used if the entry is empty.
+
+    Returns:
+    float or None: the typed number, the default value if the entry is empty, or None if the text is not
+                   a number yet (e.g. a single "-" while typing a negative number).
     """
-    Displays a single review in the text area of the GUI.
+    text = entry.get().strip()
+    if not text:
+        return default
+    try:
+        return float(text)
+    except ValueError:
+        return None
 
-    This function formats the details of a review and appends it to the text area widget
-    for display. It includes the title, rating, date, polarity, subjectivity, and the review
-    text itself. Each review is separated by a line of dashes for clarity.
+
+# Create a function to find the reviews matching the filter entries
+def get_filtered_positions() -> Optional[np.ndarray]:
+    """
+    Reads the minimum and maximum subjectivity and polarity typed in the filter entries and finds the
+    matching reviews with the range index of the global review store.
 
     Arguments:
-    review (dict): a dictionary containing the details of a review. Expected keys are
-                   'review_title', 'review_stars', 'review_date', 'textblob_polarity',
-                   'textblob_subjectivity', and 'review_text'.
+    None: this function relies on global variables and user input from the GUI.
 
     Returns:
-    None: this function does not return a value but updates the GUI directly.
-    """
-    display_text = (
-        f"Title: {review['review_title']}\n"
-        f"Rating: {review['review_stars']}\n"
-        f"Date: {review['review_date']}\n"
-        f"Polarity: {review['textblob_polarity']:.2f}, "
-        f"Subjectivity: {review['textblob_subjectivity']:.2f}\n"
-        f"Review: {review['review_text']}\n"
-        "---------------------------------------------\n"
+    np.ndarray or None: the sorted positions of the matching reviews, or None if an entry does not
+                        contain a complete number yet.
+    """
+    filter_values = (
+        read_filter_value(min_subjectivity_entry, 0.0),
+        read_filter_value(max_subjectivity_entry, 1.0),
+        read_filter_value(min_polarity_entry, -1.0),
+        read_filter_value(max_polarity_entry, 1.0),
     )
-    text_area.insert(tk.INSERT, display_text)
+    if None in filter_values:
+        return None
+
+    min_subjectivity, max_subjectivity, min_polarity, max_polarity = filter_values
+    return review_store.filter(min_subjectivity, max_subjectivity, min_polarity, max_polarity)
 
 
 # Create a function to add filtering functionalities in the GUI
 def apply_filters() -> None:
     """
     Filters and displays reviews based on specified sentiment analysis criteria.
-    The filters applied are based on minimum and maximum values for subjectivity and polarity.
+    The filters applied are based on minimum and maximum values for subjectivity and polarity,
+    and are answered by the range index of the global review store, so that the reviews can be
+    filtered again on every key typed in the filter entries. The list of reviews shows the first match.
 
     Arguments:
     None: this function relies on global variables and user input from the GUI.
@@ -67,25 +98,88 @@ def apply_filters() -> None:
     Returns:
     None: this function does not return any value but updates the GUI directly.
     """
-    min_subjectivity = float(min_subjectivity_entry.get()) if min_subjectivity_entry.get() else 0.0
-    max_subjectivity = float(max_subjectivity_entry.get()) if max_subjectivity_entry.get() else 1.0
-    min_polarity = float(min_polarity_entry.get()) if min_polarity_entry.get() else -1.0
-    max_polarity = float(max_polarity_entry.get()) if max_polarity_entry.get() else 1.0
+    positions = get_filtered_positions()
+    # Keep the current results while a number is still being typed
+    if positions is not None:
+        show_reviews(positions)
 
-    text_area.delete("1.0", tk.END)  # Clear the existing text
 
-    filtered_reviews = [
-        review
-        for review in all_results
-        if min_subjectivity <= review["textblob_subjectivity"] <= max_subjectivity
-        and min_polarity <= review["textblob_polarity"] <= max_polarity
-    ]
+# Create a function to display a new list of reviews from its first review
+def show_reviews(positions: np.ndarray) -> None:
+    """
+    Replaces the list of displayed reviews with the reviews at the given positions of the review store,
+    in the selected order, and scrolls the list back to its first review.
 
-    if not filtered_reviews:  # Check if the filtered list is empty
-        text_area.insert(tk.INSERT, "No reviews matching the filtering criteria.\n")
-    else:
-        for review in filtered_reviews[:10]:  # Display up to 10 of the filtered reviews
-            display_review(review)
+    Arguments:
+    positions (np.ndarray): the sorted positions of the reviews to display.
+
+    Returns:
+    None: this function does not return any value but updates the GUI and global variables.
+    """
+    global filtered_positions
+
+    filtered_positions = positions
+    review_list.set_reviews(review_store, get_sorted_positions(positions))
+
+
+# Create a function to order the filtered reviews as selected in the GUI
+def get_sorted_positions(positions: np.ndarray) -> np.ndarray:
+    """
+    Orders the reviews at the given positions by the column selected in the sort dropdown menu.
+
+    Arguments:
+    positions (np.ndarray): the sorted positions of the reviews.
+
+    Returns:
+    np.ndarray: the positions in the selected order.
+    """
+    sort_column, descending = REVIEW_SORT_OPTIONS.get(sort_var.get(), (None, False))
+    if sort_column is None:
+        return positions
+    return review_store.sort(positions, sort_column, descending)
+
+
+# Create a function to add the reviews of a scraped page to the displayed reviews
+def add_scraped_reviews(page_results: List[Dict[str, Any]]) -> None:
+    """
+    Adds the reviews of a newly scraped page to the global review store, filters them again
+    and refreshes the list of reviews and the average polarity. After the first page, the list stays at
+    the review the user is reading while the new reviews are added.
+
+    Arguments:
+    page_results (List[Dict[str, Any]]): the reviews of the scraped page.
+
+    Returns:
+    None: this function does not return any value but updates the GUI and global variables.
+    """
+    global filtered_positions
+
+    if not page_results:
+        return
+
+    keep_position = len(review_store) > 0
+    review_store.extend(page_results)
+
+    positions = get_filtered_positions()
+    filtered_positions = positions if positions is not None else np.arange(len(review_store))
+    review_list.set_reviews(review_store, get_sorted_positions(filtered_positions), keep_position)
+    display_average_polarity_and_color()
+
+
+# Create a function to show which reviews of the list are displayed
+def display_review_range(first: int, last: int, total: int) -> None:
+    """
+    Updates the label showing the range of displayed reviews, e.g. 'Reviews 11-20 of 250'.
+
+    Arguments:
+    first (int): the index of the first displayed review.
+    last (int): the index after the last displayed review.
+    total (int): the number of reviews in the list.
+
+    Returns:
+    None: this function does not return any value but updates the GUI directly.
+    """
+    review_range_label.config(text=f"Reviews {first + 1}-{last} of {total}" if total else "")
 
 
 # Create function to display average polarity and corresponding color
@@ -96,13 +190,14 @@ def display_average_polarity_and_color() -> None:
     If there are no reviews to analyze, it updates the GUI to indicate that no average can be calculated.
 
     Arguments:
-    None: this function uses the global variable 'all_results' to access the review data.
+    None: this function uses the global variable 'review_store' to access the review data.
 
     Returns:
     None: this function does not return any value but updates the GUI directly.
     """
-    if all_results:
-        average_polarity, color = get_polarity_color(all_results)
+    if len(review_store):
+        average_polarity = review_store.average_polarity()
+        color = get_sentiment_color(average_polarity)
         polarity_text = f"Average Polarity Score: {average_polarity:.2f}"
         polarity_label.config(text=polarity_text)
         polarity_canvas.delete("all")
@@ -116,89 +211,172 @@ def display_average_polarity_and_color() -> None:
 def display_chatgpt(all_results: List[Dict[str, str]]) -> None:
     """
     Generates a summary of reviews and product improvement suggestions using the ChatGPT API
-    and displays them in the respective text areas of the application.
+    and displays them in the respective text areas of the application. The API is called in a
+    background task, so that the application stays responsive while the answers are generated.
 
     Arguments:
     all_results (List[Dict[str, str]]): a list of dictionaries, where each dictionary contains data
     about a review, such as the title, date, and text.
 
     Returns:
-    None: this function does not return any value. It updates the text areas in the GUI directly
-    with the content generated by the ChatGPT API.
+    None: this function does not return any value. It updates the text areas in the GUI
+    with the content generated by the ChatGPT API while it is generated.
+    """
+
+    # Show the answers piece by piece while they are generated. The text areas keep their streamer, so that the
+    # pieces of the answers to a previous scrape, which may still be streaming, are dropped
+    streamers = {
+        "summary": get_text_streamer(review_summary_text),
+        "improvements": get_text_streamer(product_improvement_text),
+    }
+    generations = {
+        "summary": streamers["summary"].reset("Generating summary of the reviews..."),
+        "improvements": streamers["improvements"].reset("Generating product improvement suggestions..."),
+    }
+
+    # Ask ChatGPT both questions at the same time in the background, and show each complete answer as soon as it
+    # arrives, in place of its streamed pieces
+    task_runner.submit(
+        "Asking ChatGPT",
+        ask_chatgpt_for_reviews,
+        all_results,
+        lambda name, delta: streamers[name].append(delta, generations[name]),
+        on_progress=lambda answer: streamers[answer[0]].set_text(answer[1], generations[answer[0]]),
+    )
+
+
+# Create a function to return the streamer of a text area
+def get_text_streamer(text_widget: tk.Text) -> TextStreamer:
     """
+    Returns the TextStreamer showing streamed text in the given text area, creating it on first use. The same
+    streamer is returned for every call, so that its generations tell the text of the latest request apart.
+
+    Arguments:
+    text_widget (tk.Text): the text area.
 
-    # Loop through the list of dictionaries to generate a string for use of chatgpt
-    reviews_string = ""
-    for review in all_results:
-        reviews_string += (
-            f"Title: {review['review_title']}\n" f"Date: {review['review_date']}\n" f"Review: {review['review_text']}\n"
-        )
+    Returns:
+    TextStreamer: the streamer of the text area.
+    """
+    if text_widget not in text_streamers:
+        text_streamers[text_widget] = TextStreamer(text_widget, task_runner.call_soon)
+    return text_streamers[text_widget]
 
-    # Generate and display summary
+
+# Create a function to ask ChatGPT for the summary and the improvement suggestions
+def ask_chatgpt_for_reviews(
+    reviews: List[Dict[str, str]], on_delta: Callable[[str, str], None], report_progress: Callable
+) -> Dict[str, str]:
+    """
+    Asks ChatGPT for the summary of the reviews and for the product improvement suggestions at the same time.
+    Only representative reviews are attached if CHATGPT_REVIEW_SELECTION is set, and reviews too long for one
+    question are condensed by summarizing them in chunks first. This function runs in a background task. The
+    answers are streamed to on_delta while they are generated, and each complete answer is reported as its
+    progress.
+
+    Arguments:
+    reviews (List[Dict[str, str]]): the reviews, each with the keys 'review_title', 'review_date' and 'review_text'.
+    on_delta (Callable[[str, str], None]): the function receiving the name of a request and every piece of its
+                                           answer, in the background thread asking it.
+    report_progress (Callable): the function receiving the name of a request and its answer, as a tuple.
+
+    Returns:
+    Dict[str, str]: the answers, keyed by the name of their request.
+    """
+
+    # Build the text of the reviews once, for both requests
+    if CHATGPT_REVIEW_SELECTION:
+        reviews = select_representative_reviews(reviews)
+    reviews_string = condense_reviews(reviews)
+
+    # Generate the summary
     request_summary = (
         "Summarize the negative and positive sentiment of the reviews attached. "
         "Limit to 6 bullet points. "
         f"{reviews_string}."
     )
-    # limited length of input for Chat GPT API allowed - limit the length of the string to 4000 tokens
-    request_summary = request_summary[:4000]
-    review_summary_text.delete("1.0", tk.END)  # Delete all existing content
-    review_summary_text.insert(tk.INSERT, "Generating summary of the reviews...")
-    product_improvement_text.delete("1.0", tk.END)  # Delete all existing content
-    product_improvement_text.insert(tk.INSERT, "Generating product improvement suggestions...")
-    response_chatgpt = ask_chatgpt(request_summary)
-    review_summary_text.delete("1.0", tk.END)  # Delete all existing content
-    review_summary_text.insert(tk.INSERT, response_chatgpt)
-
-    # Generate and display product improvement suggestions
-    request_summary = (
+
+    # Generate product improvement suggestions
+    request_improvements = (
         "Please generate product improvement suggestions based on the negative points "
         "raised in the following reviews. Only display precise suggestions, no additional "
         "text. Limit to 4 suggestions. "
         f"{reviews_string}."
     )
 
-    # limited lenght of input for Chat GPT API allowed - limit the lenght of the string to 4000 tokens
-    request_summary = request_summary[:4000]
-    response_chatgpt = ask_chatgpt(request_summary)
-    product_improvement_text.delete("1.0", tk.END)  # Delete all existing content
-    product_improvement_text.insert(tk.INSERT, response_chatgpt)
+    return ask_chatgpt_concurrently(
+        {"summary": request_summary, "improvements": request_improvements},
+        on_answer=lambda name, answer: report_progress((name, answer)),
+        on_delta=on_delta,
+    )
 
 
 # Create a function to display the word cloud
-def display_wordcloud(all_results: List[Dict[str, Any]]) -> None:
+def display_wordcloud(review_store: ReviewStore) -> None:
+    """
+    Generates a word cloud from the scraped reviews in a background task, visualizing the frequency of words used
+    in the reviews, and displays it once it is ready. The user interface stays responsive while the stopwords are
+    filtered and the word cloud is drawn.
+
+    Arguments:
+    review_store (ReviewStore): the store holding the scraped reviews.
+
+    Returns:
+    None: this function does not return any value. The word cloud image is displayed when the task is done.
+    """
+    task_runner.submit("Generating word cloud", generate_wordcloud, review_store.get_texts(), on_done=show_wordcloud)
+
+
+# Create a function to generate the word cloud image in a background task
+def generate_wordcloud(texts: List[str]) -> Optional[np.ndarray]:
     """
-    Generates and displays a word cloud from the scraped reviews, visualizing the frequency of words used in the reviews.
+    Filters the stopwords out of the review texts and draws the word cloud of the remaining words. This
+    function does not use any widget, as it runs outside of the user interface thread.
 
     Arguments:
-    all_results (List[Dict[str, Any]]): a list of dictionaries where each dictionary contains the data of a review.
-                                        Each dictionary should have a key 'review_text' containing the text of the review.
+    texts (List[str]): the texts of the reviews.
 
     Returns:
-    None: this function does not return any value. It directly displays the word cloud image or 
-            prints a message if there are no words to display.
+    np.ndarray or None: the word cloud image, or None if there are no words to display.
     """
-    filtered_text = generate_filtered_text(all_results)
+    filtered_text = filter_stopwords(" ".join(texts))
 
     if not filtered_text:
         print("No words left after filtering for the word cloud.")
-        return
+        return None
 
     # Generate the word cloud image
     wordcloud = WordCloud(width=800, height=800, background_color="white").generate(filtered_text)
+    return wordcloud.to_array()
+
+
+# Create a function to show the generated word cloud
+def show_wordcloud(image: Optional[np.ndarray]) -> None:
+    """
+    Shows the word cloud image generated by generate_wordcloud in a matplotlib window.
+
+    Arguments:
+    image (np.ndarray): the word cloud image, or None if there are no words to display.
+
+    Returns:
+    None: this function does not return any value but displays the word cloud image.
+    """
+    if image is None:
+        return
 
-    # Convert to an image and display in Tkinter
-    plt.imshow(wordcloud, interpolation="bilinear")
+    plt.imshow(image, interpolation="bilinear")
     plt.axis("off")
     plt.show()
 
+
 # Create function to select a single product from the treeview widget
 def on_select(event: tk.Event) -> None:
     """
     Handles the selection of a product from the products_tree Treeview widget. When a product is selected,
-    this function retrieves the selected product's ASIN and URL, and then attempts to scrape the product's
-    description from Amazon. The scraped description (or a message indicating the absence of a description)
-    is then displayed in the product_text Text widget. It also enables the scrape button.
+    this function retrieves the selected product's ASIN and URL, and displays the product's description in
+    the product_text Text widget (or a message indicating the absence of a description). Descriptions that
+    were prefetched after the search are displayed at once, the others are scraped in a background task.
+    The first review page of the product is prefetched, and the scrape button is enabled. If the user asked
+    to download the pages again, the prefetched and cached copies are ignored.
 
     Arguments:
     event: the event that triggered this function, passed automatically by the Tkinter event handler.
@@ -211,29 +389,66 @@ def on_select(event: tk.Event) -> None:
 
     selected_items = products_tree.selection()
     if selected_items:
-        selected_item = selected_items[0]
-        selected_index = products_tree.index(selected_item)
-        product_id = product_df.loc[selected_index, "ASIN"]
-        product_url = product_df.loc[selected_index, "Product URL"]
+        product = search_results[selected_items[0]]
+        product_id = product["ASIN"]
+        product_url = product["Product URL"]
+
+        force_refresh = refresh_var.get()
+        description = prefetcher.get_cached_description(product_id) if not force_refresh else None
+        if description is not None:
+            display_product_description(product_url, description)
+        else:
+            product_text.delete(1.0, tk.END)
+            product_text.insert(tk.END, "Loading the product description...")
+            task_runner.submit(
+                "Loading the product description",
+                prefetcher.get_description,
+                product_id,
+                product_url,
+                force_refresh,
+                on_done=lambda description, url=product_url: display_product_description(url, description),
+                on_error=lambda error, url=product_url: display_product_description(url, ""),
+            )
+        # The review pages are downloaded again by the scraping anyway
+        if not force_refresh:
+            prefetcher.prefetch_review_page(product_id)
+
+        # Scraping of another product can only start when the current one is finished
+        if scraping_task is None:
+            scrape_button.config(state=tk.NORMAL)
+
+
+# Create a function to display the description of a product
+def display_product_description(url: str, description: str) -> None:
+    """
+    Displays the scraped description of a product in the product_text Text widget, unless another product
+    was selected in the meantime.
 
-        product_text_scrape = scrape_amazon_product_description(product_url)
+    Arguments:
+    url (str): the URL of the product whose description was scraped.
+    description (str): the scraped description, empty or None if the product has no description.
 
-        product_text.delete(1.0, tk.END)
-        if product_text_scrape:
-            product_text.insert(tk.END, product_text_scrape)
-        else:
-            product_text.insert(tk.END, "This product has no description.")
+    Returns:
+    None: this function does not return any value but updates the GUI directly.
+    """
+    if url != product_url:
+        return
 
-        scrape_button.config(state=tk.NORMAL)
+    product_text.delete(1.0, tk.END)
+    if description:
+        product_text.insert(tk.END, description)
+    else:
+        product_text.insert(tk.END, "This product has no description.")
 
 
 # Create function to update the treeview widget
 def update_treeview(keyword: str, search_param: str, num_pages: int) -> None:
     """
     Updates the Treeview widget (products_tree) with product data based on the specified search parameters.
-    It creates a DataFrame to hold the product data, fetches data from Amazon using the
-    get_amazon_product_data function, and then populates the Treeview with this data. Each row in the
-    Treeview represents a product, showing its number, name, and ASIN.
+    It clears the previous results, and fetches data from Amazon using the iter_amazon_product_pages function
+    in a background task. The products of each search page are added to the Treeview as soon as the page is
+    parsed. The search button is disabled until the search is finished, and the prefetches of the previous
+    search are cancelled. If the user asked to download the pages again, cached search pages are not used.
 
     Arguments:
     keyword (str): the search keyword entered by the user.
@@ -243,31 +458,83 @@ def update_treeview(keyword: str, search_param: str, num_pages: int) -> None:
     Returns:
     None: this function does not return any value but updates the products_tree Treeview and the global variable.
     """
+    global search_results
+
+    search_button.config(state=tk.DISABLED)
+    search_results = {}
+    products_tree.delete(*products_tree.get_children())
+    prefetcher.cancel()
+
+    task_runner.submit(
+        "Searching Amazon",
+        search_products,
+        keyword,
+        search_param,
+        num_pages,
+        refresh_var.get(),
+        on_progress=add_products,
+        on_done=lambda result: search_button.config(state=tk.NORMAL),
+        on_error=lambda error: search_button.config(state=tk.NORMAL),
+    )
+
+
+# Create a function to search Amazon in a background task
+def search_products(
+    keyword: str, search_param: str, num_pages: int, force_refresh: bool, report_progress: Callable
+) -> None:
+    """
+    Scrapes the Amazon search pages with iter_amazon_product_pages and reports the products of every page as
+    progress. This function does not use any widget, as it runs outside of the user interface thread.
+
+    Arguments:
+    keyword (str): the search keyword entered by the user.
+    search_param (str): the search parameter/category selected by the user.
+    num_pages (int): the number of pages to scrape for product data.
+    force_refresh (bool): if True, the search pages are downloaded again even if they are cached.
+    report_progress (Callable): the function receiving the products of each page.
+
+    Returns:
+    None: this function does not return any value.
+    """
+    for page_products in iter_amazon_product_pages(keyword, search_param, num_pages, force_refresh):
+        report_progress(page_products)
+
 
-    global product_df
-    
-    product_df = pd.DataFrame(columns=["Number", "Product Name", "Product URL", "ASIN"])
-    product_data = get_amazon_product_data(keyword, search_param, num_pages)
-    product_df = pd.concat([product_df, pd.DataFrame(product_data)], ignore_index=True)
+# Create a function to add the products of a search page to the treeview widget
+def add_products(page_products: Dict[str, List[str]]) -> None:
+    """
+    Appends the products of a search page to the Treeview, after the products of the previous pages. Each row in
+    the Treeview represents a product, showing its number, name, and ASIN. The identifier of each row is the key
+    of the product in the global search_results dictionary, which holds its name, URL and ASIN. The descriptions
+    of the first PREFETCH_TOP_RESULTS products are prefetched.
 
-    for row in products_tree.get_children():
-        products_tree.delete(row)
+    Arguments:
+    page_products (Dict[str, List[str]]): the products of the page, with the keys 'Product Name', 'Product URL'
+                                          and 'ASIN'.
 
-    if not product_df.empty:
-        for i, row in product_df.iterrows():
-            products_tree.insert("", "end", values=(i + 1, row["Product Name"], row["ASIN"]))
+    Returns:
+    None: this function does not return any value but updates the products_tree Treeview and the global variable.
+    """
+    for name, url, asin in zip(page_products["Product Name"], page_products["Product URL"], page_products["ASIN"]):
+        number = len(search_results) + 1
+        row_id = str(number)
+        products_tree.insert("", "end", iid=row_id, values=(number, name, asin))
+        search_results[row_id] = {"Product Name": name, "Product URL": url, "ASIN": asin}
+        if number <= PREFETCH_TOP_RESULTS:
+            prefetcher.prefetch_description(asin, url)
 
 
 # Create a function to run the scraping process
 def run_scraping() -> None:
     """
     Manages the process of scraping reviews for a specified product ID. It validates the product ID,
-    retrieves the number of review pages to scrape, calls the scrape_data function to scrape reviews,
-    and updates the GUI with the scraped reviews.
+    retrieves the number of review pages to scrape, and starts the scrape_review_pages function in a
+    background task. The GUI is updated with the reviews of every page as soon as the page is scraped:
+    the first reviews, the average polarity and the progress are shown while the later pages are still
+    being downloaded.
 
     The function disables the scrape button during the scraping process to prevent concurrent scraping,
-    and re-enables it upon completion. It also updates the global variable 'all_results' with the
-    scraped reviews.
+    and re-enables it upon completion. It also updates the global variable 'review_store' with the scraped reviews.
 
     If no valid product ID is provided, or there are no reviews for the product, or an error occurs during scraping,
     the function updates the text area in the GUI with an appropriate message.
@@ -278,7 +545,7 @@ def run_scraping() -> None:
     Returns:
     None: this function does not return any value but updates the GUI and global variables.
     """
-    global all_results, product_id
+    global filtered_positions, product_id, review_store, scraping_task
 
     # Disable the scrape button to prevent concurrent scraping
     scrape_button.config(state=tk.DISABLED)
@@ -298,42 +565,113 @@ def run_scraping() -> None:
         scrape_button.config(state=tk.NORMAL)
         return
 
-    all_results = scrape_data(product_id, num_review_pages)
+    # Forget the reviews of the previous scrape, the first scraped page replaces the message in the text area
+    review_store = ReviewStore()
+    filtered_positions = np.arange(0)
+
+    scraping_task = task_runner.submit(
+        "Scraping reviews",
+        scrape_review_pages,
+        product_id,
+        num_review_pages,
+        refresh_var.get(),
+        on_progress=lambda progress: show_scraped_page(*progress, num_review_pages),
+        on_done=lambda result: finish_scraping(),
+        on_error=lambda error: finish_scraping(f"There was an error in scraping: {error}\n"),
+    )
+
+
+# Create a function to scrape the review pages of a product in a background task
+def scrape_review_pages(product_id: str, num_review_pages: int, force_refresh: bool, report_progress: Callable) -> None:
+    """
+    Scrapes the review pages of the given product with iter_scrape_data and reports every scraped page as
+    progress, as a tuple of the number of scraped pages and the reviews of the page. This function does not
+    use any widget, as it runs outside of the user interface thread.
+
+    Arguments:
+    product_id (str): the ASIN of the product.
+    num_review_pages (int): the number of review pages to scrape.
+    force_refresh (bool): if True, the review pages are downloaded again even if they are cached.
+    report_progress (Callable): the function receiving the scraped pages.
+
+    Returns:
+    None: this function does not return any value.
+    """
+    pages = iter_scrape_data(product_id, num_review_pages, force_refresh)
+    for scraped_pages, page_results in enumerate(pages, start=1):
+        report_progress((scraped_pages, page_results))
+
+
+# Create a function to display the reviews of a scraped page
+def show_scraped_page(scraped_pages: int, page_results: List[Dict[str, Any]], num_review_pages: int) -> None:
+    """
+    Adds the reviews of a scraped page to the displayed reviews and updates the progress of the scraping.
+
+    Arguments:
+    scraped_pages (int): the number of pages scraped so far.
+    page_results (List[Dict[str, Any]]): the reviews of the scraped page.
+    num_review_pages (int): the number of review pages to scrape.
+
+    Returns:
+    None: this function does not return any value but updates the GUI and global variables.
+    """
+    add_scraped_reviews(page_results)
+    scrape_progress_label.config(
+        text=f"Scraped {scraped_pages} of {num_review_pages} pages, {len(review_store)} reviews"
+    )
+
 
-    if not all_results:
-        text_area.insert(tk.INSERT, "This product has no reviews or there was an error in scraping.\n")
+# Create a function to finish the scraping process
+def finish_scraping(error_message: Optional[str] = None) -> None:
+    """
+    Displays the end result of the scraping process: the ChatGPT summary of the scraped reviews, or a message
+    if there are no reviews or an error occurred. The scrape button is enabled again.
+
+    Arguments:
+    error_message (str): the message to display if the scraping failed, None if it succeeded.
+
+    Returns:
+    None: this function does not return any value but updates the GUI and global variables.
+    """
+    global scraping_task
+
+    scraping_task = None
+    if error_message is not None or not len(review_store):
+        text_area.delete("1.0", tk.END)
+        text_area.insert(tk.INSERT, error_message or "This product has no reviews or there was an error in scraping.\n")
     else:
-        for review in all_results[:10]:
-            display_review(review)
-        display_average_polarity_and_color()
-        display_chatgpt(all_results)
+        display_chatgpt(review_store.get_reviews())
 
     scrape_button.config(state=tk.NORMAL)
 
 
-# Create function to start a separate thread
-def start_scraping_thread() -> None:
+# Create a function to show the running background tasks
+def show_task_status(tasks: List[Task]) -> None:
     """
-    Initiates the review scraping process in a separate thread. This function creates a new thread
-    targeting the 'run_scraping' function, which handles the scraping of Amazon product reviews.
-
-    The use of threading prevents the GUI from becoming unresponsive during the scraping process,
-    allowing the main application thread to continue running and managing user interactions.
+    Displays the names of the running background tasks in the status label of the GUI.
 
     Arguments:
-    None: this function does not take any arguments.
+    tasks (List[Task]): the running tasks.
 
     Returns:
-    None: this function does not return any value. It starts a new thread for the scraping process.
+    None: this function does not return any value but updates the GUI directly.
     """
-    scraping_thread = threading.Thread(target=run_scraping)
-    scraping_thread.start()
+    task_status_label.config(text=f"Running: {', '.join(task.name for task in tasks)}..." if tasks else "")
 
 
+# Start the worker processes analyzing review pages while no other thread is running, as they are forked
+start_parse_pool()
+
 # Initialize the main application window using Tkinter
 app = tk.Tk()
 app.title("Amazon Review Analyzer")
 
+# Run the network requests and the analysis in background threads, and update the GUI with their results
+task_runner = TaskRunner(app, on_change=show_task_status)
+
+# Download the descriptions of the first search results and the reviews of the selected product ahead of time
+prefetcher = Prefetcher()
+
 # Get the laptop screen width and height
 screen_width = app.winfo_screenwidth()
 screen_height = app.winfo_screenheight()
@@ -408,6 +746,11 @@ search_button = tk.Button(
 )
 search_button.grid(row=3, column=0, columnspan=2, padx=300, pady=20, sticky="w")
 
+# Create a check box to download the search, product and review pages again instead of using the page cache
+refresh_var = tk.BooleanVar(value=False)
+refresh_checkbutton = tk.Checkbutton(left_frame, text="Download pages again", variable=refresh_var)
+refresh_checkbutton.grid(row=3, column=1, padx=15, pady=20, sticky="e")
+
 # Treeview to display the product list - the search result
 products_tree = ttk.Treeview(left_frame, columns=("Number", "Product Name", "ASIN"), show="headings")
 products_tree.heading("Number", text="Number")
@@ -435,6 +778,10 @@ product_text.grid(row=6, column=0, columnspan=2, padx=15, pady=3, sticky="w")
 go_to_amazon_button = tk.Button(left_frame, text="Go to Amazon", command=lambda: open_amazon(product_url))
 go_to_amazon_button.grid(row=7, column=0, columnspan=2, padx=320, pady=5, sticky="w")
 
+# Label showing the running background tasks
+task_status_label = tk.Label(left_frame, text="", font=("Helvetica", 9))
+task_status_label.grid(row=8, column=0, columnspan=2, padx=15, pady=5, sticky="w")
+
 # Label and entry for number of review pages
 tk.Label(right_frame, text="Number of Review Pages:").grid(row=1, column=0, pady=20, sticky="e")
 review_pages_entry = tk.Entry(right_frame, width=5)
@@ -444,14 +791,20 @@ review_pages_entry.grid(row=1, column=1, padx=1, pady=20, sticky="w")
 review_pages_entry.insert(0, "1")
 
 # Create a button that, when clicked, will start the scraping process
-scrape_button = tk.Button(
-    right_frame, text="Scrape Reviews and Analyze", command=start_scraping_thread, state=tk.DISABLED
-)
+scrape_button = tk.Button(right_frame, text="Scrape Reviews and Analyze", command=run_scraping, state=tk.DISABLED)
 scrape_button.grid(row=1, column=1, padx=106, pady=20, sticky="w")
 
-# Create a text area where the scraped review data will be displayed
-text_area = tk.Text(right_frame, wrap=tk.WORD, width=85, height=10, font=sf_pro_font)
-text_area.grid(row=2, column=0, columnspan=2, padx=15, pady=3, sticky="w")
+# Label showing the progress of the scraping process
+scrape_progress_label = tk.Label(right_frame, text="", font=("Helvetica", 9))
+scrape_progress_label.grid(row=0, column=0, columnspan=2, padx=15, pady=(10, 0), sticky="w")
+
+# Create a text area where the scraped review data will be displayed, with a scrollbar moving through all reviews
+review_list_frame = tk.Frame(right_frame)
+review_list_frame.grid(row=2, column=0, columnspan=2, padx=15, pady=3, sticky="w")
+text_area = tk.Text(review_list_frame, wrap=tk.WORD, width=85, height=10, font=sf_pro_font)
+text_area.grid(row=0, column=0, sticky="w")
+review_scrollbar = tk.Scrollbar(review_list_frame, orient=tk.VERTICAL)
+review_scrollbar.grid(row=0, column=1, sticky="ns")
 
 # Frame for the subjectivity filters
 subjectivity_frame = tk.Frame(right_frame)
@@ -497,10 +850,29 @@ POLARITY_EXPLANATION_TEXT = (
 polarity_explanation = tk.Label(right_frame, text=POLARITY_EXPLANATION_TEXT, font=tkFont.Font(size=9), justify="left")
 polarity_explanation.grid(row=4, column=1, padx=1, pady=1, sticky="w")
 
+# Filter the reviews again on every key typed in the filter entries
+for filter_entry in (min_subjectivity_entry, max_subjectivity_entry, min_polarity_entry, max_polarity_entry):
+    filter_entry.bind("<KeyRelease>", lambda event: apply_filters())
+
 # Create a button to apply filters
 filter_button = tk.Button(right_frame, text="Apply Filters", command=apply_filters)
 filter_button.grid(row=5, column=0, columnspan=2, pady=1, padx=15, sticky="w")
 
+# Frame with the order of the reviews and the range of displayed reviews
+sort_frame = tk.Frame(right_frame)
+sort_frame.grid(row=5, column=1, pady=1, sticky="w")
+tk.Label(sort_frame, text="Sort by:", font=tkFont.Font(size=9)).grid(row=0, column=0, padx=5)
+sort_var = tk.StringVar()
+sort_dropdown = ttk.Combobox(sort_frame, textvariable=sort_var, values=list(REVIEW_SORT_OPTIONS), state="readonly")
+sort_dropdown.set(list(REVIEW_SORT_OPTIONS)[0])
+sort_dropdown.grid(row=0, column=1, padx=5)
+sort_dropdown.bind("<<ComboboxSelected>>", lambda event: show_reviews(filtered_positions))
+review_range_label = tk.Label(sort_frame, text="", font=tkFont.Font(size=9))
+review_range_label.grid(row=0, column=2, padx=5)
+
+# List of reviews showing only the reviews in view, so that scrolling stays fast with many reviews
+review_list = ReviewListView(text_area, review_scrollbar, on_scroll=display_review_range)
+
 # Canvas for displaying the polarity light
 polarity_canvas = tk.Canvas(right_frame, width=40, height=40, bg="white")
 polarity_canvas.grid(row=6, column=0, columnspan=2, padx=350, pady=10, sticky="w")
@@ -526,8 +898,9 @@ product_improvement_text = tk.Text(right_frame, wrap=tk.WORD, width=85, height=8
 product_improvement_text.grid(row=10, column=0, columnspan=2, padx=15, pady=3, sticky="w")
 
 # Create a button to display the word cloud
-wordcloud_button = tk.Button(right_frame, text="Show Word Cloud", command=lambda: display_wordcloud(all_results))
+wordcloud_button = tk.Button(right_frame, text="Show Word Cloud", command=lambda: display_wordcloud(review_store))
 wordcloud_button.grid(row=11, column=0, columnspan=2, padx=300, pady=5, sticky="w")
 
-# Start the main event loop
+# Start the main event loop, checking regularly for the results of the background tasks
+task_runner.poll()
 app.mainloop()
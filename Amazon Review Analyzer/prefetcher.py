@@ -0,0 +1,184 @@
+"""
+prefetcher.py: Downloads data the user is likely to open next while they are still looking at the search results:
+the descriptions of the first products found, and the first review page of the selected product. Prefetched
+descriptions are kept in memory, so that selecting a product displays its description without waiting.
+"""
+
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Set
+
+from cache_utils import LRUCache
+from config import PREFETCH_CACHE_ENTRIES, PREFETCH_WORKERS
+from scraping_utils import fetch_page_html, get_review_page_url, rate_limiter, scrape_amazon_product_description
+
+
+# Create a class to download product data ahead of time
+class Prefetcher:
+    """
+    Downloads product descriptions and review pages in background threads. Descriptions are stored in an LRU
+    cache keyed by ASIN, and review pages end up in the page cache of the HTTP client, where the scraping of the
+    reviews finds them. Prefetches belong to a generation: cancel() starts a new generation when a new search
+    starts, so that the prefetches of the previous search that have not started yet are dropped.
+
+    Prefetches wait for the shared rate limiter like the scraping of the reviews, so that speculative requests
+    do not add bursts of requests to Amazon.
+
+    Arguments:
+    max_entries (int): the maximum number of descriptions kept in memory.
+    max_workers (int): the number of threads downloading the prefetched pages.
+    """
+
+    def __init__(self, max_entries: int = PREFETCH_CACHE_ENTRIES, max_workers: int = PREFETCH_WORKERS) -> None:
+        self.descriptions = LRUCache(max_entries)
+        self.generation = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._pending: Dict[str, Future] = {}
+        self._review_pages: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def cancel(self) -> None:
+        """
+        Starts a new generation of prefetches: the prefetches that have not started yet are cancelled, and the
+        running ones finish without being waited for.
+
+        Arguments:
+        None: this function does not take any arguments.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        with self._lock:
+            self.generation += 1
+            pending = list(self._pending.values())
+            self._pending.clear()
+            self._review_pages.clear()
+
+        # Cancelling a waiting future runs its done callback at once, which takes the lock again
+        for future in pending:
+            future.cancel()
+
+    def prefetch_description(self, asin: str, product_url: str) -> None:
+        """
+        Downloads the description of a product in the background, unless it is cached or already being
+        downloaded.
+
+        Arguments:
+        asin (str): the ASIN of the product.
+        product_url (str): the URL of the product page.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        if self.get_cached_description(asin) is not None:
+            return
+
+        with self._lock:
+            if asin in self._pending:
+                return
+            future = self._executor.submit(self._prefetch_description, self.generation, asin, product_url)
+            self._pending[asin] = future
+        future.add_done_callback(lambda done: self._forget(asin, done))
+
+    def prefetch_review_page(self, asin: str) -> None:
+        """
+        Downloads the first review page of a product in the background into the page cache, so that the scraping
+        of its reviews does not wait for it.
+
+        Arguments:
+        asin (str): the ASIN of the product.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        with self._lock:
+            if asin in self._review_pages:
+                return
+            self._review_pages.add(asin)
+            self._executor.submit(self._prefetch_review_page, self.generation, asin)
+
+    def get_cached_description(self, asin: str) -> Optional[str]:
+        """
+        Returns the description of a product if it has been downloaded, without waiting.
+
+        Arguments:
+        asin (str): the ASIN of the product.
+
+        Returns:
+        str or None: the description of the product, or None if it is not cached.
+        """
+        description = self.descriptions.get(asin)
+        return description.decode("utf-8") if description is not None else None
+
+    def get_description(self, asin: str, product_url: str, force_refresh: bool = False) -> Optional[str]:
+        """
+        Returns the description of a product: from the cache, from the prefetch downloading it, or by downloading
+        it now. This function blocks, and is meant to run in a background task.
+
+        Arguments:
+        asin (str): the ASIN of the product.
+        product_url (str): the URL of the product page.
+        force_refresh (bool): if True, the product page is downloaded again, ignoring all cached copies.
+
+        Returns:
+        str or None: the description of the product, or None if it has no description or could not be downloaded.
+        """
+        if force_refresh:
+            return self._fetch_description(asin, product_url, force_refresh=True)
+
+        description = self.get_cached_description(asin)
+        if description is not None:
+            return description
+
+        with self._lock:
+            future = self._pending.get(asin)
+        if future is not None:
+            try:
+                return future.result()
+            except CancelledError:
+                pass
+        return self._fetch_description(asin, product_url)
+
+    # Prefetches of a previous search that were already handed to a thread when they were cancelled are skipped
+    def _prefetch_description(self, generation: int, asin: str, product_url: str) -> Optional[str]:
+        if generation != self.generation:
+            return None
+        # Only a download waits for the rate limiter, a product page in the page cache is read at once
+        return self._fetch_description(asin, product_url, before_request=rate_limiter.wait)
+
+    def _prefetch_review_page(self, generation: int, asin: str) -> None:
+        if generation == self.generation:
+            fetch_page_html(get_review_page_url(asin, 1))
+
+    def _fetch_description(
+        self,
+        asin: str,
+        product_url: str,
+        force_refresh: bool = False,
+        before_request: Optional[Callable[[str], None]] = None,
+    ) -> Optional[str]:
+        description = scrape_amazon_product_description(
+            product_url, force_refresh=force_refresh, before_request=before_request
+        )
+        # Failed downloads also return None, they are not cached so that the next selection tries again
+        if description is not None:
+            self.descriptions.set(asin, description.encode("utf-8"))
+        return description
+
+    def _forget(self, asin: str, future: Future) -> None:
+        with self._lock:
+            if self._pending.get(asin) is future:
+                del self._pending[asin]
+
+    def shutdown(self) -> None:
+        """
+        Cancels the waiting prefetches and stops the background threads once the running ones are finished.
+
+        Arguments:
+        None: this function does not take any arguments.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,213 @@
+"""
+review_selector.py: Selects a few representative reviews to attach to the questions for ChatGPT, instead of all
+reviews. Similar reviews are grouped with k-means on their TF-IDF vectors, and each group is represented by the
+reviews closest to its center, taken from its different ratings and polarities, within a budget of tokens.
+"""
+
+import itertools
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from chatgpt_integration import format_review_for_prompt
+from config import CHATGPT_REPRESENTATIVES_PER_CLUSTER, CHATGPT_SELECTION_MAX_TOKENS
+from review_store import STARS_PATTERN
+from review_summarizer import count_tokens
+
+# Words of the TF-IDF vectors: runs of at least 3 letters
+WORD_PATTERN = re.compile(r"[a-z][a-z']{2,}")
+
+# Maximum number of words of the TF-IDF vectors, the words found in most reviews are kept
+MAX_FEATURES = 2000
+
+# Bounds of the polarity classes: negative below 0, neutral up to 0.25, positive above
+POLARITY_BOUNDS = (0.0, 0.25)
+
+# Number of k-means iterations, the clustering usually converges much earlier
+KMEANS_ITERATIONS = 20
+
+
+# Create a function to build the TF-IDF vectors of texts
+def get_tfidf_vectors(texts: List[str], max_features: int = MAX_FEATURES) -> np.ndarray:
+    """
+    Builds the TF-IDF vector of each text, with a logarithmic term frequency and a smoothed inverse document
+    frequency, normalized to a length of 1 so that the dot product of two vectors is their cosine similarity.
+    Words found in a single text are left out, as they do not make texts similar.
+
+    Arguments:
+    texts (List[str]): the texts.
+    max_features (int): the maximum number of words, the words found in most texts are kept.
+
+    Returns:
+    np.ndarray: a matrix with a row per text and a column per word (a single column of zeros if no word
+                is shared by two texts).
+    """
+    counts = [Counter(WORD_PATTERN.findall(text.lower())) for text in texts]
+    document_frequency = Counter(word for text_counts in counts for word in text_counts)
+    words = [word for word, frequency in document_frequency.most_common(max_features) if frequency > 1]
+    if not words:
+        return np.zeros((len(texts), 1), dtype=np.float32)
+
+    columns = {word: column for column, word in enumerate(words)}
+    vectors = np.zeros((len(texts), len(words)), dtype=np.float32)
+    for row, text_counts in enumerate(counts):
+        for word, count in text_counts.items():
+            if word in columns:
+                vectors[row, columns[word]] = 1.0 + np.log(count)
+
+    frequencies = np.array([document_frequency[word] for word in words], dtype=np.float32)
+    vectors *= np.log((1.0 + len(texts)) / (1.0 + frequencies)) + 1.0
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+# Create a function to group vectors with k-means
+def cluster_vectors(vectors: np.ndarray, clusters: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Groups normalized vectors into clusters with spherical k-means: every vector belongs to the center with the
+    highest cosine similarity, and the centers are the normalized means of their vectors. The first centers
+    are chosen with k-means++, from a generator with a fixed seed, so that the same reviews always give the
+    same clusters.
+
+    Arguments:
+    vectors (np.ndarray): the normalized vectors, one per row.
+    clusters (int): the number of clusters, at most the number of vectors.
+    seed (int): the seed of the random generator choosing the first centers.
+
+    Returns:
+    Tuple[np.ndarray, np.ndarray]: the cluster of each vector, and the cosine similarity of each vector to
+                                   the center of its cluster.
+    """
+    rng = np.random.default_rng(seed)
+    centers = [vectors[rng.integers(len(vectors))]]
+    distances = (1.0 - vectors @ centers[0]).astype(np.float64)
+    for _ in range(1, clusters):
+        distances = np.maximum(distances, 0.0)
+        total = distances.sum()
+        index = rng.choice(len(vectors), p=distances / total) if total > 0 else rng.integers(len(vectors))
+        centers.append(vectors[index])
+        distances = np.minimum(distances, 1.0 - vectors @ vectors[index])
+    center_matrix = np.array(centers)
+
+    labels = np.full(len(vectors), -1)
+    for _ in range(KMEANS_ITERATIONS):
+        new_labels = np.argmax(vectors @ center_matrix.T, axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for cluster in range(clusters):
+            members = vectors[labels == cluster]
+            if len(members):
+                center = members.sum(axis=0)
+                norm = np.linalg.norm(center)
+                center_matrix[cluster] = center / norm if norm > 0 else center
+
+    similarities = np.einsum("ij,ij->i", vectors, center_matrix[labels])
+    return labels, similarities
+
+
+# Create a function to find the stratum of a review
+def get_stratum(review: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    Returns the stratum of a review: its star rating rounded to a whole number (0 if it has no rating) and
+    its polarity class (0 negative, 1 neutral, 2 positive).
+
+    Arguments:
+    review (Dict[str, Any]): the review, with the keys 'review_stars' and 'textblob_polarity' if available.
+
+    Returns:
+    Tuple[int, int]: the star rating and the polarity class.
+    """
+    match = STARS_PATTERN.match(str(review.get("review_stars", "")))
+    stars = round(float(match.group(1).replace(",", "."))) if match else 0
+    polarity_class = int(np.digitize(float(review.get("textblob_polarity", 0.0)), POLARITY_BOUNDS, right=True))
+    return stars, polarity_class
+
+
+# Create a function to find the sentiment group of a review
+def get_sentiment_group(stratum: Tuple[int, int]) -> int:
+    """
+    Returns the sentiment group of a review from its stratum: 0 for critical reviews (1 or 2 stars), 1 for
+    mixed reviews (3 stars) and 2 for positive reviews (4 or 5 stars). Reviews without a rating are grouped
+    by their polarity class.
+
+    Arguments:
+    stratum (Tuple[int, int]): the star rating and the polarity class of the review, as returned by get_stratum.
+
+    Returns:
+    int: the sentiment group.
+    """
+    stars, polarity_class = stratum
+    if not stars:
+        return polarity_class
+    return 0 if stars <= 2 else 1 if stars == 3 else 2
+
+
+# Create a function to select representative reviews within a budget of tokens
+def select_representative_reviews(
+    reviews: List[Dict[str, Any]],
+    max_tokens: int = CHATGPT_SELECTION_MAX_TOKENS,
+    per_cluster: int = CHATGPT_REPRESENTATIVES_PER_CLUSTER,
+) -> List[Dict[str, Any]]:
+    """
+    Selects reviews representing all reviews, whose text fits into max_tokens tokens. If all reviews fit, they
+    are all returned. Otherwise the critical, mixed and positive reviews are clustered separately, so that the
+    complaints of a few critical reviews are not merged into the clusters of the many positive ones. Each group
+    gets an equal share of the budget, whatever its size, and as many clusters as its share has room for
+    per_cluster reviews each. Each cluster takes turns between its strata (star rating and polarity),
+    starting with its reviews closest to the center. The clusters then take turns for their representatives,
+    critical groups and the most negative clusters first, and the reviews are added while they fit into the
+    budget.
+
+    Arguments:
+    reviews (List[Dict[str, Any]]): the reviews, each with the keys 'review_title', 'review_date' and
+                                    'review_text', and 'review_stars' and 'textblob_polarity' if available.
+    max_tokens (int): the maximum number of tokens of the text of the selected reviews.
+    per_cluster (int): the number of reviews selected from each cluster.
+
+    Returns:
+    List[Dict[str, Any]]: the selected reviews, in their original order.
+    """
+    tokens = np.array([count_tokens(format_review_for_prompt(review)) for review in reviews])
+    if tokens.sum() <= max_tokens:
+        return list(reviews)
+
+    vectors = get_tfidf_vectors([f"{review['review_title']} {review['review_text']}" for review in reviews])
+    polarities = np.array([float(review.get("textblob_polarity", 0.0)) for review in reviews])
+    strata = [get_stratum(review) for review in reviews]
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for index, stratum in enumerate(strata):
+        groups[get_sentiment_group(stratum)].append(index)
+
+    # The representatives of each cluster, taking turns between the strata of the cluster
+    representatives: List[List[int]] = []
+    for group in sorted(groups):
+        indices = np.array(groups[group])
+        share = max_tokens / len(groups)
+        clusters = min(len(indices), max(1, round(share / tokens[indices].mean() / max(1, per_cluster))))
+        labels, similarities = cluster_vectors(vectors[indices], clusters)
+
+        cluster_strata: Dict[int, Dict[Tuple[int, int], List[int]]] = defaultdict(lambda: defaultdict(list))
+        for position in np.argsort(-similarities, kind="stable"):
+            cluster_strata[labels[position]][strata[indices[position]]].append(int(indices[position]))
+        group_representatives = [
+            [index for turn in itertools.zip_longest(*stratum.values()) for index in turn if index is not None]
+            for stratum in cluster_strata.values()
+        ]
+        representatives.extend(sorted(group_representatives, key=lambda cluster: polarities[cluster].mean()))
+
+    selected: List[int] = []
+    remaining = max_tokens
+    for turn in range(per_cluster):
+        for cluster in representatives:
+            if turn < len(cluster) and tokens[cluster[turn]] <= remaining:
+                selected.append(cluster[turn])
+                remaining -= tokens[cluster[turn]]
+
+    if not selected:
+        # No representative fits into the budget: keep the shortest review, which is shortened further later
+        selected.append(int(np.argmin(tokens)))
+
+    return [reviews[index] for index in sorted(selected)]
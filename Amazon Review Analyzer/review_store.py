@@ -0,0 +1,311 @@
+"""
+review_store.py: Contains the columnar container holding the scraped reviews. Every field of the reviews is
+kept in its own column, so that filtering and aggregating the reviews runs as NumPy operations on whole columns
+instead of Python loops over dictionaries.
+"""
+
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Columns of the store and the value used for reviews missing a field
+REVIEW_COLUMNS = {
+    "review_id": "",
+    "review_title": "No title",
+    "review_date": "No date",
+    "review_stars": "No rating",
+    "review_text": "No review text",
+    "textblob_polarity": 0.0,
+    "textblob_subjectivity": 0.0,
+}
+
+# Patterns extracting the number of stars from the rating text and the date from the date text
+STARS_PATTERN = re.compile(r"^\s*(\d+(?:[.,]\d+)?)")
+DATE_PATTERN = re.compile(r"([A-Z][a-z]+ \d{1,2}, \d{4})")
+
+
+# Create a function to turn positions of reviews into an index array
+def as_positions(positions: Iterable[int]) -> np.ndarray:
+    """
+    Converts the given positions into a NumPy array of integers, without copying if they already are one.
+
+    Arguments:
+    positions (Iterable[int]): the positions of reviews in a store.
+
+    Returns:
+    np.ndarray: the positions as an integer array.
+    """
+    if not isinstance(positions, np.ndarray):
+        positions = np.fromiter(positions, dtype=np.int64)
+    return positions.astype(np.int64, copy=False)
+
+
+# Create a class to answer range queries on numerical columns
+class SortedRangeIndex:
+    """
+    A range index over numerical columns: for every column, the positions of the rows are kept sorted by
+    the value of the column. The rows within a range are then found with two binary searches. For a query on
+    several columns, the column whose range contains the fewest rows is searched, and only these candidates
+    are checked against the ranges of the other columns. NaN values never match a range. Appended rows are
+    merged into the sorted positions, so the index never has to be sorted again.
+
+    Arguments:
+    columns (Dict[str, np.ndarray]): the indexed columns, all of the same length.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]) -> None:
+        self.columns = columns
+        self.orders = {name: np.argsort(values, kind="stable") for name, values in columns.items()}
+        self.sorted_values = {name: values[self.orders[name]] for name, values in columns.items()}
+
+    def extend(self, columns: Dict[str, np.ndarray]) -> None:
+        """
+        Adds the rows appended to the indexed columns. Only the new rows are sorted, and they are then inserted
+        into the sorted positions with binary searches, after the existing rows with the same value.
+
+        Arguments:
+        columns (Dict[str, np.ndarray]): the indexed columns, starting with the rows already in the index.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        start = len(next(iter(self.columns.values()), []))
+        for name, values in columns.items():
+            new_order = np.argsort(values[start:], kind="stable")
+            new_values = values[start:][new_order]
+            insert_at = np.searchsorted(self.sorted_values[name], new_values, side="right")
+            self.orders[name] = np.insert(self.orders[name], insert_at, new_order + start)
+            self.sorted_values[name] = np.insert(self.sorted_values[name], insert_at, new_values)
+        self.columns = columns
+
+    def query(self, ranges: Dict[str, Tuple[float, float]]) -> np.ndarray:
+        """
+        Finds the rows whose values lie within the given inclusive range of every given column.
+
+        Arguments:
+        ranges (Dict[str, Tuple[float, float]]): the minimum and maximum value of each queried column.
+
+        Returns:
+        np.ndarray: the sorted positions of the matching rows.
+        """
+        if not ranges:
+            return np.arange(len(next(iter(self.columns.values()), [])))
+
+        # Locate the range of each column in its sorted values and start with the narrowest one
+        bounds = {
+            name: (
+                np.searchsorted(self.sorted_values[name], minimum, side="left"),
+                np.searchsorted(self.sorted_values[name], maximum, side="right"),
+            )
+            for name, (minimum, maximum) in ranges.items()
+        }
+        narrowest = min(bounds, key=lambda name: bounds[name][1] - bounds[name][0])
+        start, end = bounds[narrowest]
+        candidates = self.orders[narrowest][start:end]
+
+        for name, (minimum, maximum) in ranges.items():
+            if name != narrowest and len(candidates):
+                values = self.columns[name][candidates]
+                candidates = candidates[(values >= minimum) & (values <= maximum)]
+        return np.sort(candidates)
+
+
+# Create a class to store the reviews column by column
+class ReviewStore:
+    """
+    Holds the reviews with one list per field, together with NumPy arrays of the numerical columns: the
+    polarity, the subjectivity, the number of stars parsed from the rating text ('4.0 out of 5 stars') and
+    the date parsed from the date text ('Reviewed in ... on April 20, 2023'). Reviews without a rating or
+    a valid date have NaN stars and NaT dates.
+
+    Reviews scraped later are added with extend(), which only parses the new reviews and merges them into
+    the range index, so that the store never has to be built again while the pages of a product arrive.
+
+    Arguments:
+    reviews (List[Dict[str, Any]]): the reviews returned by the scraping functions.
+    """
+
+    def __init__(self, reviews: Optional[List[Dict[str, Any]]] = None) -> None:
+        self.columns: Dict[str, List[Any]] = {name: [] for name in REVIEW_COLUMNS}
+        self.polarity = np.zeros(0)
+        self.subjectivity = np.zeros(0)
+        self.stars = np.zeros(0)
+        self.dates = np.zeros(0, dtype="datetime64[ns]")
+        # Many reviews share the same rating and date, so every distinct text is only parsed once
+        self._parsed_stars: Dict[str, float] = {}
+        self._parsed_dates: Dict[str, np.datetime64] = {}
+
+        # Build the index used by filter() once, so that filtering while the user types stays fast
+        self.index = SortedRangeIndex(
+            {"polarity": self.polarity, "subjectivity": self.subjectivity, "stars": self.stars}
+        )
+        self.extend(reviews or [])
+
+    def extend(self, reviews: List[Dict[str, Any]]) -> None:
+        """
+        Appends the given reviews to the store, e.g. the reviews of a newly scraped page. Only the new reviews
+        are parsed, and they are merged into the range index, so that adding a page does not depend on the
+        number of reviews already in the store, apart from copying the numerical columns.
+
+        Arguments:
+        reviews (List[Dict[str, Any]]): the reviews to append, in the format of the scraping functions.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        if not reviews:
+            return
+
+        start = len(self)
+        for name, default in REVIEW_COLUMNS.items():
+            self.columns[name].extend(default if review.get(name) is None else review[name] for review in reviews)
+
+        polarity = np.array(self.columns["textblob_polarity"][start:], dtype=float)
+        subjectivity = np.array(self.columns["textblob_subjectivity"][start:], dtype=float)
+        stars = np.array([self._parse_stars(str(text)) for text in self.columns["review_stars"][start:]], dtype=float)
+        dates = np.array(
+            [self._parse_date(str(text)) for text in self.columns["review_date"][start:]], dtype="datetime64[ns]"
+        )
+        self.polarity = np.concatenate([self.polarity, polarity])
+        self.subjectivity = np.concatenate([self.subjectivity, subjectivity])
+        self.stars = np.concatenate([self.stars, stars])
+        self.dates = np.concatenate([self.dates, dates])
+        self.index.extend({"polarity": self.polarity, "subjectivity": self.subjectivity, "stars": self.stars})
+
+    def _parse_stars(self, text: str) -> float:
+        # Parse "4.0 out of 5 stars" or "4,0 von 5 Sternen"
+        if text not in self._parsed_stars:
+            match = STARS_PATTERN.match(text)
+            self._parsed_stars[text] = float(match.group(1).replace(",", ".")) if match else np.nan
+        return self._parsed_stars[text]
+
+    def _parse_date(self, text: str) -> np.datetime64:
+        # Parse "Reviewed in the United States on April 20, 2023"
+        if text not in self._parsed_dates:
+            match = DATE_PATTERN.search(text)
+            try:
+                date = datetime.strptime(match.group(1), "%B %d, %Y") if match else None
+            except ValueError:
+                date = None
+            self._parsed_dates[text] = np.datetime64(date, "ns") if date else np.datetime64("NaT", "ns")
+        return self._parsed_dates[text]
+
+    def __len__(self) -> int:
+        return len(self.polarity)
+
+    def filter(
+        self,
+        min_subjectivity: float = 0.0,
+        max_subjectivity: float = 1.0,
+        min_polarity: float = -1.0,
+        max_polarity: float = 1.0,
+        min_stars: Optional[float] = None,
+        max_stars: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Selects the reviews whose scores lie within the given inclusive ranges, using the range index of
+        the store. The star range is only applied if it is given, and then excludes reviews without a rating.
+
+        Arguments:
+        min_subjectivity (float): the minimum subjectivity.
+        max_subjectivity (float): the maximum subjectivity.
+        min_polarity (float): the minimum polarity.
+        max_polarity (float): the maximum polarity.
+        min_stars (float): the minimum number of stars, or None for no minimum.
+        max_stars (float): the maximum number of stars, or None for no maximum.
+
+        Returns:
+        np.ndarray: the positions of the matching reviews, in the order of the store.
+        """
+        ranges = {"subjectivity": (min_subjectivity, max_subjectivity), "polarity": (min_polarity, max_polarity)}
+        if min_stars is not None or max_stars is not None:
+            ranges["stars"] = (
+                min_stars if min_stars is not None else -np.inf,
+                max_stars if max_stars is not None else np.inf,
+            )
+        return self.index.query(ranges)
+
+    def sort(self, positions: np.ndarray, by: str, descending: bool = False) -> np.ndarray:
+        """
+        Orders the reviews at the given positions by their stars, date or polarity. Reviews with the same
+        value keep their order, and reviews without a rating or date come last in both directions.
+
+        Arguments:
+        positions (np.ndarray): the positions of the reviews to order.
+        by (str): the column to order by: 'stars', 'date' or 'polarity'.
+        descending (bool): if True, the highest values (e.g. the newest dates) come first.
+
+        Returns:
+        np.ndarray: the given positions in the new order.
+
+        Raises:
+        ValueError: if the column is not supported.
+        """
+        if by == "date":
+            dates = self.dates[positions]
+            values = dates.astype("datetime64[s]").astype(np.int64).astype(float)
+            values[np.isnat(dates)] = np.nan
+        elif by in ("stars", "polarity"):
+            values = getattr(self, by)[positions]
+        else:
+            raise ValueError(f"Unknown sort column: {by}")
+
+        # argsort places NaN last, negating the values keeps them last when sorting in descending order
+        order = np.argsort(-values if descending else values, kind="stable")
+        return positions[order]
+
+    def get_review_ids(self, positions: Iterable[int]) -> List[str]:
+        """
+        Returns the identifiers of the reviews at the given positions.
+
+        Arguments:
+        positions (Iterable[int]): the positions of the reviews.
+
+        Returns:
+        List[str]: the identifier of each review.
+        """
+        review_ids = self.columns["review_id"]
+        return [str(review_ids[position]) for position in as_positions(positions)]
+
+    def get_reviews(self, positions: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Returns the reviews at the given positions as dictionaries, in the format of the scraping functions.
+
+        Arguments:
+        positions (Iterable[int]): the positions of the reviews, all reviews if None.
+
+        Returns:
+        List[Dict[str, Any]]: a dictionary per review.
+        """
+        positions = range(len(self)) if positions is None else as_positions(positions).tolist()
+        return [{name: values[position] for name, values in self.columns.items()} for position in positions]
+
+    def get_texts(self, positions: Optional[Iterable[int]] = None) -> List[str]:
+        """
+        Returns the texts of the reviews at the given positions.
+
+        Arguments:
+        positions (Iterable[int]): the positions of the reviews, all reviews if None.
+
+        Returns:
+        List[str]: the text of each review.
+        """
+        texts = self.columns["review_text"]
+        if positions is None:
+            return [str(text) for text in texts]
+        return [str(texts[position]) for position in as_positions(positions)]
+
+    def average_polarity(self, positions: Optional[np.ndarray] = None) -> float:
+        """
+        Computes the average polarity of the reviews at the given positions.
+
+        Arguments:
+        positions (np.ndarray): the positions of the reviews, all reviews if None.
+
+        Returns:
+        float: the average polarity, 0 if there are no reviews.
+        """
+        polarity = self.polarity if positions is None else self.polarity[positions]
+        return float(polarity.mean()) if len(polarity) else 0.0
@@ -0,0 +1,220 @@
+"""
+review_summarizer.py: Condenses the scraped reviews into a text short enough to be attached to a question for
+ChatGPT. Reviews that do not fit into one question are split into chunks of a limited number of tokens, the chunks
+are summarized at the same time, and the summaries are combined in further rounds until they fit into one question.
+"""
+
+import functools
+import logging
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+from chatgpt_integration import format_review_for_prompt, request_chatgpt
+from config import (
+    CHATGPT_MAX_CONCURRENT_REQUESTS,
+    CHATGPT_MODEL,
+    CHATGPT_PROMPT_MAX_TOKENS,
+    CHATGPT_SUMMARY_TIME_BUDGET,
+)
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Number of letters counted as one token if tiktoken is not available. English text has about 4 letters per
+# token, fewer are counted so that the estimated chunks stay within the limits of the model.
+ESTIMATED_CHARS_PER_TOKEN = 3
+
+# Question asked about each chunk of reviews
+CHUNK_INSTRUCTION = (
+    "Summarize the positive and negative points and the problems raised in the following reviews "
+    "in at most 10 short bullet points. Only display the bullet points, no additional text.\n"
+)
+
+# Question asked about each group of summaries, to combine them into one summary
+COMBINE_INSTRUCTION = (
+    "Combine the following summaries of product reviews into at most 10 short bullet points about "
+    "the positive and negative points and the problems raised. Only display the bullet points, no additional text.\n"
+)
+
+
+# Create a function to get the tokenizer of a model
+@functools.lru_cache(maxsize=None)
+def get_encoding(model: str = CHATGPT_MODEL) -> Optional[Any]:
+    """
+    Returns the tiktoken encoding used by the given model, loaded once per model.
+
+    Arguments:
+    model (str): the name of the model, CHATGPT_MODEL by default.
+
+    Returns:
+    tiktoken.Encoding or None: the encoding, or None if tiktoken is not installed or the encoding could not
+                               be loaded, in which case the tokens are estimated from the number of letters.
+    """
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            # Unknown models are assumed to use the encoding of the current OpenAI chat models
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:  # pylint: disable=broad-except
+        # The encodings are downloaded on first use
+        logging.error(f"Could not load the tokenizer of {model}: {e}")
+        return None
+
+
+# Create a function to count the tokens of a text
+def count_tokens(text: str, model: str = CHATGPT_MODEL) -> int:
+    """
+    Counts the tokens of a text with the tokenizer of the given model, or estimates them if it is not available.
+
+    Arguments:
+    text (str): the text.
+    model (str): the name of the model, CHATGPT_MODEL by default.
+
+    Returns:
+    int: the number of tokens.
+    """
+    encoding = get_encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / ESTIMATED_CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+# Create a function to shorten a text to a number of tokens
+def truncate_to_tokens(text: str, max_tokens: int, model: str = CHATGPT_MODEL) -> str:
+    """
+    Returns the beginning of a text with at most max_tokens tokens.
+
+    Arguments:
+    text (str): the text.
+    max_tokens (int): the maximum number of tokens.
+    model (str): the name of the model, CHATGPT_MODEL by default.
+
+    Returns:
+    str: the text, shortened if it has more than max_tokens tokens.
+    """
+    encoding = get_encoding(model)
+    if encoding is None:
+        return text[: max_tokens * ESTIMATED_CHARS_PER_TOKEN]
+    tokens = encoding.encode(text)
+    return text if len(tokens) <= max_tokens else str(encoding.decode(tokens[:max_tokens]))
+
+
+# Create a function to group texts into chunks of a limited number of tokens
+def split_into_chunks(texts: List[str], max_tokens: int) -> List[str]:
+    """
+    Joins consecutive texts into chunks of at most max_tokens tokens, keeping their order. Texts longer than
+    a chunk are shortened to max_tokens tokens and form a chunk on their own.
+
+    Arguments:
+    texts (List[str]): the texts, e.g. one per review.
+    max_tokens (int): the maximum number of tokens of a chunk.
+
+    Returns:
+    List[str]: the chunks.
+    """
+    chunks: List[str] = []
+    chunk: List[str] = []
+    chunk_tokens = 0
+
+    for text in texts:
+        tokens = count_tokens(text)
+        if tokens > max_tokens:
+            text = truncate_to_tokens(text, max_tokens)
+            tokens = count_tokens(text)
+        if chunk and chunk_tokens + tokens > max_tokens:
+            chunks.append("".join(chunk))
+            chunk, chunk_tokens = [], 0
+        chunk.append(text)
+        chunk_tokens += tokens
+
+    if chunk:
+        chunks.append("".join(chunk))
+    return chunks
+
+
+# Create a function to summarize chunks of text at the same time
+def summarize_chunks(instruction: str, chunks: List[str], max_workers: int, deadline: float) -> List[str]:
+    """
+    Asks ChatGPT the instruction about each chunk, up to max_workers chunks at the same time, and waits for the
+    answers until the deadline. Chunks not answered by then, or whose request failed, are left out. The requests
+    still running at the deadline are not stopped, but their answers end up in the response cache.
+
+    Arguments:
+    instruction (str): the question asked about each chunk.
+    chunks (List[str]): the chunks.
+    max_workers (int): the maximum number of requests sent at the same time.
+    deadline (float): the time.monotonic() value after which no more answers are awaited.
+
+    Returns:
+    List[str]: the answers, in the order of their chunks.
+    """
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks))), thread_name_prefix="summary")
+    futures = [executor.submit(request_chatgpt, f"{instruction}{chunk}") for chunk in chunks]
+    done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    if not_done:
+        logging.info(f"{len(not_done)} of {len(chunks)} chunks of reviews were not summarized in time")
+
+    summaries = []
+    for future in futures:
+        if future not in done:
+            continue
+        try:
+            summaries.append(f"{future.result()}\n")
+        except Exception as e:  # pylint: disable=broad-except
+            logging.error(f"Could not summarize a chunk of reviews: {e}")
+    return summaries
+
+
+# Create a function to condense reviews into a text that fits into one question
+def condense_reviews(
+    reviews: List[Dict[str, str]],
+    max_tokens: int = CHATGPT_PROMPT_MAX_TOKENS,
+    max_workers: int = CHATGPT_MAX_CONCURRENT_REQUESTS,
+    time_budget: float = CHATGPT_SUMMARY_TIME_BUDGET,
+) -> str:
+    """
+    Returns the text of the reviews to attach to a question for ChatGPT, with at most max_tokens tokens. If all
+    reviews fit, their text is returned as it is. Otherwise the reviews are split into chunks of max_tokens
+    tokens, each chunk is summarized, and the summaries are combined in groups that fit into one question,
+    round after round, until all of them fit. The rounds stop at the end of the time budget, and whatever
+    summaries are available by then are returned, shortened to max_tokens tokens if needed.
+
+    Arguments:
+    reviews (List[Dict[str, str]]): the reviews, each with the keys 'review_title', 'review_date' and 'review_text'.
+    max_tokens (int): the maximum number of tokens of the returned text and of each chunk.
+    max_workers (int): the maximum number of requests sent to ChatGPT at the same time.
+    time_budget (float): the number of seconds allowed for summarizing and combining the chunks.
+
+    Returns:
+    str: the text of the reviews, or a summary of them.
+    """
+    deadline = time.monotonic() + time_budget
+    texts = [format_review_for_prompt(review) for review in reviews]
+    if sum(count_tokens(text) for text in texts) <= max_tokens:
+        return "".join(texts)
+
+    chunks = split_into_chunks(texts, max_tokens)
+    instruction = CHUNK_INSTRUCTION
+    while True:
+        summaries = summarize_chunks(instruction, chunks, max_workers, deadline)
+        logging.info(f"Summarized {len(summaries)} of {len(chunks)} chunks of reviews")
+        if not summaries:
+            # Nothing was summarized, e.g. because the API key is wrong: attach the beginning of the chunks instead
+            return truncate_to_tokens("".join(chunks), max_tokens)
+
+        combined_chunks = split_into_chunks(summaries, max_tokens)
+        if len(combined_chunks) == 1:
+            return combined_chunks[0]
+        if len(combined_chunks) >= len(chunks) or time.monotonic() >= deadline:
+            # The summaries do not get shorter, or there is no time left to combine them
+            return truncate_to_tokens("".join(summaries), max_tokens)
+        chunks, instruction = combined_chunks, COMBINE_INSTRUCTION
@@ -0,0 +1,239 @@
+"""
+review_viewer.py: Contains the list showing the scraped reviews in the GUI. Only the reviews in view are written
+into the text widget, and the scrollbar is driven by the position in the whole list, so that scrolling through
+tens of thousands of reviews costs the same as showing a single page of them.
+"""
+
+import bisect
+import itertools
+import tkinter as tk
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from config import REVIEW_WINDOW_SIZE
+from review_store import ReviewStore
+
+
+# Create a function to format a review for display
+def format_review(review: Dict[str, Any]) -> str:
+    """
+    Formats the details of a review for display in the text area: the title, rating, date, polarity,
+    subjectivity, and the review text itself. Each review ends with a line of dashes for clarity.
+
+    Arguments:
+    review (Dict[str, Any]): a dictionary containing the details of a review. Expected keys are
+                             'review_title', 'review_stars', 'review_date', 'textblob_polarity',
+                             'textblob_subjectivity', and 'review_text'.
+
+    Returns:
+    str: the formatted review.
+    """
+    return (
+        f"Title: {review['review_title']}\n"
+        f"Rating: {review['review_stars']}\n"
+        f"Date: {review['review_date']}\n"
+        f"Polarity: {review['textblob_polarity']:.2f}, "
+        f"Subjectivity: {review['textblob_subjectivity']:.2f}\n"
+        f"Review: {review['review_text']}\n"
+        "---------------------------------------------\n"
+    )
+
+
+# Create a class to show a long list of reviews in a text widget
+class ReviewListView:
+    """
+    A virtualized list of reviews: the text widget only holds the window of window_size reviews starting at
+    self.first, and the scrollbar shows the position of the visible reviews in the whole list. The mouse wheel
+    and the arrows of the scrollbar scroll the text line by line, so that long reviews can be read to the end.
+    At the top or bottom of the text, they move the window by one review instead, writing its reviews into the
+    text widget again and keeping the visible lines in place. Dragging the slider jumps to any review, and one
+    page is window_size reviews.
+
+    Arguments:
+    text_widget (tk.Text): the text widget showing the reviews.
+    scrollbar (tk.Scrollbar): the vertical scrollbar of the list.
+    window_size (int): the number of reviews written into the text widget.
+    empty_text (str): the text shown if there are no reviews to show.
+    on_scroll (Callable[[int, int, int], None]): called with the index of the first visible review, the index
+                                                 after the last visible review and the number of reviews
+                                                 whenever the view changes.
+    """
+
+    # The number of lines scrolled by one step of the mouse wheel
+    WHEEL_LINES = 3
+
+    def __init__(
+        self,
+        text_widget: tk.Text,
+        scrollbar: tk.Scrollbar,
+        window_size: int = REVIEW_WINDOW_SIZE,
+        empty_text: str = "No reviews matching the filtering criteria.\n",
+        on_scroll: Optional[Callable[[int, int, int], None]] = None,
+    ) -> None:
+        self.text_widget = text_widget
+        self.scrollbar = scrollbar
+        self.window_size = window_size
+        self.empty_text = empty_text
+        self.on_scroll = on_scroll
+        self.store = ReviewStore()
+        self.positions = np.arange(0)
+        self.first = 0
+        # The line of the text widget on which each review of the window starts
+        self._line_starts: List[int] = []
+
+        self.scrollbar.config(command=self.yview)
+        # Windows and macOS send MouseWheel events, X11 sends Button-4 and Button-5
+        self.text_widget.bind(
+            "<MouseWheel>",
+            lambda event: self.on_mouse_wheel(-self.WHEEL_LINES if event.delta > 0 else self.WHEEL_LINES),
+        )
+        self.text_widget.bind("<Button-4>", lambda event: self.on_mouse_wheel(-self.WHEEL_LINES))
+        self.text_widget.bind("<Button-5>", lambda event: self.on_mouse_wheel(self.WHEEL_LINES))
+        # The number of visible reviews changes with the height of the widget
+        self.text_widget.bind("<Configure>", lambda event: self.update_view())
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def set_reviews(self, store: ReviewStore, positions: np.ndarray, keep_position: bool = False) -> None:
+        """
+        Replaces the listed reviews with the reviews at the given positions of the store, in the given order.
+
+        Arguments:
+        store (ReviewStore): the store holding the reviews.
+        positions (np.ndarray): the positions of the reviews to list, in the order they are listed.
+        keep_position (bool): if True, the list stays at the same index (e.g. when reviews are added while
+                              the user reads them), otherwise it goes back to the first review.
+
+        Returns:
+        None: this function does not return any value but updates the text widget and the scrollbar.
+        """
+        self.store = store
+        self.positions = positions
+        self.scroll_to(self.first if keep_position else 0, force=True)
+
+    def scroll_to(self, first: int, force: bool = False) -> None:
+        """
+        Shows the window of reviews starting at the given index, clamped to the listed reviews.
+
+        Arguments:
+        first (int): the index of the first review to show.
+        force (bool): if True, the window is written again even if it starts at the same review.
+
+        Returns:
+        None: this function does not return any value but updates the text widget and the scrollbar.
+        """
+        first = max(0, min(int(first), len(self.positions) - self.window_size))
+        if first != self.first or force:
+            self.first = first
+            self.render()
+
+    def yview(self, *args: Any) -> None:
+        """
+        Handles the commands of the scrollbar: ('moveto', fraction) when the slider is dragged, and
+        ('scroll', number, 'units' or 'pages') when the arrows or the trough are clicked. A unit is a line
+        of text and a page is window_size reviews.
+
+        Arguments:
+        *args (Any): the command and its arguments, as sent by the scrollbar.
+
+        Returns:
+        None: this function does not return any value but updates the text widget and the scrollbar.
+        """
+        if args[0] == "moveto":
+            self.scroll_to(round(float(args[1]) * len(self.positions)))
+        elif args[0] == "scroll" and args[2] == "pages":
+            self.scroll_to(self.first + int(args[1]) * self.window_size)
+        elif args[0] == "scroll":
+            self.scroll_lines(int(args[1]))
+
+    def on_mouse_wheel(self, units: int) -> str:
+        """
+        Scrolls the list by the given number of lines.
+
+        Arguments:
+        units (int): the number of lines to scroll, negative to scroll up.
+
+        Returns:
+        str: 'break', so that the text widget does not also scroll its content with its own bindings.
+        """
+        self.scroll_lines(units)
+        return "break"
+
+    def scroll_lines(self, units: int) -> None:
+        """
+        Scrolls the text by the given number of lines. If the text is already scrolled to its bottom (or top),
+        the window is moved by one review towards the end (or start) of the list first.
+
+        Arguments:
+        units (int): the number of lines to scroll, negative to scroll up.
+
+        Returns:
+        None: this function does not return any value but updates the text widget and the scrollbar.
+        """
+        top, bottom = self.text_widget.yview()
+        if units > 0 and bottom >= 1.0 and self.first + self.window_size < len(self.positions):
+            self._move_window(1)
+        elif units < 0 and top <= 0.0 and self.first > 0:
+            self._move_window(-1)
+        self.text_widget.yview_scroll(units, "units")
+        self.update_view()
+
+    def _move_window(self, step: int) -> None:
+        # Write the moved window and scroll the text by the lines of the removed or added first review, so that
+        # the lines the user is reading stay where they are
+        top_line = self._get_line("@0,0")
+        if step > 0:
+            top_line -= self._line_starts[1] - 1 if len(self._line_starts) > 1 else 0
+        self.scroll_to(self.first + step)
+        if step < 0:
+            top_line += self._line_starts[1] - 1 if len(self._line_starts) > 1 else 0
+        self.text_widget.yview(f"{max(top_line, 1)}.0")
+
+    def _get_line(self, index: str) -> int:
+        return int(self.text_widget.index(index).split(".")[0])
+
+    def update_view(self) -> None:
+        """
+        Updates the scrollbar to the reviews visible in the text widget, and reports them to on_scroll.
+
+        Arguments:
+        None: this function does not take any arguments.
+
+        Returns:
+        None: this function does not return any value but updates the scrollbar.
+        """
+        total = len(self.positions)
+        if not total:
+            first = last = 0
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            # The reviews on the first and last visible line, found among the lines on which the reviews start
+            top_line = self._get_line("@0,0")
+            bottom_line = self._get_line(f"@0,{self.text_widget.winfo_height()}")
+            first = self.first + max(bisect.bisect_right(self._line_starts, top_line) - 1, 0)
+            last = self.first + bisect.bisect_right(self._line_starts, bottom_line)
+            self.scrollbar.set(first / total, last / total)
+
+        if self.on_scroll is not None:
+            self.on_scroll(first, last, total)
+
+    def render(self) -> None:
+        """
+        Writes the reviews of the current window into the text widget with a single insert, scrolled to its
+        first line, and updates the scrollbar.
+
+        Arguments:
+        None: this function does not take any arguments.
+
+        Returns:
+        None: this function does not return any value but updates the text widget and the scrollbar.
+        """
+        window = self.positions[self.first : self.first + self.window_size]
+        texts = [format_review(review) for review in self.store.get_reviews(window)]
+        self._line_starts = list(itertools.accumulate((text.count("\n") for text in texts[:-1]), initial=1))
+
+        self.text_widget.delete("1.0", tk.END)
+        self.text_widget.insert("1.0", "".join(texts) if texts else self.empty_text)
+        self.update_view()
@@ -2,17 +2,44 @@
 scraping_utils.py: Contains functions and utilities for scraping data from Amazon.
 """
 
+import atexit
+import hashlib
+import json
 import logging
-import random
+import multiprocessing
+import os
 import re
-from typing import Dict, List, Optional, Any
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Optional, Any, Tuple
+from urllib.parse import urlsplit
 
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
-
-from config import HEADERS, USER_AGENTS
-from data_analysis import analyze_sentiment_with_textblob
+from lxml import etree, html as lxml_html
+
+from cache_utils import DiskCache
+from config import (
+    CACHE_DIR,
+    MAX_CONCURRENT_REQUESTS,
+    PARSE_POOL_MIN_PAGES,
+    PARSE_WORKERS,
+    REQUESTS_PER_SECOND_PER_HOST,
+    REVIEW_STORE_DIR,
+    REVIEW_STORE_MAX_AGE,
+    REVIEW_STORE_MAX_REVIEWS,
+    SEARCH_CACHE_ENABLED,
+    SEARCH_CACHE_MAX_BYTES,
+    SEARCH_CACHE_TTL,
+    SENTIMENT_ENGINE,
+)
+from data_analysis import analyze_sentiments, get_sentiment_cache_stats
+from http_client import fetch_url, get_cache_stats, get_connection_stats
 
 # Initialize global variables
 all_results: List[Dict[str, Any]] = []
@@ -20,28 +47,123 @@ product_df = pd.DataFrame()
 product_id: str = ""
 product_url = ""
 
+# Declarative description of the review fields: for each field, the (tag, attribute, value) selectors
+# that locate it, in order of preference, and the value used if none of them matches
+REVIEW_FIELD_SELECTORS: Dict[str, List[Tuple[str, str, str]]] = {
+    "review_text": [
+        ("span", "class", "a-size-base review-text review-text-content"),
+        ("span", "data-hook", "review-body"),
+    ],
+    "review_date": [("span", "class", "review-date")],
+    "review_title": [
+        ("a", "class", "a-size-base a-link-normal review-title a-color-base review-title-content a-text-bold"),
+        ("a", "data-hook", "review-title"),
+    ],
+    "review_stars": [("span", "class", "a-icon-alt")],
+}
+REVIEW_FIELD_DEFAULTS = {
+    "review_text": "No review text",
+    "review_date": "No date",
+    "review_title": "No title",
+    "review_stars": "No rating",
+}
+
+# Ids of the containers of the product description in the different layouts of the product pages, in their order
+# of precedence: feature bullets, product facts, book description, and the description at the bottom of the page
+DESCRIPTION_LAYOUTS = (
+    "feature-bullets",
+    "productFactsDesktopExpander",
+    "bookDescription_feature_div",
+    "productDescription",
+)
+
+# Selectors of the description layouts: the bullet lists, their items and the text of an item
+BULLET_LIST_XPATH = etree.XPath(".//ul[contains(concat(' ', normalize-space(@class), ' '), ' a-unordered-list ')]")
+LIST_ITEM_TEXT_XPATH = etree.XPath("(.//span[contains(concat(' ', normalize-space(@class), ' '), ' a-list-item ')])[1]")
+
+# Selectors of the search results: the outermost elements with the ASIN of a product, the spans of the product name
+# ('a-size-medium', 'a-size-base-plus', ...) and the link to the product page
+SEARCH_RESULT_XPATH = etree.XPath("//div[@data-asin != ''][not(ancestor::div[@data-asin != ''])]")
+PRODUCT_NAME_XPATH = etree.XPath(".//span[contains(concat(' ', normalize-space(@class)), ' a-size-')]")
+PRODUCT_LINK_XPATH = etree.XPath(
+    "(.//a[contains(concat(' ', normalize-space(@class), ' '), ' a-link-normal ')])[1]/@href"
+)
+
+# Opening tag of a review element, where the parse of a review page starts, or of a script or comment, whose content
+# is skipped as it may contain the same text, e.g. in the templates and JSON data of the page
+REVIEW_START_PATTERN = re.compile(
+    r"""<(?:(?P<skipped>script\b|!--)|div\b[^>]*?\sdata-hook\s*=\s*["']?review(?=["'\s/>]))""", re.IGNORECASE
+)
+SKIPPED_END_PATTERNS = {"script": re.compile(r"</script\s*>", re.IGNORECASE), "!--": re.compile(r"-->")}
+
+
+# Create a class to space out the requests sent to the same host
+class RateLimiter:
+    """
+    Limits the number of requests per second sent to each host. Every call to wait() reserves the next
+    free time slot for the host of the given URL and sleeps until that slot is reached, so that concurrent
+    workers never exceed the configured rate.
+
+    Arguments:
+    requests_per_second (float): the maximum number of requests per second per host (0 disables the limit).
+    """
+
+    def __init__(self, requests_per_second: float) -> None:
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        """
+        Blocks until a request to the host of the given URL is allowed.
+
+        Arguments:
+        url (str): the URL that is about to be requested.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        if not self.interval:
+            return
+
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# Rate limiter shared by all concurrent page downloads
+rate_limiter = RateLimiter(REQUESTS_PER_SECOND_PER_HOST)
+
+# Initialize the pool of worker processes analyzing review pages, created by start_parse_pool()
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+# Initialize the cache of the products found on search pages, created lazily by get_search_cache()
+_search_cache: Optional[DiskCache] = None
+_search_cache_lock = threading.Lock()
+
 
 # Create a function to retrieve the HTML code of a web page
-def get_page_html(page_url: str) -> str:
+def get_page_html(page_url: str, force_refresh: bool = False) -> str:
     """
-    Makes a request to a given URL and returns the HTML content of the page.
-    Randomly selects a user agent for each request.
+    Makes a request to a given URL with the shared HTTP session and returns the HTML content of the page.
+    Randomly selects a user agent for each request. Review pages are served from the page cache while
+    they are still fresh, and only the pages that are really downloaded wait for the shared rate limiter.
 
     Arguments:
     page_url (str): the URL of the page to scrape.
+    force_refresh (bool): if True, the page is downloaded again even if it is cached.
 
     Returns:
     str: the HTML content of the page, or an empty string if an error occurs.
     """
     try:
-        # Choose a random user agent
-        user_agent = random.choice(USER_AGENTS)
-        # Update the 'user-agent' in the HEADERS
-        HEADERS["user-agent"] = user_agent
-
-        response = requests.get(page_url, headers=HEADERS, timeout=10)
-        response.raise_for_status()  # Raises HTTPError for bad responses
-        return response.text
+        return fetch_url(page_url, kind="reviews", force_refresh=force_refresh, before_request=rate_limiter.wait)
 
     except requests.exceptions.RequestException as e:
         logging.error(f"Request error: {e}")
@@ -82,8 +204,8 @@ def get_review_date(soup_object: BeautifulSoup) -> str:
     Returns:
     str: the date of the review as a string.
     """
-    date_string = soup_object.find("span", {"class": "review-date"}).get_text()
-    return str(date_string)
+    date_element = soup_object.find("span", {"class": "review-date"})
+    return str(date_element.get_text()) if date_element else REVIEW_FIELD_DEFAULTS["review_date"]
 
 
 # Create a function to retrieve the review text
@@ -145,6 +267,354 @@ def get_number_stars(soup_object: BeautifulSoup) -> str:
         return "No rating"
 
 
+# Create a function to retrieve a stable identifier of the review
+def get_review_id(soup_object: BeautifulSoup) -> str:
+    """
+    Returns a stable identifier for a single review. Amazon gives every review element an id attribute
+    (e.g. 'R2XKJ3Q8L0ABCD') that does not change between page loads. If the attribute is missing, the
+    identifier is derived from a hash of the review date, title and text instead.
+
+    Args:
+    soup_object (BeautifulSoup): a BeautifulSoup object for a single review.
+
+    Returns:
+    str: the identifier of the review.
+    """
+    review_id = soup_object.get("id")
+    if review_id:
+        return str(review_id)
+
+    return hash_review_id(get_review_date(soup_object), get_review_header(soup_object), get_review_text(soup_object))
+
+
+# Create a function to derive an identifier from the content of a review
+def hash_review_id(review_date: str, review_title: str, review_text: str) -> str:
+    """
+    Derives a stable identifier for a review whose element has no id attribute.
+
+    Args:
+    review_date (str): the date of the review.
+    review_title (str): the title of the review.
+    review_text (str): the text of the review.
+
+    Returns:
+    str: the identifier of the review.
+    """
+    content = "\n".join([review_date, review_title, review_text])
+    return "H" + hashlib.sha1(content.encode("utf-8")).hexdigest()[:16]
+
+
+# Create a class to extract all fields of a review in a single pass over its elements
+class ReviewExtractor:
+    """
+    Compiles a declarative field specification (field -> ordered (tag, attribute, value) selectors) into
+    matchers grouped by tag name. extract() then walks the descendants of a review element once with
+    lxml, only visiting the tags used by the selectors, and keeps the best match of every field.
+    The matching follows BeautifulSoup: a single class name matches any element having that class,
+    while a value made of several class names must match the whole class attribute.
+
+    Arguments:
+    field_selectors (Dict[str, List[Tuple[str, str, str]]]): the selectors of each field, in order of preference.
+    defaults (Dict[str, str]): the value of each field when none of its selectors matches.
+    unstripped_fields (Tuple[str, ...]): the fields whose text is returned without stripping whitespace.
+    """
+
+    def __init__(
+        self,
+        field_selectors: Dict[str, List[Tuple[str, str, str]]],
+        defaults: Dict[str, str],
+        unstripped_fields: Tuple[str, ...] = (),
+    ) -> None:
+        self.fields = list(field_selectors)
+        self.defaults = defaults
+        self.unstripped_fields = set(unstripped_fields)
+        self._matchers: Dict[str, List[Tuple[str, int, str, str, bool]]] = {}
+
+        for field, selectors in field_selectors.items():
+            for priority, (tag, attribute, value) in enumerate(selectors):
+                token_match = attribute == "class" and " " not in value
+                self._matchers.setdefault(tag, []).append((field, priority, attribute, value, token_match))
+        self._tags = tuple(self._matchers)
+
+    def extract(self, review_element: etree._Element) -> Dict[str, str]:
+        """
+        Extracts every field of a single review in one traversal of its descendants.
+
+        Args:
+        review_element (etree._Element): the lxml element of a single review.
+
+        Returns:
+        Dict[str, str]: the text of each field, in the order of the field specification.
+        """
+        best_matches: Dict[str, Tuple[int, etree._Element]] = {}
+
+        for element in review_element.iterdescendants(*self._tags):
+            for field, priority, attribute, value, token_match in self._matchers[element.tag]:
+                # Keep the first element in document order that matches the most preferred selector
+                if field in best_matches and best_matches[field][0] <= priority:
+                    continue
+                attribute_value = element.get(attribute)
+                if attribute_value is None:
+                    continue
+                if token_match:
+                    matched = value in attribute_value.split()
+                elif attribute == "class":
+                    matched = " ".join(attribute_value.split()) == value
+                else:
+                    matched = attribute_value == value
+                if matched:
+                    best_matches[field] = (priority, element)
+
+        fields = {}
+        for field in self.fields:
+            if field not in best_matches:
+                fields[field] = self.defaults[field]
+                continue
+            text = best_matches[field][1].text_content()
+            fields[field] = str(text if field in self.unstripped_fields else text.strip())
+        return fields
+
+
+# Extractor compiled once from the review field specification
+review_extractor = ReviewExtractor(REVIEW_FIELD_SELECTORS, REVIEW_FIELD_DEFAULTS, unstripped_fields=("review_date",))
+
+
+# Create a function to join the texts of an element like BeautifulSoup's get_text(separator="\n", strip=True)
+def get_stripped_text(element: etree._Element) -> str:
+    """
+    Joins the non-empty texts of an element and its descendants, each stripped of surrounding whitespace,
+    with line breaks.
+
+    Args:
+    element (etree._Element): the lxml element.
+
+    Returns:
+    str: the text of the element.
+    """
+    return "\n".join(text.strip() for text in element.itertext() if text.strip())
+
+
+# Create a class to extract product descriptions from the different layouts of the product pages
+class DescriptionExtractor:
+    """
+    Extracts the description of a product page. The containers of all known layouts are located in a single
+    XPath pass over the page, and the layouts found on the page are then tried in their fixed order of
+    precedence, so that a page showing several layouts is always described by the same one. The layout used
+    for each page is logged.
+
+    Arguments:
+    layouts (Tuple[str, ...]): the ids of the description containers, in their order of precedence.
+    """
+
+    def __init__(self, layouts: Tuple[str, ...] = DESCRIPTION_LAYOUTS) -> None:
+        self.layouts = layouts
+        self._extractors = {
+            "feature-bullets": self._extract_feature_bullets,
+            "productFactsDesktopExpander": self._extract_product_facts,
+            "bookDescription_feature_div": self._extract_book_description,
+            "productDescription": self._extract_product_description,
+        }
+        container_ids = " or ".join(f"@id='{container_id}'" for container_id in layouts)
+        self._containers_xpath = etree.XPath(f"//div[{container_ids}]")
+
+    def extract(self, html: str) -> Optional[str]:
+        """
+        Extracts the description of a product page.
+
+        Args:
+        html (str): the HTML content of the product page.
+
+        Returns:
+        str or None: the description, or None if none of the layouts is found on the page.
+        """
+        containers: Dict[str, etree._Element] = {}
+        for element in self._containers_xpath(parse_html(html)):
+            containers.setdefault(str(element.get("id")), element)
+
+        for layout in self.layouts:
+            if layout in containers:
+                description = self._extractors[layout](containers[layout])
+                if description is not None:
+                    # If any problem with scraping, it can be found more easily by knowing which layout is used
+                    logging.info(f"Description layout: {layout}")
+                    return description
+
+        logging.info("Description layout: None")
+        return None
+
+    def _get_list_items(self, bullet_list: etree._Element) -> List[str]:
+        items = (LIST_ITEM_TEXT_XPATH(item) for item in bullet_list.iter("li"))
+        return [str(item[0].text_content().strip()) for item in items if item]
+
+    def _extract_feature_bullets(self, container: etree._Element) -> Optional[str]:
+        # Version 1: the items of the first bullet list
+        bullet_lists = BULLET_LIST_XPATH(container)
+        return "\n".join(self._get_list_items(bullet_lists[0])) if bullet_lists else None
+
+    def _extract_product_facts(self, container: etree._Element) -> Optional[str]:
+        # Version 2: the items of all bullet lists, each starting with a slash
+        bullet_lists = BULLET_LIST_XPATH(container)
+        if not bullet_lists:
+            return None
+        return "".join("\n".join("/ " + item for item in self._get_list_items(ul)) for ul in bullet_lists).strip()
+
+    def _extract_book_description(self, container: etree._Element) -> Optional[str]:
+        # Version 3: the texts of all spans
+        spans = list(container.iter("span"))
+        return "".join(get_stripped_text(span) + "\n" for span in spans).strip() if spans else None
+
+    def _extract_product_description(self, container: etree._Element) -> Optional[str]:
+        # Version 4: the texts of all paragraphs
+        paragraphs = list(container.iter("p"))
+        return "\n".join(get_stripped_text(paragraph) for paragraph in paragraphs) if paragraphs else None
+
+
+# Extractor compiled once and shared by all product pages
+description_extractor = DescriptionExtractor()
+
+
+# Create a function to retrieve the lxml review elements from HTML code
+def get_review_elements(page_html: str) -> list:
+    """
+    Parses HTML content with lxml and returns the review elements, using the same rules as
+    get_reviews_from_html: elements with data-hook="review", or else elements of class "a-section celwidget".
+
+    The head, scripts and navigation before the first review make up most of a review page, so the parse starts
+    at the opening tag of the first review element and only builds the review list and what follows it. The
+    whole page is parsed if it has no element with data-hook="review", or if the parse starting at the first
+    one does not find any review.
+
+    Arguments:
+    page_html (str): HTML content of a product review page.
+
+    Returns:
+    list: a list of lxml review elements.
+    """
+    if not page_html or not page_html.strip():
+        return []
+
+    review_start = find_review_start(page_html)
+    if review_start >= 0:
+        reviews = parse_html(page_html[review_start:]).xpath("//div[@data-hook='review']")
+        if reviews:
+            return list(reviews)
+        logging.warning("No review found after the first review tag, the whole page is parsed")
+
+    document = parse_html(page_html)
+    reviews = document.xpath("//div[@data-hook='review']")
+    if not reviews:
+        reviews = document.xpath("//div[normalize-space(@class)='a-section celwidget']")
+    return list(reviews)
+
+
+# Create a function to find where the first review element starts in HTML code
+def find_review_start(page_html: str) -> int:
+    """
+    Finds the opening tag of the first element with data-hook="review" in HTML content. Tags inside scripts and
+    comments are not elements of the page, so the search skips their content.
+
+    Arguments:
+    page_html (str): HTML content of a product review page.
+
+    Returns:
+    int: the position of the opening tag, or -1 if the page has no such tag outside of scripts and comments.
+    """
+    position = 0
+    while True:
+        match = REVIEW_START_PATTERN.search(page_html, position)
+        if match is None:
+            return -1
+        skipped = match.group("skipped")
+        if skipped is None:
+            return match.start()
+
+        end = SKIPPED_END_PATTERNS[skipped.lower()].search(page_html, match.end())
+        if end is None:
+            return -1
+        position = end.end()
+
+
+# Create a function to parse HTML code with lxml
+def parse_html(page_html: str) -> etree._Element:
+    """
+    Parses HTML content, or a part of it, into an lxml document.
+
+    Arguments:
+    page_html (str): the HTML content to parse.
+
+    Returns:
+    etree._Element: the root element of the document, an empty document if the content cannot be parsed.
+    """
+    try:
+        return lxml_html.document_fromstring(page_html)
+    except (etree.ParserError, ValueError) as e:
+        logging.error(f"Could not parse page: {e}")
+        return lxml_html.Element("html")
+
+
+# Create a function to extract the fields of all reviews of a page
+def extract_reviews_from_html(page_html: str) -> List[Dict[str, str]]:
+    """
+    Extracts the id, text, date, title and rating of every review of a review page, with one
+    lxml parse of the page and one traversal of each review element.
+
+    Arguments:
+    page_html (str): HTML content of a product review page.
+
+    Returns:
+    List[Dict[str, str]]: the fields of each review, in the order of the page.
+    """
+    reviews = []
+    for element in get_review_elements(page_html):
+        fields = review_extractor.extract(element)
+        review_id = element.get("id") or hash_review_id(
+            fields["review_date"], fields["review_title"], fields["review_text"]
+        )
+        reviews.append({"review_id": str(review_id), **fields})
+    return reviews
+
+
+# Create a function to add the sentiment analysis to the fields of a review
+def score_review(review_fields: Dict[str, str], engine: str = SENTIMENT_ENGINE) -> dict:
+    """
+    Performs the sentiment analysis of a review whose fields have already been extracted.
+    If the same text has already been analyzed, its cached sentiment is used.
+
+    Args:
+    review_fields (Dict[str, str]): the extracted fields of the review, including 'review_text'.
+    engine (str): the sentiment engine, 'textblob' or 'batch' (SENTIMENT_ENGINE by default).
+
+    Returns:
+    dict: the fields of the review together with its polarity and subjectivity.
+    """
+    return score_reviews([review_fields], engine)[0]
+
+
+# Create a function to add the sentiment analysis to the fields of several reviews
+def score_reviews(reviews_fields: List[Dict[str, str]], engine: str = SENTIMENT_ENGINE) -> List[dict]:
+    """
+    Performs the sentiment analysis of several reviews, either with one TextBlob per review ('textblob'
+    engine) or with a single call of the batch analyzer for all reviews ('batch' engine). Reviews whose
+    text has already been analyzed use the cached sentiment.
+
+    Args:
+    reviews_fields (List[Dict[str, str]]): the extracted fields of each review, including 'review_text'.
+    engine (str): the sentiment engine, 'textblob' or 'batch' (SENTIMENT_ENGINE by default).
+
+    Returns:
+    List[dict]: the fields of each review together with its polarity and subjectivity, in the same order.
+    """
+    sentiments = analyze_sentiments([review_fields["review_text"] for review_fields in reviews_fields], engine)
+    return [
+        {
+            **review_fields,
+            "textblob_polarity": sentiment.polarity,
+            "textblob_subjectivity": sentiment.subjectivity,
+        }
+        for review_fields, sentiment in zip(reviews_fields, sentiments)
+    ]
+
+
 # Create a function to orchestrate the data gathering process and sentiment analysis performance
 def orchestrate_data_gathering(single_review: BeautifulSoup) -> dict:
     """
@@ -156,64 +626,399 @@ def orchestrate_data_gathering(single_review: BeautifulSoup) -> dict:
     Returns:
     dict: a dictionary containing extracted data and sentiment analysis of the review.
     """
-    review_text = get_review_text(single_review)
-    textblob_sentiment = analyze_sentiment_with_textblob(review_text)
+    return score_review(
+        {
+            "review_id": get_review_id(single_review),
+            "review_text": get_review_text(single_review),
+            "review_date": get_review_date(single_review),
+            "review_title": get_review_header(single_review),
+            "review_stars": get_number_stars(single_review),
+        }
+    )
+
+
+# Create a function to extract and analyze all reviews of a downloaded page
+def parse_review_page(page_html: str) -> List[Dict]:
+    """
+    Extracts the reviews of a review page and performs their sentiment analysis. This function runs
+    in the worker processes of the parse pool, so it only receives and returns plain data.
+
+    Args:
+    page_html (str): HTML content of a product review page.
+
+    Returns:
+    List[Dict]: a list of dictionaries, each containing data about a review of the page.
+    """
+    return score_reviews(extract_reviews_from_html(page_html))
+
+
+# Create a function to start the worker processes analyzing review pages
+def start_parse_pool(workers: int = PARSE_WORKERS) -> Optional[ProcessPoolExecutor]:
+    """
+    Creates the pool of worker processes that extract and analyze review pages on several cores, and starts all
+    its workers at once. The workers stay alive between scrapes, so later scrapes do not pay their start-up time.
+
+    The workers are forked from the application. Forking a process that runs other threads copies the locks held
+    by those threads, which then stay locked forever in the workers, so the pool is only started while the calling
+    thread is the only thread of the process: the application calls this function before it creates its window
+    and starts its background threads. Platforms that can only spawn new interpreters (Windows and macOS) would
+    import and start the GUI again in every worker, so the pages are analyzed in the scraping thread there.
+
+    Arguments:
+    workers (int): the number of worker processes, 0 disables the pool.
+
+    Returns:
+    ProcessPoolExecutor or None: the pool, or None if pages are analyzed in the scraping thread.
+    """
+    global _parse_pool
+
+    if workers <= 0 or sys.platform in ("win32", "darwin") or "fork" not in multiprocessing.get_all_start_methods():
+        return None
+
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            if threading.active_count() > 1:
+                return None
+            _parse_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"))
+            # The first task forks all the workers, before the pool starts its own management thread
+            _parse_pool.submit(len, "").result()
+            atexit.register(shutdown_parse_pool)
+        return _parse_pool
+
+
+# Create a function to return the pool of worker processes analyzing review pages
+def get_parse_pool(workers: int = PARSE_WORKERS) -> Optional[ProcessPoolExecutor]:
+    """
+    Returns the pool of worker processes started by start_parse_pool, or tries to start it if it was not
+    started yet.
+
+    Arguments:
+    workers (int): the number of worker processes if the pool is started now, 0 disables the pool.
+
+    Returns:
+    ProcessPoolExecutor or None: the pool, or None if pages are analyzed in the scraping thread.
+    """
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            return _parse_pool
+    return start_parse_pool(workers)
+
+
+# Create a function to stop the worker processes analyzing review pages
+def shutdown_parse_pool() -> None:
+    """
+    Stops the worker processes of the parse pool, if it was created.
+
+    Arguments:
+    None: this function does not take any arguments.
+
+    Returns:
+    None: this function does not return any value.
+    """
+    global _parse_pool
+
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown(cancel_futures=True)
+            _parse_pool = None
+
+
+# Create a function to download a page while respecting the per-host rate limit
+def fetch_page_html(page_url: str, force_refresh: bool = False) -> str:
+    """
+    Retrieves the HTML code of the given page, waiting for the shared rate limiter if the page is not cached.
+
+    Arguments:
+    page_url (str): the URL of the page to scrape.
+    force_refresh (bool): if True, the page is downloaded again even if it is cached.
+
+    Returns:
+    str: the HTML content of the page, or an empty string if an error occurs.
+    """
+    logging.info(page_url)
+    return get_page_html(page_url, force_refresh=force_refresh)
+
+
+# Create a function to scrape Amazon reviews page by page
+def iter_amazon_reviews(
+    urls: list, max_workers: int = MAX_CONCURRENT_REQUESTS, force_refresh: bool = False
+) -> Iterator[List[Dict]]:
+    """
+    Scrapes Amazon reviews from a list of given URLs and yields the reviews of each page as soon as they
+    are ready, so that the first reviews can be shown while later pages are still being downloaded.
+    The pages are downloaded concurrently by a pool of up to max_workers threads. For scrapes of at least
+    PARSE_POOL_MIN_PAGES pages, the extraction and sentiment analysis run in the worker processes of the
+    parse pool, one page per task, so that they use several cores and do not hold the GIL of the user
+    interface. The pages are always yielded in the order of the given URLs.
+
+    Args:
+    urls (list): a list of URLs to scrape for reviews.
+    max_workers (int): the maximum number of pages downloaded at the same time.
+    force_refresh (bool): if True, the pages are downloaded again even if they are cached.
+
+    Returns:
+    Iterator[List[Dict]]: the reviews of each page, a list of dictionaries per page.
+    """
+    if not urls:
+        return
 
-    return {
-        "review_text": review_text,
-        "review_date": get_review_date(single_review),
-        "review_title": get_review_header(single_review),
-        "review_stars": get_number_stars(single_review),
-        "textblob_polarity": textblob_sentiment.polarity,
-        "textblob_subjectivity": textblob_sentiment.subjectivity,
-    }
+    parse_pool = get_parse_pool() if len(urls) >= PARSE_POOL_MIN_PAGES else None
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls))))
+    parsed_pages: deque = deque()
+    try:
+        # executor.map yields the pages in the order of the URLs, whatever order the downloads finish in
+        pages = executor.map(partial(fetch_page_html, force_refresh=force_refresh), urls)
+
+        if parse_pool is None:
+            for html in pages:
+                yield parse_review_page(html)
+        else:
+            # Every page is handed to the workers as soon as it is downloaded, and the analyzed pages
+            # at the front of the queue are yielded while the next downloads are awaited
+            for html in pages:
+                parsed_pages.append(parse_pool.submit(parse_review_page, html))
+                while parsed_pages and parsed_pages[0].done():
+                    yield parsed_pages.popleft().result()
+            while parsed_pages:
+                yield parsed_pages.popleft().result()
+    finally:
+        # If the generator is closed early, the downloads and analyses that have not started yet are cancelled,
+        # and only the running downloads are awaited
+        executor.shutdown(cancel_futures=True)
+        for parsed_page in parsed_pages:
+            parsed_page.cancel()
 
 
 # Create a function to scrape Amazon reviews
-def scrape_amazon_reviews(urls: list) -> list:
+def scrape_amazon_reviews(urls: list, max_workers: int = MAX_CONCURRENT_REQUESTS, force_refresh: bool = False) -> list:
     """
-    Scrapes Amazon reviews from a list of given URLs.
+    Scrapes Amazon reviews from a list of given URLs with iter_amazon_reviews, and returns all reviews
+    once every page has been scraped. The results are in the order of the given URLs.
 
     Args:
     urls (list): a list of URLs to scrape for reviews.
+    max_workers (int): the maximum number of pages downloaded at the same time.
+    force_refresh (bool): if True, the pages are downloaded again even if they are cached.
 
     Returns:
     list: a list of dictionaries, each containing data about a review.
     """
     all_results = []
-    for u in urls:
-        logging.info(u)
-        html = get_page_html(u)
-        reviews = get_reviews_from_html(html)
-        for rev in reviews:
-            data = orchestrate_data_gathering(rev)
-            all_results.append(data)
+    for page_results in iter_amazon_reviews(urls, max_workers=max_workers, force_refresh=force_refresh):
+        all_results.extend(page_results)
     return all_results
 
 
+# Create a function to build the URL of a review page
+def get_review_page_url(product_id: str, page: int, sort_by_recent: bool = False) -> str:
+    """
+    Builds the URL of a page of reviews of the given product.
+
+    Arguments:
+    product_id (str): Amazon product ID.
+    page (int): the number of the review page, starting at 1.
+    sort_by_recent (bool): if True, the reviews are sorted from the most recent to the oldest.
+
+    Returns:
+    str: the URL of the review page.
+    """
+    url = (
+        f"https://www.amazon.com/product-reviews/{product_id}/"
+        f"ref=cm_cr_arp_d_paging_btm_next_{page}?ie=UTF8&reviewerType=all_reviews&pageNumber={page}"
+    )
+    return f"{url}&sortBy=recent" if sort_by_recent else url
+
+
+# Create a function to load the reviews stored by previous incremental scrapes
+def load_stored_reviews(product_id: str) -> List[Dict]:
+    """
+    Loads the reviews of the given product that were stored by a previous incremental scrape.
+
+    Arguments:
+    product_id (str): Amazon product ID.
+
+    Returns:
+    List[Dict]: the stored reviews from the most recent to the oldest, or an empty list if there are none.
+    """
+    try:
+        with open(os.path.join(REVIEW_STORE_DIR, f"{product_id}.json"), encoding="utf-8") as store_file:
+            return list(json.load(store_file))
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError) as e:
+        logging.error(f"Could not read the stored reviews of {product_id}: {e}")
+        return []
+
+
+# Create a function to store the reviews of a product for the next incremental scrape
+def save_stored_reviews(product_id: str, reviews: List[Dict]) -> None:
+    """
+    Stores the reviews of the given product, so that the next incremental scrape only fetches newer reviews.
+    Only the REVIEW_STORE_MAX_REVIEWS most recent reviews are stored, and the stores of the products that
+    were not scraped for REVIEW_STORE_MAX_AGE seconds are deleted.
+
+    Arguments:
+    product_id (str): Amazon product ID.
+    reviews (List[Dict]): the reviews from the most recent to the oldest.
+
+    Returns:
+    None: this function does not return any value.
+    """
+    os.makedirs(REVIEW_STORE_DIR, exist_ok=True)
+    store_path = os.path.join(REVIEW_STORE_DIR, f"{product_id}.json")
+    # Write to a temporary file first, so that an interrupted scrape never leaves a corrupt store behind
+    with open(f"{store_path}.tmp", "w", encoding="utf-8") as store_file:
+        json.dump(reviews[:REVIEW_STORE_MAX_REVIEWS], store_file)
+    os.replace(f"{store_path}.tmp", store_path)
+    prune_stored_reviews()
+
+
+# Create a function to delete the stored reviews of the products that were not scraped for a long time
+def prune_stored_reviews(max_age: float = REVIEW_STORE_MAX_AGE) -> None:
+    """
+    Deletes the stored reviews of the products whose store was last written more than max_age seconds ago.
+
+    Arguments:
+    max_age (float): the maximum age of a store in seconds.
+
+    Returns:
+    None: this function does not return any value.
+    """
+    expiry = time.time() - max_age
+    try:
+        with os.scandir(REVIEW_STORE_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and entry.stat().st_mtime < expiry:
+                    os.remove(entry.path)
+    except OSError as e:
+        logging.error(f"Could not prune the stored reviews: {e}")
+
+
+# Create a function to scrape only the reviews that are newer than the already known ones
+def scrape_new_reviews(product_id: str, max_review_pages: int, known_review_ids: set) -> List[Dict]:
+    """
+    Pages through the reviews of the given product sorted from the most recent to the oldest, and stops
+    at the first review that is already known. Only the new reviews are analyzed, so a refresh of a
+    watched product usually needs a single request.
+
+    Arguments:
+    product_id (str): Amazon product ID.
+    max_review_pages (int): the maximum number of review pages to scrape.
+    known_review_ids (set): the identifiers of the reviews that are already stored.
+
+    Returns:
+    List[Dict]: the new reviews from the most recent to the oldest.
+    """
+    new_results: List[Dict] = []
+
+    for page in range(1, max_review_pages + 1):
+        # The cached copy of a page sorted by date is outdated as soon as a new review is posted
+        html = fetch_page_html(get_review_page_url(product_id, page, sort_by_recent=True), force_refresh=True)
+        reviews = extract_reviews_from_html(html)
+        if not reviews:
+            break
+
+        for review_fields in reviews:
+            if review_fields["review_id"] in known_review_ids:
+                logging.info(f"Reached an already stored review on page {page}, {len(new_results)} new reviews")
+                return score_reviews(new_results)
+            new_results.append(review_fields)
+
+    return score_reviews(new_results)
+
+
 # Create a function to scrape new data from Amazon
-def scrape_data(product_id: str, num_review_pages: int) -> List[Dict]:
+def scrape_data(
+    product_id: str, num_review_pages: int, force_refresh: bool = False, incremental: bool = False
+) -> List[Dict]:
     """
     Scrapes new data from Amazon based on the given product ID and the number of review pages.
 
+    In incremental mode, the reviews are sorted from the most recent to the oldest and merged with the
+    reviews stored by the previous incremental scrape of the product: paging stops at the first review
+    that is already stored, and only the new reviews are analyzed and added to the store. The incremental mode is
+    meant for scripts watching products; the GUI always scrapes the requested review pages.
+
     Arguments:
     product_id (str): Amazon product ID.
     num_review_pages (int): The number of review pages to scrape.
+    force_refresh (bool): if True, the review pages are downloaded again even if they are cached.
+    incremental (bool): if True, only the reviews posted since the previous incremental scrape are fetched.
 
     Returns:
     List[Dict]: a list of dictionaries, each containing data about a review.
     """
-    urls = [
-        f"https://www.amazon.com/product-reviews/{product_id}/"
-        f"ref=cm_cr_arp_d_paging_btm_next_{page}?ie=UTF8&reviewerType=all_reviews&pageNumber={page}"
-        for page in range(1, num_review_pages + 1)
-    ]
-    scraped_data = scrape_amazon_reviews(urls)
+    if incremental:
+        stored_reviews = load_stored_reviews(product_id)
+        if stored_reviews:
+            known_review_ids = {review["review_id"] for review in stored_reviews}
+            scraped_data = scrape_new_reviews(product_id, num_review_pages, known_review_ids) + stored_reviews
+        else:
+            # Nothing is stored yet, so all pages are needed and can be downloaded concurrently
+            urls = [
+                get_review_page_url(product_id, page, sort_by_recent=True) for page in range(1, num_review_pages + 1)
+            ]
+            scraped_data = scrape_amazon_reviews(urls, force_refresh=True)
+        save_stored_reviews(product_id, scraped_data)
+    else:
+        urls = [get_review_page_url(product_id, page) for page in range(1, num_review_pages + 1)]
+        scraped_data = scrape_amazon_reviews(urls, force_refresh=force_refresh)
+
+    logging.info(f"HTTP connections: {get_connection_stats()}, page cache: {get_cache_stats()}")
+    logging.info(f"Sentiment cache: {get_sentiment_cache_stats()}")
     return scraped_data
 
 
+# Create a function to scrape new data from Amazon and yield it page by page
+def iter_scrape_data(
+    product_id: str, num_review_pages: int, force_refresh: bool = False, incremental: bool = False
+) -> Iterator[List[Dict]]:
+    """
+    Streaming version of scrape_data: yields the reviews of each review page as soon as the page has been
+    downloaded and analyzed, so that the first reviews can be displayed after about one page.
+
+    In incremental mode, the new reviews are yielded first and the stored reviews last, and the store
+    is only updated once all reviews have been yielded.
+
+    Arguments:
+    product_id (str): Amazon product ID.
+    num_review_pages (int): The number of review pages to scrape.
+    force_refresh (bool): if True, the review pages are downloaded again even if they are cached.
+    incremental (bool): if True, only the reviews posted since the previous incremental scrape are fetched.
+
+    Returns:
+    Iterator[List[Dict]]: the reviews of each page, a list of dictionaries per page.
+    """
+    if incremental:
+        stored_reviews = load_stored_reviews(product_id)
+        if stored_reviews:
+            # Paging through the new reviews stops at the first stored review, usually on the first page
+            known_review_ids = {review["review_id"] for review in stored_reviews}
+            batches: Iterator[List[Dict]] = iter(
+                [scrape_new_reviews(product_id, num_review_pages, known_review_ids), stored_reviews]
+            )
+        else:
+            urls = [
+                get_review_page_url(product_id, page, sort_by_recent=True) for page in range(1, num_review_pages + 1)
+            ]
+            batches = iter_amazon_reviews(urls, force_refresh=True)
+
+        scraped_data: List[Dict] = []
+        for batch in batches:
+            scraped_data.extend(batch)
+            yield batch
+        save_stored_reviews(product_id, scraped_data)
+    else:
+        urls = [get_review_page_url(product_id, page) for page in range(1, num_review_pages + 1)]
+        yield from iter_amazon_reviews(urls, force_refresh=force_refresh)
+
+    logging.info(f"HTTP connections: {get_connection_stats()}, page cache: {get_cache_stats()}")
+    logging.info(f"Sentiment cache: {get_sentiment_cache_stats()}")
+
+
 # Create a function to get product data from Amazon
-def get_amazon_product_data(keyword: str, search_param: str, num_pages: int = 1) -> dict:
+def get_amazon_product_data(keyword: str, search_param: str, num_pages: int = 1, force_refresh: bool = False) -> dict:
     """
     Scrapes Amazon search results for a given keyword and search parameter that is specified by the user.
 
@@ -221,6 +1026,7 @@ def get_amazon_product_data(keyword: str, search_param: str, num_pages: int = 1)
     keyword (str): the search keyword inserted by the user
     search_param (str): the search parameter (e.g., 'Books', 'Electronics') which is equivalent to the Amazon homepage
     num_pages (int): the number of pages to scrape (default is 1 not to pull many requests and get blocked)
+    force_refresh (bool): if True, the search pages are downloaded again even if they are cached
 
     Returns:
     product_data (dict): a dictionary containing scraped product data with keys 
@@ -228,161 +1034,90 @@ def get_amazon_product_data(keyword: str, search_param: str, num_pages: int = 1)
     """
     product_data: Dict[str, List[str]] = {"Product Name": [], "Product URL": [], "ASIN": []}
 
-    # Iterate through num_pages of the Amazon pages with the search results
-    for page in range(1, num_pages + 1):
-        base_url = f"https://www.amazon.com/s?k={keyword}&i={search_param}&page={page}"
-
-        try:
-            # Randomly choose a user agent and update the headers
-            user_agent = random.choice(USER_AGENTS)
-            headers = {**HEADERS, "user-agent": user_agent}
-
-            # Retrieves the html content of the base_url
-            response = requests.get(base_url, headers=headers, timeout=10)
-
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, "html.parser")
-
-                # Search content between <div data-asin=.. and </div>
-                products_list = soup.find_all("div", {"data-asin": True})
-
-                if products_list:
-                    for product in products_list:
-                        # searches for content between <span class="a-size- 
-                        #(to account for medium, small etc.) and </span>
-                        product_name = product.find_all("span", class_=re.compile("^a-size-"))
-
-                        if product_name:
-                            # Concatenate the text from all matching span elements
-                            product_name = " ".join(span.text.strip() for span in product_name)
-                            # Limits the length of the basic description to 70 letters
-                            product_name = product_name[:70]
-
-                        # initialize product_url
-                        product_url = ""
-                        # search for content between <a class="a-link-normal... and </class>
-                        product_url_class = product.find("a", {"class": "a-link-normal"})
-                        if product_url_class:
-                            product_url = f"https://www.amazon.com{product_url_class['href']}"
-
-                        if product_url_class:
-                            # Extracts ASIN (Azamon Identification Number) from the URL
-                            asin_match = re.search(r"/dp/(\w+)/", product_url_class["href"])
-                            asin = asin_match.group(1) if asin_match else None
-
-                        # only save the data to product_data if product_name, product_url and asin are complete
-                        if product_name and product_url and asin:
-                            product_data["Product Name"].append(product_name)
-                            product_data["Product URL"].append(product_url)
-                            product_data["ASIN"].append(asin)
-
-        except requests.RequestException as e:
-            print(f"Request error: {e}")
-        except ValueError as ve:
-            print(f"Value error: {ve}")
-        except Exception as ex:
-            print(f"An unexpected error occurred: {ex}")
+    for page_products in iter_amazon_product_pages(keyword, search_param, num_pages, force_refresh):
+        for column, values in page_products.items():
+            product_data[column].extend(values)
 
     return product_data
 
 
-# Create a function to retrieve a product's description from Amazon
-def scrape_amazon_product_description(product_url: str) -> Optional[str]:
+# Create a function to stream the products found on each search page
+def iter_amazon_product_pages(
+    keyword: str,
+    search_param: str,
+    num_pages: int = 1,
+    force_refresh: bool = False,
+    max_workers: int = MAX_CONCURRENT_REQUESTS,
+) -> Iterator[Dict[str, List[str]]]:
     """
-    Function scrapes the product url to retrieve the product description. 
-    The html pages of Amazon categories are very differently structured.
-    Therefore, different versions need to be covered.
+    Streaming version of get_amazon_product_data: yields the products of each search page as soon as the page
+    has been downloaded and parsed, so that the first products can be displayed while the next pages are loading.
+    The pages are downloaded and parsed concurrently by a pool of up to max_workers threads, under the shared
+    per-host rate limit, and yielded in page order. A product already found on an earlier page is left out.
+    Pages that cannot be downloaded or parsed yield no products. The products of pages found in the search cache
+    are yielded without downloading the page, so asking for more pages of a recent search only downloads the
+    new pages.
 
     Arguments:
-    product_url (str): the URL of the Amazon product page
+    keyword (str): the search keyword inserted by the user.
+    search_param (str): the search parameter (e.g., 'Books', 'Electronics') which is equivalent to the Amazon homepage.
+    num_pages (int): the number of pages to scrape.
+    force_refresh (bool): if True, the search pages are downloaded and parsed again even if they are cached.
+    max_workers (int): the maximum number of search pages downloaded at the same time.
 
     Returns:
-    description_text (str): a string containing the product description
+    Iterator[Dict[str, List[str]]]: the products of each page, with the keys 'Product Name', 'Product URL' and 'ASIN'.
     """
+    if num_pages < 1:
+        return
+
+    seen_asins: set = set()
+    get_page = partial(get_search_page_products, keyword, search_param, force_refresh=force_refresh)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, num_pages)))
     try:
-        # Randomly choose a user agent and update the headers
-        user_agent = random.choice(USER_AGENTS)
-        headers = {**HEADERS, "user-agent": user_agent}
-
-        response = requests.get(product_url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, "html.parser")
-            # Version 1 find content between <div id="feature-bullets" class="a-section a-spacing-medium a-spacing-top-small"> 
-            # and </div>
-            product_description_div = soup.find("div", {"id": "feature-bullets"})
-            if product_description_div:
-                # Find the content between <ul class="a-unordered-list a-vertical a-spacing-mini"> and </ul>
-                unordered_list = product_description_div.find("ul", {"class": "a-unordered-list"})
-
-                if unordered_list:
-                    # Find all list items within the unordered list
-                    item_list = unordered_list.find_all("li")
-
-                    # Extract text from each list item
-                    description_text = "\n".join(
-                        item.find("span", {"class": "a-list-item"}).text.strip() for item in item_list
-                    )
-
-                    # If any problem with scraping, it can be found more easily by knowing which versions are used
-                    print("version 1")
-
-                    return description_text
-
-            # Version 2 find content between <div id="productFactsDesktopExpander"... and </div>
-            product_description_div = soup.find("div", {"id": "productFactsDesktopExpander"})
-            if product_description_div:
-                # Check for several unordered lists betwen <ul class="a-unordered-list a-vertical a-spacing-small"> and </ul>
-                unordered_lists = product_description_div.find_all("ul", {"class": "a-unordered-list"})
-
-                if unordered_lists:
-                    description_text = ""
-
-                    for ul in unordered_lists:
-                        # Find all list items within the unordered list
-                        item_list = ul.find_all("li")
-
-                        if item_list:
-                            # Extract text from each list item
-                            list_text = "\n".join(
-                                "/ " + item.find("span", {"class": "a-list-item"}).text.strip() for item in item_list
-                            )
-
-                            # Append the list text to the overall description
-                            description_text += list_text
-
-                    print("version 2")
-                    return description_text.strip()
-
-            # Version 3 find content between <div id="bookDescription_feature_div"... and </div>
-            product_description_div = soup.find("div", {"id": "bookDescription_feature_div"})
-            if product_description_div:
-                # Find content between all <span> and </span>
-                span_elements = product_description_div.find_all("span")
-
-                # Iterate through the span elements and concatenate text
-                if span_elements:
-                    description_text = ""
-                    for span_tag in span_elements:
-                        description_text += span_tag.get_text(separator="\n", strip=True) + "\n"
-
-                    print("version 3")  # Strip any leading/trailing whitespace
-                    return description_text.strip()
-
-            # Version 4 find content between <div id="productDescription"... and </div> 
-            # all at the bottom of Amazon page - the least prefered
-            product_description_div = soup.find("div", {"id": "productDescription"})
-            if product_description_div:
-                # Find content between <p> and </p>
-                paragraphs = product_description_div.find_all("p")
-
-                if paragraphs:
-                    description_text = "\n".join(
-                        paragraph.get_text(separator="\n", strip=True) for paragraph in paragraphs
-                    )
-                    print("version 4")
-                    return description_text
+        # executor.map yields the pages in page order, whatever order the downloads finish in
+        for page_products in executor.map(get_page, range(1, num_pages + 1)):
+            yield remove_duplicate_products(page_products, seen_asins)
+    finally:
+        # If the generator is closed early, the search pages that have not started downloading are cancelled
+        executor.shutdown(cancel_futures=True)
+
+
+# Create a function to retrieve the products of a single search page
+def get_search_page_products(
+    keyword: str, search_param: str, page: int, force_refresh: bool = False
+) -> Dict[str, List[str]]:
+    """
+    Returns the products of a search page, from the search cache if it holds them, or else by downloading
+    the page once the shared rate limiter allows it and parsing it.
 
-            return None
+    Arguments:
+    keyword (str): the search keyword inserted by the user.
+    search_param (str): the search parameter (e.g., 'Books', 'Electronics') which is equivalent to the Amazon homepage.
+    page (int): the number of the search page, starting at 1.
+    force_refresh (bool): if True, the page is downloaded and parsed again even if it is cached.
+
+    Returns:
+    Dict[str, List[str]]: the products of the page, with the keys 'Product Name', 'Product URL' and 'ASIN'
+                          (no products if the page cannot be downloaded or parsed).
+    """
+    cache = get_search_cache()
+    cache_key = get_search_cache_key(keyword, search_param, page)
+    if cache is not None and not force_refresh:
+        cached_products = cache.get(cache_key)
+        if cached_products is not None:
+            return json.loads(cached_products)
+
+    base_url = f"https://www.amazon.com/s?k={keyword}&i={search_param}&page={page}"
+    page_products: Dict[str, List[str]] = {"Product Name": [], "Product URL": [], "ASIN": []}
+
+    try:
+        # Retrieves the html content of the base_url
+        html = fetch_url(base_url, kind="search", force_refresh=force_refresh, before_request=rate_limiter.wait)
+
+        if html:
+            page_products = get_products_from_search_page(html)
 
     except requests.RequestException as e:
         print(f"Request error: {e}")
@@ -391,5 +1126,137 @@ def scrape_amazon_product_description(product_url: str) -> Optional[str]:
     except Exception as ex:
         print(f"An unexpected error occurred: {ex}")
 
+    # Pages without products (failed downloads, blocked requests) are downloaded again next time
+    if cache is not None and page_products["ASIN"]:
+        cache.set(cache_key, json.dumps(page_products).encode("utf-8"), SEARCH_CACHE_TTL)
+    return page_products
+
+
+# Create a function to leave out the products found on earlier search pages
+def remove_duplicate_products(page_products: Dict[str, List[str]], seen_asins: set) -> Dict[str, List[str]]:
+    """
+    Returns the products of a search page whose ASIN is not in seen_asins, and adds their ASINs to it. Amazon
+    often lists the same product on several pages of a search, e.g. as a sponsored result.
+
+    Arguments:
+    page_products (Dict[str, List[str]]): the products of the page, with the keys 'Product Name', 'Product URL'
+                                          and 'ASIN'.
+    seen_asins (set): the ASINs of the products found on the earlier pages, updated in place.
+
+    Returns:
+    Dict[str, List[str]]: the products of the page that were not found before, in the same order.
+    """
+    new_products: Dict[str, List[str]] = {column: [] for column in page_products}
+    for index, asin in enumerate(page_products["ASIN"]):
+        if asin in seen_asins:
+            continue
+        seen_asins.add(asin)
+        for column, values in page_products.items():
+            new_products[column].append(values[index])
+    return new_products
+
+
+# Create a function to return the cache of the products found on search pages
+def get_search_cache() -> Optional[DiskCache]:
+    """
+    Returns the shared search cache, creating it on first use in the CACHE_DIR folder. It holds the products
+    parsed from each search page rather than the page itself, so that a cached page is neither downloaded
+    nor parsed again.
+
+    Arguments:
+    None: this function does not take any arguments.
+
+    Returns:
+    DiskCache or None: the search cache, or None if caching is disabled in the configuration.
+    """
+    global _search_cache
+
+    if not SEARCH_CACHE_ENABLED:
+        return None
+
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = DiskCache(os.path.join(CACHE_DIR, "search_cache.sqlite3"), SEARCH_CACHE_MAX_BYTES)
+        return _search_cache
+
+
+# Create a function to build the cache key of a search page
+def get_search_cache_key(keyword: str, search_param: str, page: int) -> str:
+    """
+    Builds the cache key of the products of a search page. The keyword is compared without case and
+    surrounding or repeated whitespace, so that 'Wireless  Earbuds ' and 'wireless earbuds' share their pages.
+
+    Arguments:
+    keyword (str): the search keyword inserted by the user.
+    search_param (str): the key of the category in SEARCH_PARAMS, as returned by value_to_key.
+    page (int): the number of the search page, starting at 1.
+
+    Returns:
+    str: the cache key.
+    """
+    return json.dumps([" ".join(keyword.lower().split()), (search_param or "").strip(), page])
+
+
+# Create a function to extract the products from a search page
+def get_products_from_search_page(html: str) -> Dict[str, List[str]]:
+    """
+    Extracts the name, URL and ASIN of the products listed on an Amazon search page, with one lxml parse
+    of the page and precompiled XPath selectors. Every search result carries the ASIN of its product in its
+    data-asin attribute; results nested in another result are not listed twice. The name joins the texts of
+    the 'a-size-*' spans of the result (limited to 70 letters), and the URL is the first 'a-link-normal' link.
+    Results without a name or a link are left out.
+
+    Arguments:
+    html (str): the HTML content of the search page.
+
+    Returns:
+    Dict[str, List[str]]: the products of the page, with the keys 'Product Name', 'Product URL' and 'ASIN'.
+    """
+    product_data: Dict[str, List[str]] = {"Product Name": [], "Product URL": [], "ASIN": []}
+
+    for product in SEARCH_RESULT_XPATH(parse_html(html)):
+        # Limits the length of the basic description to 70 letters
+        product_name = " ".join(span.text_content().strip() for span in PRODUCT_NAME_XPATH(product))[:70]
+        product_links = PRODUCT_LINK_XPATH(product)
+
+        # only save the data to product_data if product_name and product_url are complete
+        if product_name and product_links:
+            product_data["Product Name"].append(product_name)
+            product_data["Product URL"].append(f"https://www.amazon.com{product_links[0]}")
+            product_data["ASIN"].append(str(product.get("data-asin")))
+
+    return product_data
+
+
+# Create a function to retrieve a product's description from Amazon
+def scrape_amazon_product_description(
+    product_url: str, force_refresh: bool = False, before_request: Optional[Callable[[str], None]] = None
+) -> Optional[str]:
+    """
+    Function scrapes the product url to retrieve the product description.
+    The html pages of Amazon categories are very differently structured.
+    Therefore, different versions are covered by the shared DescriptionExtractor.
+
+    Arguments:
+    product_url (str): the URL of the Amazon product page
+    force_refresh (bool): if True, the product page is downloaded again even if it is cached
+    before_request (Callable[[str], None]): called with the URL if the page is downloaded, e.g. to wait for
+                                            the shared rate limiter
+
+    Returns:
+    description_text (str): a string containing the product description
+    """
+    try:
+        html = fetch_url(product_url, kind="product", force_refresh=force_refresh, before_request=before_request)
+        if html:
+            return description_extractor.extract(html)
+
+    except requests.RequestException as e:
+        logging.error(f"Request error: {e}")
+    except ValueError as ve:
+        logging.error(f"Value error: {ve}")
+    except Exception as ex:
+        logging.error(f"An unexpected error occurred: {ex}")
+
     # Return None if any error occurs during the scraping process
     return None
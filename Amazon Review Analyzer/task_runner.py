@@ -0,0 +1,232 @@
+"""
+task_runner.py: Runs the blocking work started from the user interface, such as network requests and the analysis
+of reviews, in background threads. Results, progress updates and errors are handed back to the Tkinter thread
+through a queue, which the user interface checks regularly, so that widgets are only ever updated from that thread.
+"""
+
+import itertools
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from config import TASK_POLL_INTERVAL_MS, TASK_WORKERS
+
+
+# Create a class to describe a task started from the user interface
+@dataclass
+class Task:
+    """
+    The state of a task run by a TaskRunner.
+
+    Arguments:
+    task_id (int): the identifier of the task, unique within its runner.
+    name (str): the name of the task shown to the user, e.g. 'Searching Amazon'.
+    status (str): 'running', 'done' or 'failed'.
+    progress (Any): the last progress value reported by the task.
+    error (Exception): the exception raised by the task if it failed.
+    """
+
+    task_id: int
+    name: str
+    status: str = "running"
+    progress: Any = None
+    error: Optional[Exception] = None
+
+
+# Create a class to run blocking work outside of the user interface thread
+class TaskRunner:
+    """
+    Runs functions in a pool of background threads and calls their callbacks in the user interface thread.
+    When the function of a task returns, its result is passed to on_done, and if it raises, the exception is
+    passed to on_error. Tasks with an on_progress callback receive a report_progress keyword argument, a
+    function forwarding progress values to that callback.
+
+    The callbacks are put on a queue by the background threads and called by poll(), which reschedules itself
+    with the after() method of the Tkinter root window. Tkinter widgets must only be used from the thread
+    running the main loop, so all the work on widgets happens in these callbacks.
+
+    Arguments:
+    root (tk.Misc): the Tkinter widget whose after() method schedules the polling of the queue.
+    max_workers (int): the number of background threads.
+    poll_interval_ms (int): the number of milliseconds between two polls of the queue.
+    on_change (Callable[[List[Task]], None]): called in the user interface thread with the running tasks
+                                               whenever a task starts or finishes.
+    """
+
+    def __init__(
+        self,
+        root: Any,
+        max_workers: int = TASK_WORKERS,
+        poll_interval_ms: int = TASK_POLL_INTERVAL_MS,
+        on_change: Optional[Callable[[List["Task"]], None]] = None,
+    ) -> None:
+        self.root = root
+        self.poll_interval_ms = poll_interval_ms
+        self.on_change = on_change
+        self.tasks: Dict[int, Task] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task")
+        self._events: "queue.Queue[Callable[[], None]]" = queue.Queue()
+        self._task_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        name: str,
+        work: Callable[..., Any],
+        *args: Any,
+        on_done: Optional[Callable[[Any], None]] = None,
+        on_progress: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ) -> Task:
+        """
+        Starts the given function in a background thread, as work(*args), or as work(*args, report_progress=...)
+        if an on_progress callback is given.
+
+        Arguments:
+        name (str): the name of the task shown to the user.
+        work (Callable[..., Any]): the function to run.
+        *args (Any): the arguments of the function.
+        on_done (Callable[[Any], None]): called in the user interface thread with the result of the function.
+        on_progress (Callable[[Any], None]): called in the user interface thread with every reported progress value.
+        on_error (Callable[[Exception], None]): called in the user interface thread with the exception raised by
+                                                the function. Errors without this callback are printed.
+
+        Returns:
+        Task: the state of the started task.
+        """
+        task = Task(next(self._task_ids), name)
+        with self._lock:
+            self.tasks[task.task_id] = task
+        self._notify_change()
+
+        def report_progress(value: Any) -> None:
+            task.progress = value
+            if on_progress is not None:
+                self.call_soon(on_progress, value)
+
+        def run() -> None:
+            try:
+                result = work(*args, report_progress=report_progress) if on_progress is not None else work(*args)
+            except Exception as error:  # pylint: disable=broad-except
+                task.error = error
+                self.call_soon(self._finish, task, "failed", on_error, error)
+            else:
+                self.call_soon(self._finish, task, "done", on_done, result)
+
+        self._executor.submit(run)
+        return task
+
+    def call_soon(self, callback: Callable[..., Any], *args: Any) -> None:
+        """
+        Schedules a function to be called with the given arguments in the user interface thread. This can be
+        called from any thread.
+
+        Arguments:
+        callback (Callable[..., Any]): the function to call.
+        *args (Any): the arguments of the function.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        self._events.put(lambda: callback(*args))
+
+    def _finish(self, task: Task, status: str, callback: Optional[Callable[[Any], None]], value: Any) -> None:
+        # Report the end of the task before its callback, which may start the next task
+        with self._lock:
+            task.status = status
+            self.tasks.pop(task.task_id, None)
+        self._notify_change()
+
+        if callback is not None:
+            callback(value)
+        elif status == "failed":
+            print(f"Task '{task.name}' failed:")
+            traceback.print_exception(type(value), value, value.__traceback__)
+
+    def _notify_change(self) -> None:
+        if self.on_change is not None:
+            self.call_soon(self.on_change, self.get_running_tasks())
+
+    def get_running_tasks(self) -> List[Task]:
+        """
+        Returns the tasks that have not finished yet, in the order they were started.
+
+        Arguments:
+        None: this function does not take any arguments.
+
+        Returns:
+        List[Task]: the running tasks.
+        """
+        with self._lock:
+            return [task for task in self.tasks.values() if task.status == "running"]
+
+    def process_events(self) -> int:
+        """
+        Calls the callbacks waiting in the queue. Must be called from the user interface thread.
+
+        Arguments:
+        None: this function does not take any arguments.
+
+        Returns:
+        int: the number of callbacks called.
+        """
+        processed = 0
+        while True:
+            try:
+                callback = self._events.get_nowait()
+            except queue.Empty:
+                return processed
+            processed += 1
+            try:
+                callback()
+            except Exception:  # pylint: disable=broad-except
+                # A failing callback must not stop the polling of the queue
+                traceback.print_exc()
+
+    def poll(self) -> None:
+        """
+        Calls the callbacks waiting in the queue and schedules the next poll. Calling it once from the user
+        interface thread starts the regular polling.
+
+        Arguments:
+        None: this function does not take any arguments.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        self.process_events()
+        self.root.after(self.poll_interval_ms, self.poll)
+
+    def process_until_idle(self, timeout: float = 10.0) -> bool:
+        """
+        Calls the callbacks of the tasks in the calling thread until no task is running and the queue is empty,
+        e.g. in tests or scripts without a main loop.
+
+        Arguments:
+        timeout (float): the maximum number of seconds to wait.
+
+        Returns:
+        bool: True if all tasks finished before the timeout, False otherwise.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if not self.process_events() and not self.tasks and self._events.empty():
+                return True
+            time.sleep(0.001)
+        return False
+
+    def shutdown(self) -> None:
+        """
+        Stops the background threads once the running tasks are finished, without starting the waiting ones.
+
+        Arguments:
+        None: this function does not take any arguments.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,132 @@
+"""
+text_streamer.py: Shows text generated piece by piece in a background thread, such as the streamed answers of
+ChatGPT, in a text widget of the GUI. The pieces are collected from any thread and written into the widget from
+the Tkinter thread, with one insert for all the pieces that arrived since the last one.
+"""
+
+import threading
+import tkinter as tk
+from typing import Callable, List, Optional
+
+
+# Create a class to append text to a text widget from background threads
+class TextStreamer:
+    """
+    Appends text to a text widget from any thread. append() only stores the text and, if no write is pending
+    yet, schedules one with call_soon. When the scheduled write runs in the user interface thread, it inserts
+    all the text stored until then at once, so that a fast stream of small pieces costs one insert per poll
+    of the user interface instead of one per piece.
+
+    Every reset() starts a new generation of the content of the widget. Text appended with the generation of an
+    earlier content, e.g. by a worker still streaming the answer of a previous question, is dropped instead of
+    being mixed into the new content.
+
+    Arguments:
+    text_widget (tk.Text): the text widget showing the text.
+    call_soon (Callable[..., None]): schedules a function in the user interface thread, e.g. TaskRunner.call_soon.
+    """
+
+    def __init__(self, text_widget: tk.Text, call_soon: Callable[..., None]) -> None:
+        self.text_widget = text_widget
+        self.call_soon = call_soon
+        # The number of inserts into the text widget, which is the number of batches of pieces
+        self.inserts = 0
+        # The generation of the content of the text widget, increased by every reset
+        self.generation = 0
+        self._pending: List[str] = []
+        self._scheduled = False
+        self._replace = False
+        self._lock = threading.Lock()
+
+    def reset(self, placeholder: str = "") -> int:
+        """
+        Replaces the content of the text widget with a placeholder, which is removed by the first appended
+        text, drops the text not written yet and starts a new generation. Must be called from the user
+        interface thread.
+
+        Arguments:
+        placeholder (str): the text shown until the first text is appended, e.g. 'Generating...'.
+
+        Returns:
+        int: the new generation, to pass to append() and set_text() by the producer of the new content.
+        """
+        with self._lock:
+            self.generation += 1
+            generation = self.generation
+            self._pending.clear()
+            self._replace = True
+        self.text_widget.delete("1.0", tk.END)  # Delete all existing content
+        self.text_widget.insert(tk.INSERT, placeholder)
+        return generation
+
+    def append(self, text: str, generation: Optional[int] = None) -> None:
+        """
+        Appends text to the text widget, in the user interface thread as soon as it polls for callbacks.
+        This can be called from any thread. The text is dropped if the widget was reset since the given
+        generation started.
+
+        Arguments:
+        text (str): the text to append.
+        generation (int): the generation returned by the reset() the text belongs to, None for the current one.
+
+        Returns:
+        None: this function does not return any value.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._pending.append(text)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.call_soon(self.flush)
+
+    def flush(self) -> None:
+        """
+        Writes the text appended since the last write into the text widget with a single insert, replacing
+        the placeholder if it is still shown, and scrolls to the end of the text. Only text of the current
+        generation is written, as reset() drops the pending text of the previous one. Must be called from the
+        user interface thread.
+
+        Arguments:
+        None: this function does not take any arguments.
+
+        Returns:
+        None: this function does not return any value but updates the text widget.
+        """
+        with self._lock:
+            text = "".join(self._pending)
+            self._pending.clear()
+            self._scheduled = False
+            replace = self._replace and bool(text)
+            if replace:
+                self._replace = False
+
+        if not text:
+            return
+        if replace:
+            self.text_widget.delete("1.0", tk.END)
+        self.text_widget.insert(tk.END, text)
+        self.text_widget.see(tk.END)
+        self.inserts += 1
+
+    def set_text(self, text: str, generation: Optional[int] = None) -> None:
+        """
+        Replaces the content of the text widget with the given text, e.g. the complete answer in place of its
+        streamed pieces, and drops the text not written yet. Nothing is changed if the widget was reset since the
+        given generation started. Must be called from the user interface thread.
+
+        Arguments:
+        text (str): the new content of the text widget.
+        generation (int): the generation returned by the reset() the text belongs to, None for the current one.
+
+        Returns:
+        None: this function does not return any value but updates the text widget.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._pending.clear()
+            self._replace = False
+        self.text_widget.delete("1.0", tk.END)  # Delete all existing content
+        self.text_widget.insert(tk.INSERT, text)
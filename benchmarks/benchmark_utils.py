@@ -0,0 +1,50 @@
+"""
+benchmark_utils.py: Contains helpers shared by the benchmark scripts, such as loading fixtures and timing functions.
+"""
+
+import os
+import sys
+import time
+from typing import Any, Callable, Tuple
+
+# Make the application modules and the test fixtures available to the benchmark scripts
+REPOSITORY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPOSITORY_DIR, "Amazon Review Analyzer"))
+FIXTURES_DIR = os.path.join(REPOSITORY_DIR, "tests", "fixtures")
+
+
+# Create a function to read a fixture file
+def load_fixture(file_name: str) -> str:
+    """
+    Reads a fixture file from the tests/fixtures folder.
+
+    Arguments:
+    file_name (str): the name of the fixture file.
+
+    Returns:
+    str: the content of the fixture file.
+    """
+    with open(os.path.join(FIXTURES_DIR, file_name), encoding="utf-8") as fixture:
+        return fixture.read()
+
+
+# Create a function to measure the best running time of a function
+def time_function(function: Callable[[], Any], repeat: int = 5) -> Tuple[float, Any]:
+    """
+    Runs the function repeat times and returns the fastest running time, which is the least
+    disturbed by other processes, together with the result of the last run.
+
+    Arguments:
+    function (Callable[[], Any]): the function to time, called without arguments.
+    repeat (int): the number of runs.
+
+    Returns:
+    Tuple[float, Any]: the fastest running time in seconds and the result of the function.
+    """
+    best_time = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time, result
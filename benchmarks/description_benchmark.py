@@ -0,0 +1,100 @@
+"""
+description_benchmark.py: Compares the former BeautifulSoup extraction of product descriptions, which searches the
+whole page once per layout in a fixed order, with the DescriptionExtractor on the book and electronics product page
+fixtures, and checks that both give identical output.
+
+Run with: python benchmarks/description_benchmark.py
+"""
+
+from typing import Optional
+
+from bs4 import BeautifulSoup
+
+from benchmark_utils import load_fixture, time_function
+from scraping_utils import DescriptionExtractor
+
+# Product page fixtures of the benchmark
+FIXTURES = ("product_page_book.html", "product_page_electronics.html")
+
+
+# Create a function to extract the description with BeautifulSoup, as the application did before
+def extract_with_beautifulsoup(html: str) -> Optional[str]:
+    """
+    Extracts the description of a product page with the html.parser backend of BeautifulSoup, trying the
+    feature bullets, product facts, book description and product description layouts in this order.
+
+    Arguments:
+    html (str): the HTML content of the product page.
+
+    Returns:
+    str or None: the description, or None if none of the layouts is found on the page.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    product_description_div = soup.find("div", {"id": "feature-bullets"})
+    if product_description_div:
+        unordered_list = product_description_div.find("ul", {"class": "a-unordered-list"})
+        if unordered_list:
+            return "\n".join(
+                item.find("span", {"class": "a-list-item"}).text.strip() for item in unordered_list.find_all("li")
+            )
+
+    product_description_div = soup.find("div", {"id": "productFactsDesktopExpander"})
+    if product_description_div:
+        unordered_lists = product_description_div.find_all("ul", {"class": "a-unordered-list"})
+        if unordered_lists:
+            description_text = ""
+            for ul in unordered_lists:
+                item_list = ul.find_all("li")
+                if item_list:
+                    description_text += "\n".join(
+                        "/ " + item.find("span", {"class": "a-list-item"}).text.strip() for item in item_list
+                    )
+            return description_text.strip()
+
+    product_description_div = soup.find("div", {"id": "bookDescription_feature_div"})
+    if product_description_div:
+        span_elements = product_description_div.find_all("span")
+        if span_elements:
+            description_text = ""
+            for span_tag in span_elements:
+                description_text += span_tag.get_text(separator="\n", strip=True) + "\n"
+            return description_text.strip()
+
+    product_description_div = soup.find("div", {"id": "productDescription"})
+    if product_description_div:
+        paragraphs = product_description_div.find_all("p")
+        if paragraphs:
+            return "\n".join(paragraph.get_text(separator="\n", strip=True) for paragraph in paragraphs)
+
+    return None
+
+
+# Create a function to run the benchmark and print the results
+def main() -> None:
+    """
+    Times both extraction paths on each product page fixture and prints the latency per page.
+
+    Arguments:
+    None: this function does not take any arguments.
+
+    Returns:
+    None: this function does not return any value but prints the results.
+    """
+    extractor = DescriptionExtractor()
+
+    for file_name in FIXTURES:
+        html = load_fixture(file_name)
+        bs_time, bs_description = time_function(lambda: extract_with_beautifulsoup(html))
+        lxml_time, lxml_description = time_function(lambda: extractor.extract(html), repeat=20)
+
+        if bs_description != lxml_description:
+            raise AssertionError(f"The extractor does not give the same description as BeautifulSoup on {file_name}")
+
+        print(f"{file_name} ({len(html) / 1024:.0f} KB):")
+        print(f"  BeautifulSoup, fixed order:  {bs_time * 1000:7.2f} ms/page")
+        print(f"  DescriptionExtractor:        {lxml_time * 1000:7.2f} ms/page ({bs_time / lxml_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+parse_pool_benchmark.py: Measures how the extraction and sentiment analysis of a 200-page scrape scale with the
+number of worker processes of the parse pool. The pages are built from the fixture with distinct review texts, so
+no request is sent, and the sentiment cache is disabled, so that every page is analyzed by the workers.
+
+Run with: python benchmarks/parse_pool_benchmark.py
+"""
+
+import os
+import re
+import time
+from typing import List
+from unittest.mock import patch
+
+from benchmark_utils import load_fixture
+from scraping_utils import parse_review_page, shutdown_parse_pool, start_parse_pool
+
+# Number of review pages of the simulated scrape
+NUM_PAGES = 200
+
+
+# Create a function to build distinct review pages
+def build_pages(num_pages: int) -> List[str]:
+    """
+    Builds review pages from the review page fixture, prefixing every review text with the number of its page
+    and review, so that no two reviews have the same text.
+
+    Arguments:
+    num_pages (int): the number of pages to build.
+
+    Returns:
+    List[str]: the HTML content of the pages.
+    """
+    page_html = load_fixture("review_page.html")
+    pages = []
+    for page in range(num_pages):
+        reviews = iter(range(page_html.count('data-hook="review-body"')))
+        pages.append(
+            re.sub(
+                r'(data-hook="review-body"[^>]*>\s*<span>)',
+                lambda match: f"{match.group(1)}Page {page}, review {next(reviews)}. ",
+                page_html,
+            )
+        )
+    return pages
+
+
+# Create a function to list the numbers of worker processes to measure
+def get_worker_counts(cores: int) -> List[int]:
+    """
+    Returns the numbers of worker processes to measure: the powers of two below the number of cores, and the
+    number of cores itself.
+
+    Arguments:
+    cores (int): the number of cores of the machine.
+
+    Returns:
+    List[int]: the numbers of worker processes, in increasing order.
+    """
+    counts = []
+    workers = 1
+    while workers < cores:
+        counts.append(workers)
+        workers *= 2
+    return counts + [cores]
+
+
+# Create a function to run the benchmark and print the results
+def main() -> None:
+    """
+    Analyzes NUM_PAGES distinct review pages in the scraping thread and with 1, 2, 4, ... up to os.cpu_count()
+    worker processes, and prints the throughput and the speed-up of each configuration.
+
+    Arguments:
+    None: this function does not take any arguments.
+
+    Returns:
+    None: this function does not return any value but prints the results.
+    """
+    pages = build_pages(NUM_PAGES)
+    cores = os.cpu_count() or 1
+
+    # The workers are forked after the patch, so they do not use the sentiment cache either
+    with patch("data_analysis.get_sentiment_cache", return_value=None):
+        start = time.perf_counter()
+        expected = [parse_review_page(page) for page in pages]
+        baseline = time.perf_counter() - start
+        print(f"{NUM_PAGES} pages, {sum(len(page) for page in expected)} reviews, {cores} cores")
+        print(f"Scraping thread: {NUM_PAGES / baseline:7.1f} pages/sec")
+
+        for workers in get_worker_counts(cores):
+            pool = start_parse_pool(workers=workers)
+            if pool is None:
+                print("Worker processes are not used on this platform")
+                return
+
+            start = time.perf_counter()
+            results = list(pool.map(parse_review_page, pages))
+            elapsed = time.perf_counter() - start
+            shutdown_parse_pool()
+
+            if results != expected:
+                raise AssertionError("The worker processes do not give the same results")
+            print(f"{workers:2} worker(s):    {NUM_PAGES / elapsed:7.1f} pages/sec ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
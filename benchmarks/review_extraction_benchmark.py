@@ -0,0 +1,77 @@
+"""
+review_extraction_benchmark.py: Compares the per-field BeautifulSoup extraction of reviews with the compiled
+single-pass lxml extractor on a saved review page, and checks that both give identical output.
+
+Run with: python benchmarks/review_extraction_benchmark.py
+"""
+
+from typing import Dict, List
+
+from benchmark_utils import load_fixture, time_function
+from scraping_utils import (
+    extract_reviews_from_html,
+    get_number_stars,
+    get_review_date,
+    get_review_header,
+    get_review_id,
+    get_review_text,
+    get_reviews_from_html,
+)
+
+# Number of times the fixture page is extracted per timed run
+PAGES_PER_RUN = 20
+
+
+# Create a function to extract the reviews with the BeautifulSoup functions
+def extract_with_beautifulsoup(page_html: str) -> List[Dict[str, str]]:
+    """
+    Extracts the review fields with get_reviews_from_html and the per-field BeautifulSoup functions.
+
+    Arguments:
+    page_html (str): HTML content of a review page.
+
+    Returns:
+    List[Dict[str, str]]: the fields of each review.
+    """
+    return [
+        {
+            "review_id": get_review_id(review),
+            "review_text": get_review_text(review),
+            "review_date": get_review_date(review),
+            "review_title": get_review_header(review),
+            "review_stars": get_number_stars(review),
+        }
+        for review in get_reviews_from_html(page_html)
+    ]
+
+
+# Create a function to run the benchmark and print the results
+def main() -> None:
+    """
+    Times both extraction paths on the review page fixture and prints the throughput in reviews per second.
+
+    Arguments:
+    None: this function does not take any arguments.
+
+    Returns:
+    None: this function does not return any value but prints the results.
+    """
+    page_html = load_fixture("review_page.html")
+
+    bs_time, bs_reviews = time_function(lambda: [extract_with_beautifulsoup(page_html) for _ in range(PAGES_PER_RUN)])
+    lxml_time, lxml_reviews = time_function(
+        lambda: [extract_reviews_from_html(page_html) for _ in range(PAGES_PER_RUN)]
+    )
+
+    if bs_reviews != lxml_reviews:
+        raise AssertionError("The compiled extractor does not give the same output as BeautifulSoup")
+
+    review_count = sum(len(page) for page in bs_reviews)
+    print(f"Fixture: review_page.html ({len(page_html) / 1024:.0f} KB, {review_count // PAGES_PER_RUN} reviews)")
+    print(f"BeautifulSoup per-field lookups: {review_count / bs_time:10.0f} reviews/sec")
+    print(f"Compiled lxml extractor:         {review_count / lxml_time:10.0f} reviews/sec")
+    print(f"Speed-up: {bs_time / lxml_time:.1f}x, identical output: yes")
+
+
+if __name__ == "__main__":
+    main()
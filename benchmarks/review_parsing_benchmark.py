@@ -0,0 +1,58 @@
+"""
+review_parsing_benchmark.py: Compares the parse time and the size of the tree built by get_review_elements, which
+starts the parse of a review page at its first review, with a parse of the whole page.
+
+Run with: python benchmarks/review_parsing_benchmark.py
+"""
+
+from lxml import html as lxml_html
+
+from benchmark_utils import load_fixture, time_function
+from scraping_utils import get_review_elements
+
+
+# Create a function to find the review elements in the tree of the whole page
+def get_review_elements_from_whole_page(page_html: str) -> list:
+    """
+    Parses the whole review page with lxml and returns its review elements.
+
+    Arguments:
+    page_html (str): HTML content of a review page.
+
+    Returns:
+    list: a list of lxml review elements.
+    """
+    return lxml_html.document_fromstring(page_html).xpath("//div[@data-hook='review']")
+
+
+# Create a function to run the benchmark and print the results
+def main() -> None:
+    """
+    Parses the review page fixture both ways and prints the parse time per page and the number of elements built.
+    The tree is held in memory by libxml2, which tracemalloc does not see, so its size is given in elements.
+
+    Arguments:
+    None: this function does not take any arguments.
+
+    Returns:
+    None: this function does not return any value but prints the results.
+    """
+    page_html = load_fixture("review_page.html")
+    print(f"Fixture: review_page.html ({len(page_html) / 1024:.0f} KB)")
+
+    results = {}
+    for label, function in (
+        ("Whole page", get_review_elements_from_whole_page),
+        ("From first review", get_review_elements),
+    ):
+        parse_time, reviews = time_function(lambda: function(page_html), repeat=50)
+        elements = sum(1 for _ in reviews[0].getroottree().iter())
+        results[label] = [lxml_html.tostring(review, with_tail=False) for review in reviews]
+        print(f"{label:18} {parse_time * 1000:6.2f} ms/page {elements:6} elements built, {len(reviews)} reviews")
+
+    if results["Whole page"] != results["From first review"]:
+        raise AssertionError("The parse from the first review does not return the same review elements")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+review_selection_benchmark.py: Compares the text of the reviews attached to the questions for ChatGPT when all
+reviews are summarized in chunks with the representative reviews chosen by select_representative_reviews, on
+the review set fixtures. It reports the tokens sent to ChatGPT, the number of requests, the time until the
+final question can be asked, and the share of the complaint themes of each fixture found in the attached reviews.
+
+ChatGPT is replaced by a fake answering every request after REQUEST_SECONDS plus SECONDS_PER_TOKEN per prompt
+token, with a summary of SUMMARY_WORDS words, so the latencies are simulated.
+
+Run with: python benchmarks/review_selection_benchmark.py
+"""
+
+import json
+import time
+from typing import Any, Callable, Dict, List
+from unittest.mock import patch
+
+from benchmark_utils import load_fixture, time_function
+from chatgpt_integration import format_reviews_for_prompt
+from config import CHATGPT_PROMPT_MAX_TOKENS
+from review_selector import select_representative_reviews
+from review_summarizer import condense_reviews, count_tokens, get_encoding
+
+# Simulated latency of a ChatGPT request: a fixed part and a part per prompt token
+REQUEST_SECONDS = 0.2
+SECONDS_PER_TOKEN = 0.00005
+
+# Number of words of the fake summaries
+SUMMARY_WORDS = 60
+
+# Number of characters of the questions before the token-aware summaries
+FORMER_PROMPT_CHARACTERS = 4000
+
+
+# Create a class to replace ChatGPT and count the requests and tokens sent to it
+class FakeChatGPT:
+    """
+    Answers every question with the same summary after a delay growing with the tokens of the question.
+    """
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.tokens = 0
+
+    def __call__(self, question: str) -> str:
+        tokens = count_tokens(question)
+        self.requests += 1
+        self.tokens += tokens
+        time.sleep(REQUEST_SECONDS + tokens * SECONDS_PER_TOKEN)
+        return " ".join(["point"] * SUMMARY_WORDS)
+
+
+# Create a function to ask the final question about the text of the reviews with a fake ChatGPT
+def measure(prepare: Callable[[List[Dict[str, Any]]], str], reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Builds the text of the reviews with the given function and asks one final question about it, with the
+    fake ChatGPT counting the requests and tokens.
+
+    Arguments:
+    prepare (Callable[[List[Dict[str, Any]]], str]): the function building the text of the reviews.
+    reviews (List[Dict[str, Any]]): the reviews of the fixture.
+
+    Returns:
+    Dict[str, Any]: the attached text, the tokens and requests sent, and the elapsed seconds.
+    """
+    fake_chatgpt = FakeChatGPT()
+    start = time.perf_counter()
+    with patch("review_summarizer.request_chatgpt", fake_chatgpt):
+        text = prepare(reviews)
+    fake_chatgpt(f"Summarize the negative and positive sentiment of the reviews attached. {text}")
+    return {
+        "text": text,
+        "tokens": fake_chatgpt.tokens,
+        "requests": fake_chatgpt.requests,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+# Create a function to run the benchmark and print the results
+def main() -> None:
+    """
+    Measures the former truncation of the questions, the summaries of all reviews and the representative
+    reviews on each review set, and prints the tokens, requests, latency and theme coverage of each.
+
+    Arguments:
+    None: this function does not take any arguments.
+
+    Returns:
+    None: this function does not return any value but prints the results.
+    """
+    review_sets = json.loads(load_fixture("review_sets.json"))
+    tokenizer = "counted with tiktoken" if get_encoding() is not None else "estimated from the number of letters"
+    print(f"Tokens {tokenizer}, budget of {CHATGPT_PROMPT_MAX_TOKENS} tokens per question")
+    print(f"Simulated latency of a request: {REQUEST_SECONDS}s + {SECONDS_PER_TOKEN}s per prompt token")
+
+    approaches = {
+        "First 4000 characters": lambda reviews: format_reviews_for_prompt(reviews)[:FORMER_PROMPT_CHARACTERS],
+        "All reviews, summarized": condense_reviews,
+        "Representative reviews": lambda reviews: condense_reviews(select_representative_reviews(reviews)),
+    }
+
+    for name, review_set in review_sets.items():
+        reviews = review_set["reviews"]
+        negative_themes = set(review_set["negative_themes"])
+        selection_time, selected = time_function(lambda: select_representative_reviews(reviews), repeat=3)
+        print(f"\n{name}: {len(reviews)} reviews, {len(negative_themes)} complaint themes")
+        print(f"  Selection: {len(selected)} reviews in {selection_time * 1000:.0f} ms")
+        print(f"  {'':24} {'tokens':>8} {'requests':>9} {'latency':>8} {'complaints covered':>19}")
+
+        for approach, prepare in approaches.items():
+            result = measure(prepare, reviews)
+            if approach == "All reviews, summarized":
+                # Every review is read by one of the chunk summaries
+                covered = negative_themes
+            else:
+                covered = {
+                    review["theme"]
+                    for review in reviews
+                    if review["theme"] in negative_themes and review["review_text"] in result["text"]
+                }
+            print(
+                f"  {approach:24} {result['tokens']:8d} {result['requests']:9d} {result['seconds']:7.2f}s "
+                f"{len(covered):>10d} of {len(negative_themes)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+review_store_benchmark.py: Compares filtering and averaging 100,000 reviews held as a list of dictionaries
+with the same operations on the columnar ReviewStore and its range index, and compares adding the reviews of
+a scraped page with ReviewStore.extend() with building the store again.
+
+Run with: python benchmarks/review_store_benchmark.py
+"""
+
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmark_utils import time_function
+from data_analysis import get_polarity_color
+from review_store import ReviewStore
+
+# Number of generated reviews
+REVIEW_COUNT = 100000
+# Number of reviews on a scraped review page
+PAGE_SIZE = 10
+
+
+# Create a function to generate random reviews
+def generate_reviews(review_count: int) -> List[Dict[str, Any]]:
+    """
+    Generates reviews with random scores, ratings and dates in the format of the scraping functions.
+
+    Arguments:
+    review_count (int): the number of reviews to generate.
+
+    Returns:
+    List[Dict[str, Any]]: the generated reviews.
+    """
+    rng = np.random.default_rng(0)
+    polarity = rng.uniform(-1, 1, review_count)
+    subjectivity = rng.uniform(0, 1, review_count)
+    stars = rng.integers(1, 6, review_count)
+    days = rng.integers(1, 29, review_count)
+    return [
+        {
+            "review_id": f"R{index}",
+            "review_title": f"Title {index}",
+            "review_date": f"Reviewed in the United States on April {days[index]}, 2023",
+            "review_stars": f"{stars[index]}.0 out of 5 stars",
+            "review_text": f"Text of review {index}",
+            "textblob_polarity": float(polarity[index]),
+            "textblob_subjectivity": float(subjectivity[index]),
+        }
+        for index in range(review_count)
+    ]
+
+
+# Create a function to run the benchmark and print the results
+def main() -> None:
+    """
+    Times the filtering of the reviews and the computation of their average polarity on the list of
+    dictionaries and on the ReviewStore, and prints the results in milliseconds.
+
+    Arguments:
+    None: this function does not take any arguments.
+
+    Returns:
+    None: this function does not return any value but prints the results.
+    """
+    reviews = generate_reviews(REVIEW_COUNT)
+    build_time, store = time_function(lambda: ReviewStore(reviews), repeat=3)
+
+    list_filter_time, list_matches = time_function(
+        lambda: [
+            review
+            for review in reviews
+            if 0.3 <= review["textblob_subjectivity"] <= 0.8 and 0.1 <= review["textblob_polarity"] <= 1.0
+        ]
+    )
+    store_filter_time, store_matches = time_function(
+        lambda: store.filter(min_subjectivity=0.3, max_subjectivity=0.8, min_polarity=0.1, max_polarity=1.0)
+    )
+    if [review["review_id"] for review in list_matches] != store.get_review_ids(store_matches):
+        raise AssertionError("The review store does not select the same reviews as the list comprehension")
+
+    # Narrow ranges, as while typing the first digits of a filter, benefit most from the range index
+    narrow_scan_time, narrow_scan = time_function(
+        lambda: np.flatnonzero(
+            (store.subjectivity >= 0.5)
+            & (store.subjectivity <= 0.52)
+            & (store.polarity >= -0.1)
+            & (store.polarity <= 0.1)
+        )
+    )
+    narrow_index_time, narrow_matches = time_function(
+        lambda: store.filter(min_subjectivity=0.5, max_subjectivity=0.52, min_polarity=-0.1, max_polarity=0.1)
+    )
+    if not np.array_equal(narrow_scan, narrow_matches):
+        raise AssertionError("The range index does not select the same reviews as a scan")
+
+    list_average_time, (list_average, _) = time_function(lambda: get_polarity_color(reviews))
+    store_average_time, store_average = time_function(store.average_polarity)
+    if not np.isclose(list_average, store_average):
+        raise AssertionError("The review store does not compute the same average polarity")
+
+    print(f"Reviews: {REVIEW_COUNT}, matching the filters: {len(store_matches)}")
+    print(f"Building the review store:                   {build_time * 1000:8.1f} ms")
+    print(f"Filtering, list of dictionaries:             {list_filter_time * 1000:8.2f} ms")
+    print(f"Filtering, review store:                     {store_filter_time * 1000:8.2f} ms")
+    print(
+        f"Narrow filter ({len(narrow_matches)} matches), NumPy scan:".ljust(45) + f"{narrow_scan_time * 1000:8.2f} ms"
+    )
+    print(
+        f"Narrow filter ({len(narrow_matches)} matches), range index:".ljust(45) + f"{narrow_index_time * 1000:8.2f} ms"
+    )
+    print(f"Average polarity, list of dictionaries:      {list_average_time * 1000:8.2f} ms")
+    print(f"Average polarity, review store:              {store_average_time * 1000:8.2f} ms")
+    measure_adding_pages(reviews)
+
+
+# Create a function to measure adding scraped pages to a store
+def measure_adding_pages(reviews: List[Dict[str, Any]]) -> None:
+    """
+    Times adding one page of reviews to a store already holding all other reviews, as the GUI does for every
+    scraped page, with ReviewStore.extend() and by building the store again from all reviews, and checks that
+    both stores filter the same reviews.
+
+    Arguments:
+    reviews (List[Dict[str, Any]]): the generated reviews.
+
+    Returns:
+    None: this function does not return any value but prints the results.
+    """
+    previous_reviews, page = reviews[:-PAGE_SIZE], reviews[-PAGE_SIZE:]
+    stores = []
+
+    def extend_store() -> None:
+        store = ReviewStore(previous_reviews)
+        start = time.perf_counter()
+        store.extend(page)
+        extend_times.append(time.perf_counter() - start)
+        stores.append(store)
+
+    extend_times: List[float] = []
+    for _ in range(3):
+        extend_store()
+    rebuild_time, rebuilt_store = time_function(lambda: ReviewStore(previous_reviews + page), repeat=3)
+
+    ranges = {"min_subjectivity": 0.3, "max_subjectivity": 0.8, "min_polarity": 0.1, "max_stars": 3}
+    if not np.array_equal(stores[-1].filter(**ranges), rebuilt_store.filter(**ranges)):
+        raise AssertionError("The extended store does not select the same reviews as the rebuilt store")
+
+    print(f"Adding a page of {PAGE_SIZE} reviews, rebuilding:".ljust(45) + f"{rebuild_time * 1000:8.2f} ms")
+    print(f"Adding a page of {PAGE_SIZE} reviews, extend():".ljust(45) + f"{min(extend_times) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+review_viewer_benchmark.py: Compares writing all 50,000 scraped reviews into the text area, one insert per review,
+with scrolling through them in the virtualized ReviewListView, which only writes the reviews in view. The text
+widget is replaced by a buffer counting the written characters, so that the benchmark runs without a display;
+a real Tk Text widget adds a cost per written character on top of these times.
+
+Run with: python benchmarks/review_viewer_benchmark.py
+"""
+
+from typing import Any, List
+
+import numpy as np
+
+from benchmark_utils import time_function
+from review_store import ReviewStore
+from review_store_benchmark import generate_reviews
+from review_viewer import ReviewListView, format_review
+
+# Number of generated reviews and of scroll steps
+REVIEW_COUNT = 50000
+SCROLL_STEPS = 1000
+
+
+# Create a class standing in for the Tk Text widget
+class TextBuffer:
+    """
+    Keeps the text written by the review list like a Text widget, and counts the written characters. All lines
+    of the text are always in view.
+    """
+
+    def __init__(self) -> None:
+        self.chunks: List[str] = []
+        self.written_characters = 0
+
+    def insert(self, index: str, text: str) -> None:
+        self.chunks.append(text)
+        self.written_characters += len(text)
+
+    def delete(self, first: str, last: str) -> None:
+        self.chunks = []
+
+    def bind(self, sequence: str, function: Any) -> None:
+        pass
+
+    def index(self, index: str) -> str:
+        # The first line is at the top and the last line at the bottom of the view
+        line_count = "".join(self.chunks).count("\n") + 1
+        return "1.0" if index == "@0,0" else f"{line_count}.0"
+
+    def winfo_height(self) -> int:
+        return 1
+
+    def yview(self, *args: Any) -> Any:
+        return (0.0, 1.0) if not args else None
+
+    def yview_scroll(self, number: int, what: str) -> None:
+        pass
+
+
+# Create a class standing in for the Tk Scrollbar widget
+class ScrollbarStub:
+    def config(self, **options: Any) -> None:
+        pass
+
+    def set(self, first: float, last: float) -> None:
+        pass
+
+
+# Create a function to run the benchmark and print the results
+def main() -> None:
+    """
+    Times writing all reviews into the text area and scrolling through them with the review list, and prints
+    the results in milliseconds.
+
+    Arguments:
+    None: this function does not take any arguments.
+
+    Returns:
+    None: this function does not return any value but prints the results.
+    """
+    reviews = generate_reviews(REVIEW_COUNT)
+    store = ReviewStore(reviews)
+    positions = np.arange(len(store))
+
+    def insert_all_reviews() -> TextBuffer:
+        text_area = TextBuffer()
+        for review in reviews:
+            text_area.insert("insert", format_review(review))
+        return text_area
+
+    insert_all_time, full_text_area = time_function(insert_all_reviews, repeat=3)
+
+    text_area = TextBuffer()
+    review_list = ReviewListView(text_area, ScrollbarStub())
+    review_list.set_reviews(store, positions)
+    rng = np.random.default_rng(0)
+    targets = rng.uniform(0, 1, SCROLL_STEPS)
+
+    def scroll() -> None:
+        for target in targets:
+            review_list.yview("moveto", str(target))
+
+    scroll_time, _ = time_function(scroll, repeat=3)
+    sort_time, _ = time_function(lambda: store.sort(positions, "date", descending=True))
+
+    print(f"Reviews: {REVIEW_COUNT}")
+    print(
+        f"Inserting all reviews into the text area:   {insert_all_time * 1000:8.1f} ms, "
+        f"{full_text_area.written_characters / 1e6:.1f} million characters"
+    )
+    print(f"Scroll step of the review list (average):   {scroll_time / SCROLL_STEPS * 1000:8.3f} ms")
+    print(f"Sorting all reviews by date:                {sort_time * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+search_extraction_benchmark.py: Compares the former BeautifulSoup extraction of the products of a search page with
+get_products_from_search_page, which uses lxml and precompiled selectors, and checks that both give identical output.
+
+Run with: python benchmarks/search_extraction_benchmark.py
+"""
+
+import re
+from typing import Dict, List
+
+from bs4 import BeautifulSoup
+
+from benchmark_utils import load_fixture, time_function
+from scraping_utils import get_products_from_search_page
+
+# Number of times the fixture page is extracted per timed run
+PAGES_PER_RUN = 5
+
+
+# Create a function to extract the products with BeautifulSoup, as the application did before
+def extract_with_beautifulsoup(html: str) -> Dict[str, List[str]]:
+    """
+    Extracts the products of a search page with the html.parser backend of BeautifulSoup, a regular expression
+    on the class of every span and a regular expression on the URL of every product for its ASIN.
+
+    Arguments:
+    html (str): the HTML content of the search page.
+
+    Returns:
+    Dict[str, List[str]]: the products of the page, with the keys 'Product Name', 'Product URL' and 'ASIN'.
+    """
+    product_data: Dict[str, List[str]] = {"Product Name": [], "Product URL": [], "ASIN": []}
+    soup = BeautifulSoup(html, "html.parser")
+
+    for product in soup.find_all("div", {"data-asin": True}):
+        product_name = product.find_all("span", class_=re.compile("^a-size-"))
+        if product_name:
+            product_name = " ".join(span.text.strip() for span in product_name)[:70]
+
+        product_url = ""
+        asin = None
+        product_url_class = product.find("a", {"class": "a-link-normal"})
+        if product_url_class:
+            product_url = f"https://www.amazon.com{product_url_class['href']}"
+            asin_match = re.search(r"/dp/(\w+)/", product_url_class["href"])
+            asin = asin_match.group(1) if asin_match else None
+
+        if product_name and product_url and asin:
+            product_data["Product Name"].append(product_name)
+            product_data["Product URL"].append(product_url)
+            product_data["ASIN"].append(asin)
+
+    return product_data
+
+
+# Create a function to run the benchmark and print the results
+def main() -> None:
+    """
+    Times both extraction paths on the search page fixture and prints the throughput in products per second.
+
+    Arguments:
+    None: this function does not take any arguments.
+
+    Returns:
+    None: this function does not return any value but prints the results.
+    """
+    html = load_fixture("search_page.html")
+
+    bs_time, bs_pages = time_function(lambda: [extract_with_beautifulsoup(html) for _ in range(PAGES_PER_RUN)])
+    lxml_time, lxml_pages = time_function(lambda: [get_products_from_search_page(html) for _ in range(PAGES_PER_RUN)])
+
+    if bs_pages != lxml_pages:
+        raise AssertionError("The lxml extractor does not give the same output as BeautifulSoup")
+
+    product_count = sum(len(page["ASIN"]) for page in bs_pages)
+    print(f"Fixture: search_page.html ({len(html) / 1024:.0f} KB, {product_count // PAGES_PER_RUN} products)")
+    print(f"BeautifulSoup (html.parser): {product_count / bs_time:8.0f} products/sec")
+    print(f"lxml with XPath selectors:   {product_count / lxml_time:8.0f} products/sec")
+    print(f"Speed-up: {bs_time / lxml_time:.1f}x, identical output: yes")
+
+
+if __name__ == "__main__":
+    main()
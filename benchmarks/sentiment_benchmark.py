@@ -0,0 +1,102 @@
+"""
+sentiment_benchmark.py: Compares the sentiment analysis with one TextBlob per review with the batch analyzer,
+both for accuracy on the review corpus fixture and for throughput, and measures the batch analyzer without
+the sentiment cache, with an empty cache and with the results read back from the disk tier of the cache.
+
+Run with: python benchmarks/sentiment_benchmark.py
+"""
+
+import json
+import os
+import tempfile
+from typing import List
+from unittest.mock import patch
+
+import numpy as np
+
+from benchmark_utils import load_fixture, time_function
+from cache_utils import DiskCache, LRUCache, TieredCache
+from data_analysis import analyze_sentiment_batch, analyze_sentiment_with_textblob, analyze_sentiments
+
+# Number of times the review corpus is repeated for the throughput measurement
+CORPUS_REPEATS = 40
+
+
+# Create a function to run the benchmark and print the results
+def main() -> None:
+    """
+    Scores the review corpus fixture with both engines, prints how close the batch scores are to the
+    TextBlob scores, and prints the throughput of both engines in reviews per second.
+
+    Arguments:
+    None: this function does not take any arguments.
+
+    Returns:
+    None: this function does not return any value but prints the results.
+    """
+    corpus = json.loads(load_fixture("review_corpus.json"))
+    texts = corpus * CORPUS_REPEATS
+
+    # Load the lexicon before timing, as the application does once per session
+    analyze_sentiment_batch(corpus)
+
+    textblob_time, textblob_sentiments = time_function(
+        lambda: [analyze_sentiment_with_textblob(text) for text in texts], repeat=3
+    )
+    batch_time, batch_sentiments = time_function(lambda: analyze_sentiment_batch(texts), repeat=3)
+
+    textblob_polarity = np.array([sentiment.polarity for sentiment in textblob_sentiments[: len(corpus)]])
+    batch_polarity = np.array([sentiment.polarity for sentiment in batch_sentiments[: len(corpus)]])
+    textblob_subjectivity = np.array([sentiment.subjectivity for sentiment in textblob_sentiments[: len(corpus)]])
+    batch_subjectivity = np.array([sentiment.subjectivity for sentiment in batch_sentiments[: len(corpus)]])
+
+    print(f"Fixture: review_corpus.json ({len(corpus)} reviews, repeated {CORPUS_REPEATS} times)")
+    print(f"Polarity correlation:      {np.corrcoef(batch_polarity, textblob_polarity)[0, 1]:.4f}")
+    print(f"Polarity sign agreement:   {np.mean(np.sign(batch_polarity) == np.sign(textblob_polarity)):.1%}")
+    print(f"Mean polarity difference:  {np.mean(np.abs(batch_polarity - textblob_polarity)):.4f}")
+    print(f"Mean subjectivity diff.:   {np.mean(np.abs(batch_subjectivity - textblob_subjectivity)):.4f}")
+    print(f"Identical scores:          {np.mean(np.isclose(batch_polarity, textblob_polarity)):.1%}")
+    print(f"TextBlob per review: {len(texts) / textblob_time:10.0f} reviews/sec")
+    print(f"Batch analyzer:      {len(texts) / batch_time:10.0f} reviews/sec")
+    print(f"Speed-up: {textblob_time / batch_time:.1f}x")
+    measure_sentiment_cache(corpus, "textblob")
+    measure_sentiment_cache(corpus, "batch")
+
+
+# Create a function to measure the sentiment cache
+def measure_sentiment_cache(corpus: List[str], engine: str) -> None:
+    """
+    Analyzes a set of distinct review texts with the given engine without a cache, with an empty cache in a
+    temporary folder, and again with only the disk tier of that cache filled, and prints the throughput of each.
+
+    Arguments:
+    corpus (List[str]): the review texts of the fixture.
+    engine (str): 'textblob' or 'batch'.
+
+    Returns:
+    None: this function does not return any value but prints the results.
+    """
+    # Distinct texts, so that every review needs its own cache entry as in a real scrape
+    texts = [f"{text} (review {index})" for index in range(CORPUS_REPEATS) for text in corpus]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        disk = DiskCache(os.path.join(temp_dir, "sentiment_cache.sqlite3"), 64 * 1024 * 1024)
+        cache = TieredCache(LRUCache(len(texts)), disk)
+
+        with patch("data_analysis.get_sentiment_cache", return_value=None):
+            uncached_time, _ = time_function(lambda: analyze_sentiments(texts, engine), repeat=3)
+        with patch("data_analysis.get_sentiment_cache", return_value=cache):
+            cold_time, _ = time_function(
+                lambda: (cache.memory.clear(), disk.clear(), analyze_sentiments(texts, engine)), repeat=3
+            )
+            disk_time, _ = time_function(lambda: (cache.memory.clear(), analyze_sentiments(texts, engine)))
+        disk.close()
+
+    print(f"Sentiment cache ({len(texts)} distinct reviews, {engine} engine):")
+    print(f"  Without cache:   {len(texts) / uncached_time:10.0f} reviews/sec")
+    print(f"  Empty cache:     {len(texts) / cold_time:10.0f} reviews/sec")
+    print(f"  Disk tier hits:  {len(texts) / disk_time:10.0f} reviews/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+cache_utils_test.py: This script is for testing the classes contained in cache_utils.py.
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from cache_utils import DiskCache, LRUCache, TieredCache
+
+
+# Tests for DiskCache
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = DiskCache(os.path.join(self.temp_dir.name, "cache.sqlite3"), max_bytes=100)
+
+    def tearDown(self):
+        self.cache.close()
+        self.temp_dir.cleanup()
+
+    def test_set_and_get(self):
+        self.cache.set("key", b"value")
+        self.assertEqual(self.cache.get("key"), b"value")
+
+    def test_missing_key(self):
+        self.assertIsNone(self.cache.get("missing"))
+
+    def test_hit_and_miss_counters(self):
+        self.cache.set("key", b"value")
+        self.cache.get("key")
+        self.cache.get("key")
+        self.cache.get("missing")
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["size"], 5)
+
+    def test_expired_entry(self):
+        with patch("cache_utils.time.time", return_value=1000.0):
+            self.cache.set("key", b"value", ttl=60)
+        with patch("cache_utils.time.time", return_value=1059.0):
+            self.assertEqual(self.cache.get("key"), b"value")
+        with patch("cache_utils.time.time", return_value=1061.0):
+            self.assertIsNone(self.cache.get("key"))
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        # Update the access time on every read
+        self.cache.access_resolution = 0
+        with patch("cache_utils.time.time", return_value=1.0):
+            self.cache.set("first", b"x" * 40)
+        with patch("cache_utils.time.time", return_value=2.0):
+            self.cache.set("second", b"x" * 40)
+        with patch("cache_utils.time.time", return_value=3.0):
+            # Reading the first entry makes the second one the least recently used
+            self.cache.get("first")
+        with patch("cache_utils.time.time", return_value=4.0):
+            self.cache.set("third", b"x" * 40)
+
+        self.assertIsNotNone(self.cache.get("first"))
+        self.assertIsNone(self.cache.get("second"))
+        self.assertIsNotNone(self.cache.get("third"))
+        self.assertLessEqual(self.cache.stats()["size"], 100)
+
+    def test_value_larger_than_cache_is_not_stored(self):
+        self.cache.set("key", b"x" * 101)
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_entries_persist_on_disk(self):
+        self.cache.set("key", b"value")
+        reopened_cache = DiskCache(self.cache.path, max_bytes=100)
+        self.assertEqual(reopened_cache.get("key"), b"value")
+        reopened_cache.close()
+
+    def test_delete_and_clear(self):
+        self.cache.set("first", b"1")
+        self.cache.set("second", b"2")
+        self.cache.delete("first")
+        self.assertIsNone(self.cache.get("first"))
+
+        self.cache.clear()
+        self.assertEqual(self.cache.stats(), {"hits": 0, "misses": 0, "entries": 0, "size": 0})
+
+    def test_get_many_and_set_many(self):
+        self.cache.set_many({"first": b"1", "second": b"22", "too_large": b"x" * 101})
+        self.assertEqual(self.cache.get_many(["first", "second", "missing"]), {"first": b"1", "second": b"22"})
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["size"], 3)
+
+    def test_get_many_queries_keys_in_batches(self):
+        self.cache.QUERY_BATCH_SIZE = 2
+        self.cache.set_many({f"key{i}": b"v" for i in range(5)})
+        self.assertEqual(len(self.cache.get_many([f"key{i}" for i in range(6)])), 5)
+
+    def test_tracked_size_follows_replaced_and_deleted_entries(self):
+        self.cache.set("key", b"x" * 40)
+        self.cache.set("key", b"x" * 10)
+        self.cache.set("other", b"x" * 20)
+        self.cache.delete("other")
+        self.assertEqual(self.cache._size, 10)
+        self.assertEqual(self.cache.stats()["size"], 10)
+
+    def test_access_times_are_written_in_batches(self):
+        with patch("cache_utils.time.time", return_value=1.0):
+            self.cache.set("key", b"value")
+        with patch("cache_utils.time.time", return_value=30.0):
+            # Within the access resolution of 60 seconds, the access time is not updated
+            self.cache.get("key")
+        self.assertEqual(self.cache._accessed, {})
+        with patch("cache_utils.time.time", return_value=100.0):
+            self.cache.get("key")
+        query = "SELECT last_access FROM entries WHERE key = 'key'"
+        self.assertEqual(self.cache._connection.execute(query).fetchone()[0], 1.0)
+
+        self.cache.close()
+        reopened_cache = DiskCache(self.cache.path, max_bytes=100)
+        self.assertEqual(reopened_cache._connection.execute(query).fetchone()[0], 100.0)
+        reopened_cache.close()
+        self.cache = DiskCache(self.cache.path, max_bytes=100)
+
+    def test_locked_database_skips_writes(self):
+        self.cache.set("key", b"value")
+        cache = DiskCache(self.cache.path, max_bytes=100, timeout=0.01)
+        other_connection = sqlite3.connect(self.cache.path)
+        other_connection.execute("BEGIN EXCLUSIVE")
+        try:
+            cache.set("other", b"value")
+            self.assertEqual(cache.get("key"), b"value")
+        finally:
+            other_connection.rollback()
+            other_connection.close()
+
+        self.assertIsNone(cache.get("other"))
+        self.assertEqual(cache._size, 5)
+        cache.close()
+
+    def test_locked_database_counts_reads_as_misses(self):
+        self.cache.set("key", b"value")
+        connection = self.cache._connection
+        self.cache._connection = MagicMock(wraps=connection)
+        self.cache._connection.execute.side_effect = sqlite3.OperationalError("database is locked")
+
+        self.assertIsNone(self.cache.get("key"))
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 1))
+        self.cache._connection = connection
+
+
+# Tests for LRUCache
+class TestLRUCache(unittest.TestCase):
+    def test_set_and_get(self):
+        cache = LRUCache(max_entries=2)
+        cache.set("key", b"value")
+        self.assertEqual(cache.get("key"), b"value")
+        self.assertIsNone(cache.get("missing"))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "entries": 1})
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LRUCache(max_entries=2)
+        cache.set("first", b"1")
+        cache.set("second", b"2")
+        # Reading the first entry makes the second one the least recently used
+        cache.get("first")
+        cache.set("third", b"3")
+
+        self.assertEqual(cache.get("first"), b"1")
+        self.assertIsNone(cache.get("second"))
+        self.assertEqual(cache.get("third"), b"3")
+
+    def test_clear(self):
+        cache = LRUCache(max_entries=2)
+        cache.set("key", b"value")
+        cache.get("key")
+        cache.clear()
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0, "entries": 0})
+
+
+# Tests for TieredCache
+class TestTieredCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.disk = DiskCache(os.path.join(self.temp_dir.name, "cache.sqlite3"), max_bytes=100)
+        self.cache = TieredCache(LRUCache(max_entries=10), self.disk)
+
+    def tearDown(self):
+        self.disk.close()
+        self.temp_dir.cleanup()
+
+    def test_values_are_stored_in_both_tiers(self):
+        self.cache.set("key", b"value")
+        self.assertEqual(self.cache.memory.get("key"), b"value")
+        self.assertEqual(self.disk.get("key"), b"value")
+
+    def test_disk_hits_are_copied_into_memory(self):
+        self.disk.set("key", b"value")
+        self.assertEqual(self.cache.get("key"), b"value")
+        self.assertEqual(self.cache.get("key"), b"value")
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["memory_hits"], 1)
+        self.assertEqual(stats["disk_hits"], 1)
+        self.assertEqual(stats["misses"], 0)
+        self.assertEqual(stats["hit_rate"], 1.0)
+
+    def test_misses(self):
+        self.assertIsNone(self.cache.get("missing"))
+        self.assertEqual(self.cache.stats()["misses"], 1)
+        self.assertEqual(self.cache.stats()["hit_rate"], 0.0)
+
+    def test_get_many_looks_up_memory_misses_on_disk(self):
+        self.cache.set("memory", b"1")
+        self.disk.set("disk", b"2")
+        with patch.object(self.disk, "get_many", wraps=self.disk.get_many) as disk_get_many:
+            values = self.cache.get_many(["memory", "disk", "missing"])
+
+        self.assertEqual(values, {"memory": b"1", "disk": b"2"})
+        disk_get_many.assert_called_once_with(["disk", "missing"])
+        self.assertEqual(self.cache.memory.get("disk"), b"2")
+
+    def test_set_many(self):
+        self.cache.set_many({"first": b"1", "second": b"2"})
+        self.assertEqual(self.cache.memory.get("first"), b"1")
+        self.assertEqual(self.disk.get_many(["first", "second"]), {"first": b"1", "second": b"2"})
+
+    def test_memory_only(self):
+        cache = TieredCache(LRUCache(max_entries=10))
+        cache.set("key", b"value")
+        self.assertEqual(cache.get("key"), b"value")
+        self.assertEqual(cache.stats()["disk_entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
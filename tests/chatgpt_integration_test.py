@@ -2,12 +2,37 @@
 chatgpt_integration_test.py: This script is for testing the functions contained in chatgpt_integration.py.
 """
 
+import json
+import os
+import tempfile
+import threading
+import time
 import unittest
-from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
 
 import openai
 
-from chatgpt_integration import ask_chatgpt
+from cache_utils import DiskCache
+from chatgpt_integration import (
+    ask_chatgpt,
+    ask_chatgpt_concurrently,
+    format_reviews_for_prompt,
+    get_response_cache_key,
+    request_chatgpt,
+    stream_chatgpt,
+)
+
+# Disable the response cache, so that the tests neither use nor fill the cache of the user
+response_cache_patcher = patch("chatgpt_integration.get_response_cache", return_value=None)
+
+
+def setUpModule():
+    response_cache_patcher.start()
+
+
+def tearDownModule():
+    response_cache_patcher.stop()
 
 
 class TestChatGPTIntegration(unittest.TestCase):
@@ -35,6 +60,252 @@ class TestChatGPTIntegration(unittest.TestCase):
             response = ask_chatgpt(question)
             self.assertEqual(response, "An unexpected error occurred while processing your request.")
 
+    # Errors are raised by request_chatgpt instead of being turned into messages.
+    def test_request_chatgpt_raises_errors(self):
+        with patch("openai.ChatCompletion.create", side_effect=Exception("Unexpected error")):
+            with self.assertRaises(Exception):
+                request_chatgpt("What is Chat GPT?")
+
+
+# Tests for the response cache of ask_chatgpt
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = DiskCache(os.path.join(self.temp_dir.name, "cache.sqlite3"), max_bytes=1000)
+        cache_patcher = patch("chatgpt_integration.get_response_cache", return_value=self.cache)
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+        self.mock_openai_response = {"choices": [{"message": {"content": " Cached answer "}}]}
+
+    def tearDown(self):
+        self.cache.close()
+        self.temp_dir.cleanup()
+
+    def test_repeated_question_is_answered_from_the_cache(self):
+        with patch("openai.ChatCompletion.create", return_value=self.mock_openai_response) as mock_create:
+            self.assertEqual(ask_chatgpt("Question?"), "Cached answer")
+            with self.assertLogs(level="INFO") as logs:
+                self.assertEqual(ask_chatgpt("Question?"), "Cached answer")
+
+        mock_create.assert_called_once()
+        self.assertIn("hits 1, misses 1, hit rate 50%", logs.output[0])
+
+    def test_force_refresh_sends_the_question_again(self):
+        with patch("openai.ChatCompletion.create", return_value=self.mock_openai_response) as mock_create:
+            ask_chatgpt("Question?")
+            ask_chatgpt("Question?", force_refresh=True)
+        self.assertEqual(mock_create.call_count, 2)
+
+    def test_errors_are_not_cached(self):
+        with patch("openai.ChatCompletion.create", side_effect=Exception("Unexpected error")):
+            ask_chatgpt("Question?")
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_key_depends_on_all_request_parameters(self):
+        key = get_response_cache_key("model", "system", "prompt", 0.7)
+        self.assertEqual(key, get_response_cache_key("model", "system", "prompt", 0.7))
+        self.assertNotEqual(key, get_response_cache_key("other", "system", "prompt", 0.7))
+        self.assertNotEqual(key, get_response_cache_key("model", "other", "prompt", 0.7))
+        self.assertNotEqual(key, get_response_cache_key("model", "system", "other", 0.7))
+        self.assertNotEqual(key, get_response_cache_key("model", "system", "prompt", 0.2))
+
+    def test_whitespace_matching(self):
+        exact_keys = {get_response_cache_key("model", "system", prompt, 0.7) for prompt in ("a b\n", "a  b")}
+        whitespace_keys = {
+            get_response_cache_key("model", "system", prompt, 0.7, matching="whitespace")
+            for prompt in ("a b\n", "a  b")
+        }
+        self.assertEqual(len(exact_keys), 2)
+        self.assertEqual(len(whitespace_keys), 1)
+        self.assertTrue(exact_keys.isdisjoint(whitespace_keys))
+
+    def test_unknown_matching(self):
+        with self.assertRaises(ValueError):
+            get_response_cache_key("model", "system", "prompt", 0.7, matching="fuzzy")
+
+
+# A local server answering like the chat completions endpoint of the OpenAI API with streaming enabled
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """
+    Streams each piece of self.pieces as a server-sent event, and waits for self.release before sending the
+    pieces after the first one. Questions are recorded in self.questions, and self.status other than 200 is
+    answered with an error in the format of the OpenAI API.
+    """
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeOpenAIHandler)
+        self.pieces = ["The ", "sound ", "is ", "great."]
+        self.questions = []
+        self.status = 200
+        self.release = threading.Event()
+        self.release.set()
+
+    @property
+    def api_base(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    # Stream the events in the chunks of a chunked response, as the OpenAI API does
+    protocol_version = "HTTP/1.1"
+
+    def write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("utf-8") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        # Close the connection after the answer, so that no handler thread outlives the test
+        self.close_connection = True
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.questions.append(request["messages"][-1]["content"])
+        if self.server.status != 200:
+            error = json.dumps({"error": {"message": "Incorrect API key provided", "type": "invalid_request_error"}})
+            self.send_response(self.server.status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(error)))
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(error.encode("utf-8"))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        deltas = [{"role": "assistant"}] + [{"content": piece} for piece in self.server.pieces] + [{}]
+        for index, delta in enumerate(deltas):
+            if index == 2:
+                self.server.release.wait(timeout=5)
+            chunk = {
+                "id": "chatcmpl-1",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": request["model"],
+                "choices": [{"index": 0, "delta": delta, "finish_reason": None if delta else "stop"}],
+            }
+            self.write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.write_chunk(b"data: [DONE]\n\n")
+        self.write_chunk(b"")
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Tests for the streamed answers of Chat GPT, against a local server
+class TestStreamChatGPT(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeOpenAIServer()
+        threading.Thread(target=self.server.serve_forever, args=(0.01,), daemon=True).start()
+        api_base_patcher = patch("chatgpt_integration.CHATGPT_API_BASE", self.server.api_base)
+        api_base_patcher.start()
+        self.addCleanup(api_base_patcher.stop)
+
+    def tearDown(self):
+        self.server.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_pieces_are_yielded_as_they_arrive(self):
+        self.server.release.clear()
+        start = time.monotonic()
+        pieces = stream_chatgpt("Question?")
+
+        # The first piece arrives while the server still holds back the others
+        self.assertEqual(next(pieces), "The ")
+        self.assertLess(time.monotonic() - start, 1)
+        self.server.release.set()
+        self.assertEqual(list(pieces), ["sound ", "is ", "great."])
+        self.assertEqual(self.server.questions, ["Question?"])
+
+    def test_ask_chatgpt_streams_to_on_delta(self):
+        deltas = []
+        self.assertEqual(ask_chatgpt("Question?", on_delta=deltas.append), "The sound is great.")
+        self.assertEqual(deltas, ["The ", "sound ", "is ", "great."])
+
+    def test_streamed_answer_is_cached(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = DiskCache(os.path.join(temp_dir, "cache.sqlite3"), max_bytes=1000)
+            with patch("chatgpt_integration.get_response_cache", return_value=cache):
+                self.assertEqual("".join(stream_chatgpt("Question?")), "The sound is great.")
+                # The cached answer is yielded as a single piece, without a request
+                self.assertEqual(list(stream_chatgpt("Question?")), ["The sound is great."])
+                self.assertEqual(request_chatgpt("Question?"), "The sound is great.")
+            cache.close()
+        self.assertEqual(len(self.server.questions), 1)
+
+    def test_authentication_error(self):
+        self.server.status = 401
+        deltas = []
+        response = ask_chatgpt("Question?", on_delta=deltas.append)
+        self.assertEqual(response, "Authentication error: please check your Chat GPT API key")
+        self.assertEqual(deltas, [])
+
+    def test_questions_are_streamed_at_the_same_time(self):
+        deltas = []
+        answers = ask_chatgpt_concurrently(
+            {"a": "A?", "b": "B?"}, on_delta=lambda name, delta: deltas.append((name, delta))
+        )
+        self.assertEqual(answers, {"a": "The sound is great.", "b": "The sound is great."})
+        self.assertEqual([delta for name, delta in deltas if name == "a"], ["The ", "sound ", "is ", "great."])
+        self.assertEqual(sorted(self.server.questions), ["A?", "B?"])
+
+
+# Tests for ask_chatgpt_concurrently
+class TestAskChatGPTConcurrently(unittest.TestCase):
+    @patch("chatgpt_integration.ask_chatgpt")
+    def test_questions_are_sent_at_the_same_time(self, mock_ask_chatgpt):
+        all_sent = threading.Barrier(3, timeout=5)
+
+        def ask_chatgpt(question):
+            # Only returns once all questions have been sent
+            all_sent.wait()
+            return f"Answer to {question}"
+
+        mock_ask_chatgpt.side_effect = ask_chatgpt
+        on_answer = MagicMock()
+
+        answers = ask_chatgpt_concurrently({"a": "A?", "b": "B?", "c": "C?"}, on_answer=on_answer)
+
+        self.assertEqual(answers, {"a": "Answer to A?", "b": "Answer to B?", "c": "Answer to C?"})
+        self.assertEqual(on_answer.call_count, 3)
+        on_answer.assert_any_call("b", "Answer to B?")
+
+    @patch("chatgpt_integration.ask_chatgpt")
+    def test_answers_are_reported_as_they_arrive(self, mock_ask_chatgpt):
+        slow_answer_allowed = threading.Event()
+
+        def ask_chatgpt(question):
+            if question == "slow":
+                slow_answer_allowed.wait(timeout=5)
+            return question
+
+        mock_ask_chatgpt.side_effect = ask_chatgpt
+        reported = []
+
+        def on_answer(name, answer):
+            reported.append(name)
+            slow_answer_allowed.set()
+
+        ask_chatgpt_concurrently({"slow": "slow", "fast": "fast"}, on_answer=on_answer)
+        self.assertEqual(reported, ["fast", "slow"])
+
+    def test_no_questions(self):
+        self.assertEqual(ask_chatgpt_concurrently({}), {})
+
+
+# Tests for format_reviews_for_prompt
+class TestFormatReviewsForPrompt(unittest.TestCase):
+    def test_format_reviews_for_prompt(self):
+        reviews = [
+            {"review_title": "Great", "review_date": "March 1, 2022", "review_text": "Works well."},
+            {"review_title": "Bad", "review_date": "May 2, 2022", "review_text": "Broke."},
+        ]
+        self.assertEqual(
+            format_reviews_for_prompt(reviews),
+            "Title: Great\nDate: March 1, 2022\nReview: Works well.\nTitle: Bad\nDate: May 2, 2022\nReview: Broke.\n",
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
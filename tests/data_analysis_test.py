@@ -2,9 +2,38 @@
 data_analysis_test.py: This script is for testing the functions contained in data_analysis.py.
 """
 
+import json
+import os
+import tempfile
 import unittest
+from unittest.mock import patch
 
-from data_analysis import analyze_sentiment_with_textblob, generate_filtered_text, get_polarity_color
+import numpy as np
+
+from cache_utils import DiskCache, LRUCache, TieredCache
+from data_analysis import (
+    analyze_sentiment_batch,
+    analyze_sentiment_with_textblob,
+    analyze_sentiments,
+    generate_filtered_text,
+    get_polarity_color,
+    get_sentiment_cache_key,
+    get_sentiment_color,
+    get_sentiment_cache_stats,
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Disable the sentiment cache, so that the tests neither use nor fill the cache of the user
+sentiment_cache_patcher = patch("data_analysis.get_sentiment_cache", return_value=None)
+
+
+def setUpModule():
+    sentiment_cache_patcher.start()
+
+
+def tearDownModule():
+    sentiment_cache_patcher.stop()
 
 
 # Tests for analyze_sentiment_with_textblob
@@ -25,6 +54,115 @@ class TestAnalyzeSentimentWithTextblob(unittest.TestCase):
         self.assertAlmostEqual(sentiment.polarity, 0, places=1)
 
 
+# Tests for analyze_sentiment_batch
+class TestAnalyzeSentimentBatch(unittest.TestCase):
+    def test_positive_and_negative_sentiment(self):
+        positive, negative, neutral = analyze_sentiment_batch(
+            ["I really love pizza. It is amazing!", "I really hate bugs. They are terrible!", "It is Monday today."]
+        )
+        self.assertGreater(positive.polarity, 0)
+        self.assertLess(negative.polarity, 0)
+        self.assertEqual(neutral, (0.0, 0.0))
+
+    def test_same_rules_as_textblob(self):
+        # Intensifier, negation, negated intensifier, negation across a short word and exclamation marks
+        texts = ["very very nice", "not good", "not very good", "not a good product", "This is bad!!", "good, okay"]
+        for text, sentiment in zip(texts, analyze_sentiment_batch(texts)):
+            expected = analyze_sentiment_with_textblob(text)
+            self.assertAlmostEqual(sentiment.polarity, expected.polarity, msg=text)
+            self.assertAlmostEqual(sentiment.subjectivity, expected.subjectivity, msg=text)
+
+    def test_texts_do_not_affect_each_other(self):
+        # The negation at the end of the first text must not reach the first word of the second text
+        separate = analyze_sentiment_batch(["It does not"]) + analyze_sentiment_batch(["good"])
+        self.assertEqual(analyze_sentiment_batch(["It does not", "good"]), separate)
+
+    def test_empty_input(self):
+        self.assertEqual(analyze_sentiment_batch([]), [])
+        self.assertEqual(analyze_sentiment_batch([""]), [(0.0, 0.0)])
+
+    def test_accuracy_on_review_corpus(self):
+        with open(os.path.join(FIXTURES_DIR, "review_corpus.json"), encoding="utf-8") as corpus_file:
+            texts = json.load(corpus_file)
+
+        batch_polarity = np.array([sentiment.polarity for sentiment in analyze_sentiment_batch(texts)])
+        textblob_polarity = np.array([analyze_sentiment_with_textblob(text).polarity for text in texts])
+
+        self.assertGreater(np.corrcoef(batch_polarity, textblob_polarity)[0, 1], 0.99)
+        self.assertGreaterEqual(np.mean(np.sign(batch_polarity) == np.sign(textblob_polarity)), 0.95)
+        self.assertLess(np.mean(np.abs(batch_polarity - textblob_polarity)), 0.02)
+
+
+# Tests for analyze_sentiments
+class TestAnalyzeSentiments(unittest.TestCase):
+    def test_engines(self):
+        texts = ["Great product", "Awful quality"]
+        self.assertEqual(analyze_sentiments(texts, engine="batch"), analyze_sentiment_batch(texts))
+        self.assertEqual(
+            analyze_sentiments(texts, engine="textblob"), [analyze_sentiment_with_textblob(text) for text in texts]
+        )
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            analyze_sentiments(["Great product"], engine="unknown")
+
+
+# Tests for the sentiment cache used by analyze_sentiments
+class TestSentimentCache(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.disk = DiskCache(os.path.join(temp_dir.name, "sentiment_cache.sqlite3"), max_bytes=1024 * 1024)
+        self.cache = TieredCache(LRUCache(100), self.disk)
+        patcher = patch("data_analysis.get_sentiment_cache", return_value=self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(temp_dir.cleanup)
+        self.addCleanup(self.disk.close)
+
+    @patch("data_analysis.analyze_sentiment_with_textblob", wraps=analyze_sentiment_with_textblob)
+    def test_cached_texts_are_not_analyzed_again(self, mock_analyze):
+        first = analyze_sentiments(["Great product!", "Awful quality"], engine="textblob")
+        second = analyze_sentiments(["Great product!", "Awful quality"], engine="textblob")
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_analyze.call_count, 2)
+        self.assertEqual(get_sentiment_cache_stats()["memory_hits"], 2)
+
+    @patch("data_analysis.analyze_sentiment_with_textblob", wraps=analyze_sentiment_with_textblob)
+    def test_identical_texts_are_analyzed_once(self, mock_analyze):
+        sentiments = analyze_sentiments(["Great product!"] * 3, engine="textblob")
+        self.assertEqual(len(sentiments), 3)
+        self.assertEqual(mock_analyze.call_count, 1)
+
+    def test_results_persist_on_disk(self):
+        analyze_sentiments(["Great product!"], engine="batch")
+        self.cache.memory.clear()
+
+        with patch("data_analysis.analyze_sentiment_batch") as mock_batch:
+            sentiments = analyze_sentiments(["Great product!"], engine="batch")
+
+        mock_batch.assert_not_called()
+        self.assertGreater(sentiments[0].polarity, 0)
+        self.assertEqual(get_sentiment_cache_stats()["disk_hits"], 1)
+
+    def test_engines_do_not_share_results(self):
+        self.assertNotEqual(
+            get_sentiment_cache_key("Great product!", "textblob"), get_sentiment_cache_key("Great product!", "batch")
+        )
+
+    def test_new_analyzer_version_invalidates_results(self):
+        analyze_sentiments(["Great product!"], engine="batch")
+        with patch("data_analysis.BatchSentimentAnalyzer.version", "2"):
+            with patch("data_analysis.analyze_sentiment_batch", wraps=analyze_sentiment_batch) as mock_batch:
+                analyze_sentiments(["Great product!"], engine="batch")
+        mock_batch.assert_called_once_with(["Great product!"])
+
+    def test_hit_rate(self):
+        analyze_sentiments(["Great product!", "Awful quality"], engine="batch")
+        analyze_sentiments(["Great product!", "Nice color"], engine="batch")
+        self.assertAlmostEqual(get_sentiment_cache_stats()["hit_rate"], 0.25)
+
+
 # Tests for get_polarity_color
 class TestGetPolarityColor(unittest.TestCase):
     def test_positive_sentiment(self):
@@ -58,6 +196,15 @@ class TestGetPolarityColor(unittest.TestCase):
         self.assertEqual(color, "orange")  # Neutral color for missing polarity
 
 
+# Tests for get_sentiment_color
+class TestGetSentimentColor(unittest.TestCase):
+    def test_colors(self):
+        self.assertEqual(get_sentiment_color(0.3), "green")
+        self.assertEqual(get_sentiment_color(-0.3), "red")
+        self.assertEqual(get_sentiment_color(0.25), "orange")
+        self.assertEqual(get_sentiment_color(-0.25), "orange")
+
+
 # Tests for generate_filtered_text
 class TestGenerateFilteredText(unittest.TestCase):
     def test_empty_results(self):
@@ -0,0 +1,234 @@
+"""
+http_client_test.py: This script is for testing the functions contained in http_client.py.
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+import requests
+
+import http_client
+from cache_utils import DiskCache
+from http_client import (
+    create_session,
+    fetch_url,
+    get_connection_stats,
+    get_session,
+    is_cacheable_page,
+    normalize_url,
+)
+
+
+# Elements found on the search, product and review pages served by the local server
+PAGE_CONTENT = '<div data-asin="B08L5V9T31"><span id="productTitle"></span><div data-hook="review"></div></div>'
+# Page Amazon sends with a 200 status code instead of the requested page
+CAPTCHA_PAGE = '<html><title>Robot Check</title><form action="/errors/validateCaptcha"></form></html>'
+
+
+# Local HTTP/1.1 server used to check keep-alive and retries without reaching Amazon
+class MockAmazonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    failures_left = 0
+
+    def do_GET(self):
+        if self.path == "/flaky" and MockAmazonHandler.failures_left > 0:
+            MockAmazonHandler.failures_left -= 1
+            status, body = 503, b"Service Unavailable"
+        elif self.path == "/missing":
+            status, body = 404, b"Not Found"
+        elif self.path.startswith("/captcha"):
+            status, body = 200, CAPTCHA_PAGE.encode()
+        elif self.path.startswith("/empty"):
+            status, body = 200, b"<html></html>"
+        else:
+            status, body = 200, f"<html>{self.path}{PAGE_CONTENT}</html>".encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalServerTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), MockAmazonHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.session = create_session(pool_size=2, max_retries=2, backoff_factor=0)
+        patcher = patch("http_client.get_session", return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.session.close)
+
+        # Use an empty page cache in a temporary folder instead of the user's cache
+        temp_dir = tempfile.TemporaryDirectory()
+        self.cache = DiskCache(os.path.join(temp_dir.name, "http_cache.sqlite3"), max_bytes=1024 * 1024)
+        cache_patcher = patch("http_client.get_http_cache", return_value=self.cache)
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+        self.addCleanup(temp_dir.cleanup)
+        self.addCleanup(self.cache.close)
+
+
+# Tests for create_session
+class TestCreateSession(unittest.TestCase):
+    def test_adapter_configuration(self):
+        session = create_session(pool_size=7, max_retries=4, backoff_factor=1.5)
+        adapter = session.get_adapter("https://www.amazon.com")
+
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertEqual(adapter.max_retries.total, 4)
+        self.assertEqual(adapter.max_retries.backoff_factor, 1.5)
+        self.assertIn(429, adapter.max_retries.status_forcelist)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+        self.assertIn("gzip", session.headers["accept-encoding"])
+
+
+# Tests for get_session
+class TestGetSession(unittest.TestCase):
+    @patch("http_client._session", None)
+    def test_session_is_shared(self):
+        self.assertIs(get_session(), get_session())
+
+
+# Tests for fetch_url
+class TestFetchUrl(LocalServerTestCase):
+    def test_successful_fetch(self):
+        self.assertEqual(fetch_url(f"{self.base_url}/product"), f"<html>/product{PAGE_CONTENT}</html>")
+
+    def test_http_error(self):
+        with self.assertRaises(requests.exceptions.HTTPError):
+            fetch_url(f"{self.base_url}/missing")
+
+    def test_retries_server_errors(self):
+        MockAmazonHandler.failures_left = 2
+        self.assertEqual(fetch_url(f"{self.base_url}/flaky"), f"<html>/flaky{PAGE_CONTENT}</html>")
+        self.assertEqual(MockAmazonHandler.failures_left, 0)
+
+    def test_random_user_agent(self):
+        session = MagicMock()
+        with patch("http_client.get_session", return_value=session):
+            fetch_url("https://www.amazon.com/dp/B08L5V9T31")
+        headers = session.get.call_args.kwargs["headers"]
+        self.assertIn(headers["user-agent"], http_client.USER_AGENTS)
+
+
+# Tests for normalize_url
+class TestNormalizeUrl(unittest.TestCase):
+    def test_review_pages_ignore_ref_segment(self):
+        first = (
+            "https://www.amazon.com/product-reviews/B08L5V9T31/ref=cm_cr_arp_d_paging_btm_next_2?pageNumber=2&ie=UTF8"
+        )
+        second = "https://WWW.Amazon.com/product-reviews/B08L5V9T31/ref=other?ie=UTF8&pageNumber=2#reviews"
+        self.assertEqual(normalize_url(first), normalize_url(second))
+        self.assertEqual(normalize_url(first), "https://www.amazon.com/product-reviews/B08L5V9T31?ie=UTF8&pageNumber=2")
+
+    def test_tracking_parameters_are_removed(self):
+        url = "https://www.amazon.com/dp/B08L5V9T31/?qid=1700000000&sr=8-1&th=1"
+        self.assertEqual(normalize_url(url), "https://www.amazon.com/dp/B08L5V9T31?th=1")
+
+    def test_different_pages_stay_different(self):
+        self.assertNotEqual(
+            normalize_url("https://www.amazon.com/s?k=lamp&page=1"),
+            normalize_url("https://www.amazon.com/s?k=lamp&page=2"),
+        )
+
+
+# Tests for the page cache used by fetch_url
+class TestFetchUrlCache(LocalServerTestCase):
+    def test_cached_page_is_not_downloaded_again(self):
+        fetch_url(f"{self.base_url}/product-reviews/B08L5V9T31/ref=a?pageNumber=1", kind="reviews")
+        page = fetch_url(f"{self.base_url}/product-reviews/B08L5V9T31/ref=b?pageNumber=1", kind="reviews")
+
+        self.assertEqual(page, f"<html>/product-reviews/B08L5V9T31/ref=a?pageNumber=1{PAGE_CONTENT}</html>")
+        self.assertEqual(get_connection_stats(self.session)["requests"], 1)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_before_request_is_only_called_for_downloads(self):
+        before_request = MagicMock()
+        fetch_url(f"{self.base_url}/dp/B08L5V9T31", kind="product", before_request=before_request)
+        fetch_url(f"{self.base_url}/dp/B08L5V9T31", kind="product", before_request=before_request)
+        before_request.assert_called_once_with(f"{self.base_url}/dp/B08L5V9T31")
+
+    def test_force_refresh_bypasses_cache(self):
+        fetch_url(f"{self.base_url}/dp/B08L5V9T31", kind="product")
+        fetch_url(f"{self.base_url}/dp/B08L5V9T31", kind="product", force_refresh=True)
+        self.assertEqual(get_connection_stats(self.session)["requests"], 2)
+
+    def test_uses_ttl_of_page_kind(self):
+        with patch.object(self.cache, "set") as mock_set:
+            fetch_url(f"{self.base_url}/s?k=lamp", kind="search")
+        self.assertEqual(mock_set.call_args.args[2], http_client.HTTP_CACHE_TTLS["search"])
+
+    def test_errors_are_not_cached(self):
+        with self.assertRaises(requests.exceptions.HTTPError):
+            fetch_url(f"{self.base_url}/missing", kind="product")
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_captcha_pages_are_not_cached(self):
+        self.assertEqual(fetch_url(f"{self.base_url}/captcha/product-reviews/B08L5V9T31", kind="reviews"), CAPTCHA_PAGE)
+        fetch_url(f"{self.base_url}/captcha/product-reviews/B08L5V9T31", kind="reviews")
+        self.assertEqual(get_connection_stats(self.session)["requests"], 2)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_pages_without_content_are_not_cached(self):
+        fetch_url(f"{self.base_url}/empty/dp/B08L5V9T31", kind="product")
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_no_kind_disables_cache(self):
+        fetch_url(f"{self.base_url}/page")
+        fetch_url(f"{self.base_url}/page")
+        self.assertEqual(get_connection_stats(self.session)["requests"], 2)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+
+# Tests for is_cacheable_page
+class TestIsCacheablePage(unittest.TestCase):
+    def test_pages_with_content_of_their_kind(self):
+        self.assertTrue(is_cacheable_page('<div data-hook="review">Great</div>', "reviews"))
+        self.assertTrue(is_cacheable_page('<div data-component-type="s-search-result"></div>', "search"))
+        self.assertTrue(is_cacheable_page('<span id="productTitle">Lamp</span>', "product"))
+
+    def test_pages_without_content_of_their_kind(self):
+        self.assertFalse(is_cacheable_page('<span id="productTitle">Lamp</span>', "reviews"))
+        self.assertFalse(is_cacheable_page("", "product"))
+
+    def test_captcha_pages(self):
+        self.assertFalse(is_cacheable_page(CAPTCHA_PAGE + '<div data-hook="review"></div>', "reviews"))
+
+
+# Tests for get_connection_stats
+class TestGetConnectionStats(LocalServerTestCase):
+    def test_connections_are_reused(self):
+        for page in range(1, 4):
+            fetch_url(f"{self.base_url}/page{page}")
+
+        stats = get_connection_stats(self.session)
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["new_connections"], 1)
+        self.assertEqual(stats["reused_connections"], 2)
+
+    def test_empty_session(self):
+        stats = get_connection_stats(create_session())
+        self.assertEqual(stats, {"requests": 0, "new_connections": 0, "reused_connections": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,50 +5,122 @@ are better tested directly in the Tkinter environment, amd are therefore not tak
 import threading
 import tkinter as tk
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, call, patch
 
 import main
-from main import start_scraping_thread
+from review_store import ReviewStore
+from review_viewer import ReviewListView
+from review_viewer_test import FakeText
 
 
 # Tests for run_scraping
 class TestRunScraping(unittest.TestCase):
     def setUp(self):
+        main.refresh_var = MagicMock(**{"get.return_value": False})
         # Mock the GUI elements and global variables
-        main.text_area = MagicMock()
+        main.text_area = MagicMock(wraps=FakeText(height=100))
         main.scrape_button = MagicMock()
         main.review_pages_entry = MagicMock()
+        main.scrape_progress_label = MagicMock()
+        main.review_range_label = MagicMock()
+        main.sort_var = MagicMock(**{"get.return_value": "Scraping order"})
+        main.review_list = ReviewListView(main.text_area, MagicMock(), on_scroll=main.display_review_range)
+        for name in ("min_subjectivity", "max_subjectivity", "min_polarity", "max_polarity"):
+            setattr(main, f"{name}_entry", MagicMock(**{"get.return_value": ""}))
         main.product_id = None
-        main.all_results = []
 
-    @patch("main.scrape_data")
+    @patch("main.iter_scrape_data")
     @patch("main.is_valid_asin", return_value=True)
-    @patch("main.display_review")
     @patch("main.display_average_polarity_and_color")
     @patch("main.display_chatgpt")
     def test_run_scraping_valid_product(
         self,
         mock_display_chatgpt,
         mock_display_average_polarity_and_color,
-        mock_display_review,
         mock_is_valid_asin,
         mock_scrape_data,
     ):
         # Set up for a valid product ID and review pages
         main.product_id = "valid_id"
         main.review_pages_entry.get.return_value = "2"
-        mock_scrape_data.return_value = [{"review_title": "Sample Title", "review_text": "Sample Review Text"}]
+        mock_scrape_data.return_value = iter([[{"review_title": "Sample Title", "review_text": "Sample Review Text"}]])
 
-        # Run the function
+        # Run the function and wait for the background task
         main.run_scraping()
+        self.assertTrue(main.task_runner.process_until_idle())
 
         # Assertions
-        mock_display_review.assert_called()
-        mock_scrape_data.assert_called_with("valid_id", 2)
+        self.assertIn("Title: Sample Title", main.text_area.insert.call_args.args[1])
+        mock_scrape_data.assert_called_with("valid_id", 2, False)
         mock_display_average_polarity_and_color.assert_called()
         mock_display_chatgpt.assert_called()
 
-    @patch("main.scrape_data")
+    @patch("main.iter_scrape_data", return_value=iter([]))
+    @patch("main.is_valid_asin", return_value=True)
+    def test_run_scraping_force_refresh(self, mock_is_valid_asin, mock_scrape_data):
+        main.product_id = "valid_id"
+        main.review_pages_entry.get.return_value = "3"
+        main.refresh_var.get.return_value = True
+
+        main.run_scraping()
+        self.assertTrue(main.task_runner.process_until_idle())
+        mock_scrape_data.assert_called_once_with("valid_id", 3, True)
+
+    @patch("main.iter_scrape_data")
+    @patch("main.is_valid_asin", return_value=True)
+    @patch("main.display_average_polarity_and_color")
+    @patch("main.display_chatgpt")
+    def test_reviews_are_displayed_while_scraping(
+        self,
+        mock_display_chatgpt,
+        mock_display_average_polarity_and_color,
+        mock_is_valid_asin,
+        mock_scrape_data,
+    ):
+        main.product_id = "valid_id"
+        main.review_pages_entry.get.return_value = "2"
+        first_page_shown = threading.Event()
+        main.review_range_label.config.side_effect = lambda text: first_page_shown.set()
+
+        # The second page is only scraped once the first review is on screen
+        def scraped_pages(product_id, num_review_pages, force_refresh):
+            yield [{"review_text": "First page", "textblob_polarity": 0.5}]
+            if not first_page_shown.wait(timeout=5):
+                raise AssertionError("The first page was not displayed before the second page was scraped")
+            yield [{"review_text": "Second page", "textblob_polarity": -0.5}]
+
+        mock_scrape_data.side_effect = scraped_pages
+
+        main.run_scraping()
+        store = main.review_store
+        self.assertTrue(main.task_runner.process_until_idle())
+
+        # The reviews of the second page are added to the store of the first page
+        self.assertIs(main.review_store, store)
+        self.assertEqual(len(main.review_store), 2)
+        main.review_range_label.config.assert_called_with(text="Reviews 1-2 of 2")
+        main.scrape_progress_label.config.assert_any_call(text="Scraped 1 of 2 pages, 1 reviews")
+        main.scrape_progress_label.config.assert_called_with(text="Scraped 2 of 2 pages, 2 reviews")
+        self.assertEqual(mock_display_average_polarity_and_color.call_count, 2)
+        mock_display_chatgpt.assert_called_once_with(main.review_store.get_reviews())
+        main.scrape_button.config.assert_called_with(state=tk.NORMAL)
+
+    @patch("main.iter_scrape_data", side_effect=RuntimeError("Connection lost"))
+    @patch("main.is_valid_asin", return_value=True)
+    @patch("main.display_chatgpt")
+    def test_scraping_error_is_reported(self, mock_display_chatgpt, mock_is_valid_asin, mock_scrape_data):
+        main.product_id = "valid_id"
+        main.review_pages_entry.get.return_value = "2"
+
+        main.run_scraping()
+        self.assertTrue(main.task_runner.process_until_idle())
+
+        main.text_area.insert.assert_called_with(tk.INSERT, "There was an error in scraping: Connection lost\n")
+        main.scrape_button.config.assert_called_with(state=tk.NORMAL)
+        mock_display_chatgpt.assert_not_called()
+        self.assertIsNone(main.scraping_task)
+
+    @patch("main.iter_scrape_data")
     @patch("main.is_valid_asin", return_value=False)
     def test_run_scraping_invalid_product_id(self, mock_is_valid_asin, mock_scrape_data):
         # Set up for an invalid product ID
@@ -62,7 +134,7 @@ class TestRunScraping(unittest.TestCase):
         main.text_area.insert.assert_called_with(tk.INSERT, "Please enter a valid product ID.\n")
         mock_scrape_data.assert_not_called()
 
-    @patch("main.scrape_data")
+    @patch("main.iter_scrape_data")
     @patch("main.is_valid_asin", return_value=True)
     def test_run_scraping_invalid_review_pages(self, mock_is_valid_asin, mock_scrape_data):
         # Set up for a valid product ID but invalid review pages
@@ -77,18 +149,326 @@ class TestRunScraping(unittest.TestCase):
         mock_scrape_data.assert_not_called()
 
 
-# Tests for start_scraping_thread
-class TestStartScrapingThread(unittest.TestCase):
-    @patch("main.run_scraping")
-    def test_start_scraping_thread(self, mock_run_scraping):
-        # Call the function
-        start_scraping_thread()
+# Tests for apply_filters and the sorting of the filtered reviews
+class TestApplyFilters(unittest.TestCase):
+    def setUp(self):
+        # Mock the GUI elements and fill the review store
+        main.text_area = MagicMock(wraps=FakeText(height=100))
+        main.review_range_label = MagicMock()
+        main.sort_var = MagicMock(**{"get.return_value": "Scraping order"})
+        main.review_list = ReviewListView(main.text_area, MagicMock(), on_scroll=main.display_review_range)
+        self.entries = {"min_subjectivity": "", "max_subjectivity": "", "min_polarity": "", "max_polarity": ""}
+        for name in self.entries:
+            entry = MagicMock()
+            entry.get.side_effect = lambda name=name: self.entries[name]
+            setattr(main, f"{name}_entry", entry)
+        main.review_store = ReviewStore(
+            [
+                {"review_text": "Positive", "textblob_polarity": 0.8, "textblob_subjectivity": 0.9},
+                {"review_text": "Negative", "textblob_polarity": -0.6, "textblob_subjectivity": 0.5},
+            ]
+        )
+
+    def displayed_text(self):
+        return main.text_area.insert.call_args.args[1]
+
+    def test_matching_reviews_are_displayed(self):
+        self.entries["min_polarity"] = "0"
+        main.apply_filters()
+
+        self.assertIn("Review: Positive", self.displayed_text())
+        self.assertNotIn("Review: Negative", self.displayed_text())
+        main.review_range_label.config.assert_called_with(text="Reviews 1-1 of 1")
+
+    def test_no_matching_reviews(self):
+        self.entries["min_subjectivity"] = "0.95"
+        main.apply_filters()
+
+        main.text_area.insert.assert_called_with("1.0", "No reviews matching the filtering criteria.\n")
+        main.review_range_label.config.assert_called_with(text="")
+
+    def test_incomplete_number_keeps_results(self):
+        self.entries["min_polarity"] = "-"
+        main.apply_filters()
+
+        main.text_area.insert.assert_not_called()
+        main.text_area.delete.assert_not_called()
+
+    def test_sorting(self):
+        main.sort_var.get.return_value = "Polarity (lowest first)"
+        main.apply_filters()
+
+        self.assertLess(
+            self.displayed_text().index("Review: Negative"), self.displayed_text().index("Review: Positive")
+        )
+
+    def test_scrolling_through_many_reviews(self):
+        main.review_store = ReviewStore([{"review_text": f"Review {index}"} for index in range(25)])
+        main.apply_filters()
+        main.review_range_label.config.assert_called_with(text="Reviews 1-10 of 25")
+
+        main.review_list.yview("scroll", 1, "pages")
+        main.review_range_label.config.assert_called_with(text="Reviews 11-20 of 25")
+        main.review_list.yview("moveto", "1.0")
+        main.review_range_label.config.assert_called_with(text="Reviews 16-25 of 25")
+        self.assertIn("Review: Review 24", self.displayed_text())
+
+    def test_range_label_counts_visible_reviews(self):
+        long_text = "\n".join(f"Line {line}" for line in range(150))
+        main.review_store = ReviewStore([{"review_text": long_text}, {"review_text": "Short"}])
+        main.apply_filters()
+        main.review_range_label.config.assert_called_with(text="Reviews 1-1 of 2")
+
+        for _ in range(50):
+            main.review_list.on_mouse_wheel(3)
+        main.review_range_label.config.assert_called_with(text="Reviews 1-2 of 2")
+
+
+# Tests for display_average_polarity_and_color
+class TestDisplayAveragePolarityAndColor(unittest.TestCase):
+    def setUp(self):
+        main.polarity_label = MagicMock()
+        main.polarity_canvas = MagicMock()
+
+    def test_average_of_store(self):
+        main.review_store = ReviewStore([{"textblob_polarity": 0.5}, {"textblob_polarity": 0.3}])
+        main.display_average_polarity_and_color()
+
+        main.polarity_label.config.assert_called_with(text="Average Polarity Score: 0.40")
+        main.polarity_canvas.create_oval.assert_called_with(5, 5, 40, 40, fill="green", outline="green")
 
-        # Check if the run_scraping function is called within a thread
-        self.assertTrue(
-            any(isinstance(thread, threading.Thread) and thread.is_alive() for thread in threading.enumerate())
+    def test_empty_store(self):
+        main.review_store = ReviewStore()
+        main.display_average_polarity_and_color()
+
+        main.polarity_label.config.assert_called_with(text="No reviews available to calculate average polarity.")
+        main.polarity_canvas.create_oval.assert_not_called()
+
+
+# Tests for display_chatgpt
+class TestDisplayChatgpt(unittest.TestCase):
+    def setUp(self):
+        main.review_summary_text = MagicMock()
+        main.product_improvement_text = MagicMock()
+        self.reviews = [{"review_title": "Great", "review_date": "March 1, 2022", "review_text": "Works well."}]
+
+    @patch("chatgpt_integration.ask_chatgpt")
+    def test_both_requests_are_sent_at_the_same_time(self, mock_ask_chatgpt):
+        both_sent = threading.Barrier(2, timeout=5)
+
+        def ask_chatgpt(question, on_delta=None):
+            both_sent.wait()
+            return "Summary" if question.startswith("Summarize") else "Suggestions"
+
+        mock_ask_chatgpt.side_effect = ask_chatgpt
+        main.display_chatgpt(self.reviews)
+        main.review_summary_text.insert.assert_called_once_with(tk.INSERT, "Generating summary of the reviews...")
+        self.assertTrue(main.task_runner.process_until_idle())
+
+        main.review_summary_text.insert.assert_called_with(tk.INSERT, "Summary")
+        main.product_improvement_text.insert.assert_called_with(tk.INSERT, "Suggestions")
+        for question in (call_args.args[0] for call_args in mock_ask_chatgpt.call_args_list):
+            self.assertIn("Title: Great\nDate: March 1, 2022\nReview: Works well.\n", question)
+
+    @patch("chatgpt_integration.stream_chatgpt")
+    def test_answers_are_streamed_into_the_text_areas(self, mock_stream_chatgpt):
+        mock_stream_chatgpt.side_effect = lambda question, force_refresh: iter(["Good ", "sound. "])
+        main.display_chatgpt(self.reviews)
+        self.assertTrue(main.task_runner.process_until_idle())
+
+        for text_area in (main.review_summary_text, main.product_improvement_text):
+            streamed = "".join(args[1] for args, _ in text_area.insert.call_args_list if args[0] == tk.END)
+            self.assertEqual(streamed, "Good sound. ")
+            # The complete answer replaces the streamed pieces
+            text_area.insert.assert_called_with(tk.INSERT, "Good sound.")
+
+    @patch("chatgpt_integration.stream_chatgpt")
+    def test_answers_of_previous_scrape_are_dropped(self, mock_stream_chatgpt):
+        first_question_asked = threading.Event()
+        second_scrape_shown = threading.Event()
+
+        # The answers to the first scrape are still streaming when the second scrape asks its questions
+        def stream_chatgpt(question, force_refresh):
+            if "Old review." in question:
+                first_question_asked.set()
+                second_scrape_shown.wait(timeout=5)
+                yield "Old "
+                yield "answer."
+            else:
+                yield "New answer."
+
+        mock_stream_chatgpt.side_effect = stream_chatgpt
+        main.display_chatgpt([{**self.reviews[0], "review_text": "Old review."}])
+        self.assertTrue(first_question_asked.wait(timeout=5))
+        main.display_chatgpt(self.reviews)
+        second_scrape_shown.set()
+        self.assertTrue(main.task_runner.process_until_idle())
+
+        for text_area in (main.review_summary_text, main.product_improvement_text):
+            texts = [args[1] for args, _ in text_area.insert.call_args_list]
+            self.assertNotIn("Old ", texts)
+            self.assertNotIn("Old answer.", texts)
+            text_area.insert.assert_called_with(tk.INSERT, "New answer.")
+
+
+# Tests for display_wordcloud
+class TestDisplayWordcloud(unittest.TestCase):
+    def setUp(self):
+        self.review_store = ReviewStore([{"review_text": "Great sound"}, {"review_text": "Great battery"}])
+
+    @patch("main.plt")
+    @patch("main.WordCloud")
+    @patch("main.filter_stopwords", return_value="great sound great battery")
+    def test_word_cloud_is_generated_in_background(self, mock_filter_stopwords, mock_wordcloud, mock_plt):
+        threads = []
+        mock_filter_stopwords.side_effect = lambda text: threads.append(threading.current_thread()) or text
+        main.display_wordcloud(self.review_store)
+        self.assertTrue(main.task_runner.process_until_idle())
+
+        self.assertNotIn(threading.main_thread(), threads)
+        mock_filter_stopwords.assert_called_once_with("Great sound Great battery")
+        image = mock_wordcloud.return_value.generate.return_value.to_array.return_value
+        mock_plt.imshow.assert_called_once_with(image, interpolation="bilinear")
+        mock_plt.show.assert_called_once()
+
+    @patch("main.plt")
+    @patch("main.filter_stopwords", return_value="")
+    def test_no_words_left(self, _, mock_plt):
+        main.display_wordcloud(self.review_store)
+        self.assertTrue(main.task_runner.process_until_idle())
+        mock_plt.show.assert_not_called()
+
+
+# Tests for update_treeview
+class TestUpdateTreeview(unittest.TestCase):
+    def setUp(self):
+        main.refresh_var = MagicMock(**{"get.return_value": False})
+        main.search_button = MagicMock()
+        main.products_tree = MagicMock()
+        main.products_tree.get_children.return_value = ("1", "2")
+        main.search_results = {"1": {}, "2": {}}
+        main.prefetcher = MagicMock()
+
+    @staticmethod
+    def page_products(*asins):
+        return {
+            "Product Name": [f"Lamp {asin}" for asin in asins],
+            "Product URL": [f"https://www.amazon.com/dp/{asin}/" for asin in asins],
+            "ASIN": list(asins),
+        }
+
+    @patch("main.iter_amazon_product_pages")
+    def test_products_are_added_page_by_page(self, mock_iter_amazon_product_pages):
+        second_page_allowed = threading.Event()
+
+        def search(keyword, search_param, num_pages, force_refresh):
+            yield self.page_products("B01", "B02")
+            second_page_allowed.wait(timeout=5)
+            yield self.page_products("B03")
+
+        mock_iter_amazon_product_pages.side_effect = search
+
+        # update_treeview clears the tree at once and returns while the search is still running
+        main.update_treeview("lamp", "aps", 2)
+        main.products_tree.delete.assert_called_once_with("1", "2")
+        main.search_button.config.assert_called_once_with(state=tk.DISABLED)
+
+        # The products of the first page are shown while the second page is loading
+        while main.products_tree.insert.call_count < 2:
+            main.task_runner.process_events()
+        main.products_tree.insert.assert_called_with("", "end", iid="2", values=(2, "Lamp B02", "B02"))
+
+        second_page_allowed.set()
+        self.assertTrue(main.task_runner.process_until_idle())
+
+        mock_iter_amazon_product_pages.assert_called_once_with("lamp", "aps", 2, False)
+        main.products_tree.insert.assert_called_with("", "end", iid="3", values=(3, "Lamp B03", "B03"))
+        self.assertEqual(list(main.search_results), ["1", "2", "3"])
+        self.assertEqual(main.search_results["3"]["Product URL"], "https://www.amazon.com/dp/B03/")
+        main.search_button.config.assert_called_with(state=tk.NORMAL)
+
+    @patch("main.PREFETCH_TOP_RESULTS", 2)
+    @patch("main.iter_amazon_product_pages")
+    def test_first_results_are_prefetched(self, mock_iter_amazon_product_pages):
+        mock_iter_amazon_product_pages.return_value = iter([self.page_products("B01", "B02", "B03")])
+
+        main.update_treeview("lamp", "aps", 1)
+        self.assertTrue(main.task_runner.process_until_idle())
+
+        main.prefetcher.cancel.assert_called_once()
+        self.assertEqual(
+            main.prefetcher.prefetch_description.call_args_list,
+            [
+                call("B01", "https://www.amazon.com/dp/B01/"),
+                call("B02", "https://www.amazon.com/dp/B02/"),
+            ],
+        )
+
+    @patch("main.iter_amazon_product_pages", side_effect=RuntimeError("Connection lost"))
+    def test_search_error_enables_search_button(self, mock_iter_amazon_product_pages):
+        main.update_treeview("lamp", "aps", 1)
+        self.assertTrue(main.task_runner.process_until_idle())
+
+        main.products_tree.insert.assert_not_called()
+        self.assertEqual(main.search_results, {})
+        main.search_button.config.assert_called_with(state=tk.NORMAL)
+
+
+# Tests for on_select
+class TestOnSelect(unittest.TestCase):
+    def setUp(self):
+        main.refresh_var = MagicMock(**{"get.return_value": False})
+        main.product_text = MagicMock()
+        main.scrape_button = MagicMock()
+        main.products_tree = MagicMock()
+        main.products_tree.selection.return_value = ["7"]
+        main.search_results = {
+            "7": {"Product Name": "Lamp", "Product URL": "https://www.amazon.com/dp/B08L5V9T31", "ASIN": "B08L5V9T31"}
+        }
+        main.prefetcher = MagicMock()
+
+    def test_description_is_loaded_in_background(self):
+        main.prefetcher.get_cached_description.return_value = None
+        main.prefetcher.get_description.return_value = "A great lamp."
+
+        main.on_select(None)
+        main.product_text.insert.assert_called_with(tk.END, "Loading the product description...")
+        main.scrape_button.config.assert_called_with(state=tk.NORMAL)
+
+        self.assertTrue(main.task_runner.process_until_idle())
+        main.prefetcher.get_description.assert_called_once_with(
+            "B08L5V9T31", "https://www.amazon.com/dp/B08L5V9T31", False
         )
-        mock_run_scraping.assert_called()
+        main.product_text.insert.assert_called_with(tk.END, "A great lamp.")
+        self.assertEqual(main.product_id, "B08L5V9T31")
+
+    def test_prefetched_description_is_displayed_at_once(self):
+        main.prefetcher.get_cached_description.return_value = "A great lamp."
+
+        main.on_select(None)
+
+        main.product_text.insert.assert_called_once_with(tk.END, "A great lamp.")
+        main.prefetcher.get_description.assert_not_called()
+        main.prefetcher.prefetch_review_page.assert_called_once_with("B08L5V9T31")
+
+    def test_force_refresh_downloads_description_again(self):
+        main.refresh_var.get.return_value = True
+        main.prefetcher.get_cached_description.return_value = "Old description."
+        main.prefetcher.get_description.return_value = "A great lamp."
+
+        main.on_select(None)
+        self.assertTrue(main.task_runner.process_until_idle())
+
+        main.prefetcher.get_description.assert_called_once_with(
+            "B08L5V9T31", "https://www.amazon.com/dp/B08L5V9T31", True
+        )
+        main.product_text.insert.assert_called_with(tk.END, "A great lamp.")
+        main.prefetcher.prefetch_review_page.assert_not_called()
+
+    def test_description_of_previous_selection_is_ignored(self):
+        main.product_url = "https://www.amazon.com/dp/B000000002"
+        main.display_product_description("https://www.amazon.com/dp/B08L5V9T31", "Old description.")
+        main.product_text.insert.assert_not_called()
 
 
 if __name__ == "__main__":
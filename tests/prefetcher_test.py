@@ -0,0 +1,110 @@
+"""
+prefetcher_test.py: This script is for testing the class contained in prefetcher.py.
+"""
+
+import threading
+import unittest
+from unittest.mock import patch
+
+from prefetcher import Prefetcher
+from scraping_utils import RateLimiter
+
+
+# Tests for Prefetcher
+@patch("prefetcher.rate_limiter", RateLimiter(0))
+class TestPrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.prefetcher = Prefetcher(max_entries=2, max_workers=1)
+        self.addCleanup(self.prefetcher.shutdown)
+
+    def wait_for_prefetches(self):
+        # The single worker runs the prefetches in order, so this job finishes after all earlier ones
+        self.prefetcher._executor.submit(lambda: None).result(timeout=5)
+
+    @patch("prefetcher.scrape_amazon_product_description", return_value="A great lamp.")
+    def test_prefetched_description_is_cached(self, mock_scrape_description):
+        self.prefetcher.prefetch_description("B01", "https://www.amazon.com/dp/B01")
+        self.wait_for_prefetches()
+
+        self.assertEqual(self.prefetcher.get_cached_description("B01"), "A great lamp.")
+        self.assertEqual(self.prefetcher.get_description("B01", "https://www.amazon.com/dp/B01"), "A great lamp.")
+        mock_scrape_description.assert_called_once()
+        self.assertEqual(mock_scrape_description.call_args.args, ("https://www.amazon.com/dp/B01",))
+        # The prefetch only waits for the rate limiter if the product page is really downloaded
+        self.assertIsNotNone(mock_scrape_description.call_args.kwargs["before_request"])
+
+    @patch("prefetcher.scrape_amazon_product_description", side_effect=["Old lamp.", "New lamp."])
+    def test_force_refresh_ignores_prefetched_description(self, mock_scrape_description):
+        self.prefetcher.prefetch_description("B01", "https://www.amazon.com/dp/B01")
+        self.wait_for_prefetches()
+
+        description = self.prefetcher.get_description("B01", "https://www.amazon.com/dp/B01", force_refresh=True)
+        self.assertEqual(description, "New lamp.")
+        mock_scrape_description.assert_called_with(
+            "https://www.amazon.com/dp/B01", force_refresh=True, before_request=None
+        )
+        self.assertEqual(self.prefetcher.get_cached_description("B01"), "New lamp.")
+
+    @patch("prefetcher.scrape_amazon_product_description", return_value="A great lamp.")
+    def test_cache_is_bounded(self, mock_scrape_description):
+        for asin in ("B01", "B02", "B03"):
+            self.prefetcher.prefetch_description(asin, f"https://www.amazon.com/dp/{asin}")
+        self.wait_for_prefetches()
+
+        self.assertIsNone(self.prefetcher.get_cached_description("B01"))
+        self.assertEqual(self.prefetcher.get_cached_description("B03"), "A great lamp.")
+
+    @patch("prefetcher.scrape_amazon_product_description")
+    def test_get_description_waits_for_running_prefetch(self, mock_scrape_description):
+        download_started = threading.Event()
+        download_allowed = threading.Event()
+
+        def scrape_description(product_url, force_refresh, before_request):
+            download_started.set()
+            download_allowed.wait(timeout=5)
+            return "A great lamp."
+
+        mock_scrape_description.side_effect = scrape_description
+        self.prefetcher.prefetch_description("B01", "https://www.amazon.com/dp/B01")
+        self.assertTrue(download_started.wait(timeout=5))
+
+        threading.Timer(0.05, download_allowed.set).start()
+        self.assertEqual(self.prefetcher.get_description("B01", "https://www.amazon.com/dp/B01"), "A great lamp.")
+        mock_scrape_description.assert_called_once()
+
+    @patch("prefetcher.scrape_amazon_product_description")
+    def test_cancel_drops_waiting_prefetches(self, mock_scrape_description):
+        worker_blocked = threading.Event()
+        self.prefetcher._executor.submit(worker_blocked.wait, 5)
+
+        self.prefetcher.prefetch_description("B01", "https://www.amazon.com/dp/B01")
+        self.prefetcher.cancel()
+        worker_blocked.set()
+        self.wait_for_prefetches()
+
+        mock_scrape_description.assert_not_called()
+        self.assertIsNone(self.prefetcher.get_cached_description("B01"))
+
+    @patch("prefetcher.scrape_amazon_product_description")
+    def test_stale_prefetch_is_skipped(self, mock_scrape_description):
+        self.prefetcher._prefetch_description(self.prefetcher.generation - 1, "B01", "https://www.amazon.com/dp/B01")
+        mock_scrape_description.assert_not_called()
+
+    @patch("prefetcher.scrape_amazon_product_description", return_value=None)
+    def test_failed_description_is_not_cached(self, mock_scrape_description):
+        self.assertIsNone(self.prefetcher.get_description("B01", "https://www.amazon.com/dp/B01"))
+        self.assertIsNone(self.prefetcher.get_cached_description("B01"))
+
+    @patch("prefetcher.fetch_page_html")
+    def test_first_review_page_is_prefetched_once(self, mock_fetch_page_html):
+        self.prefetcher.prefetch_review_page("B08L5V9T31")
+        self.prefetcher.prefetch_review_page("B08L5V9T31")
+        self.wait_for_prefetches()
+
+        mock_fetch_page_html.assert_called_once()
+        self.assertIn("/product-reviews/B08L5V9T31", mock_fetch_page_html.call_args.args[0])
+        self.assertIn("pageNumber=1", mock_fetch_page_html.call_args.args[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+review_selector_test.py: This script is for testing the functions contained in review_selector.py.
+"""
+
+import json
+import os
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from chatgpt_integration import format_reviews_for_prompt
+from review_selector import (
+    cluster_vectors,
+    get_sentiment_group,
+    get_stratum,
+    get_tfidf_vectors,
+    select_representative_reviews,
+)
+from review_summarizer import count_tokens
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+# Build a review with the fields used by the selection
+def make_review(text, stars=5.0, polarity=0.5):
+    return {
+        "review_title": "Title",
+        "review_date": "March 1, 2022",
+        "review_stars": f"{stars} out of 5 stars",
+        "review_text": text,
+        "textblob_polarity": polarity,
+    }
+
+
+# Tests for get_tfidf_vectors
+class TestGetTfidfVectors(unittest.TestCase):
+    def test_vectors_are_normalized(self):
+        vectors = get_tfidf_vectors(["great blender great price", "great blender", "loud motor", "loud"])
+        np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-6)
+        # Similar texts have a higher cosine similarity
+        self.assertGreater(vectors[0] @ vectors[1], vectors[0] @ vectors[2])
+
+    def test_no_shared_words(self):
+        self.assertEqual(get_tfidf_vectors(["first text", "other words"]).tolist(), [[0.0], [0.0]])
+
+
+# Tests for cluster_vectors
+class TestClusterVectors(unittest.TestCase):
+    def test_similar_texts_share_their_cluster(self):
+        texts = ["lid leaks water everywhere"] * 5 + ["motor burned out quickly"] * 5
+        labels, similarities = cluster_vectors(get_tfidf_vectors(texts), 2)
+        self.assertEqual(len(set(labels[:5])), 1)
+        self.assertEqual(len(set(labels[5:])), 1)
+        self.assertNotEqual(labels[0], labels[5])
+        np.testing.assert_allclose(similarities, 1.0, rtol=1e-6)
+
+    def test_same_vectors_give_same_clusters(self):
+        vectors = get_tfidf_vectors([f"review {i % 4} about blender number {i % 3}" for i in range(30)])
+        self.assertEqual(cluster_vectors(vectors, 4)[0].tolist(), cluster_vectors(vectors, 4)[0].tolist())
+
+
+# Tests for get_stratum and get_sentiment_group
+class TestStrata(unittest.TestCase):
+    def test_get_stratum(self):
+        self.assertEqual(get_stratum(make_review("", 4.0, 0.6)), (4, 2))
+        self.assertEqual(get_stratum(make_review("", 1.0, -0.3)), (1, 0))
+        self.assertEqual(get_stratum({"review_stars": "No rating", "textblob_polarity": 0.1}), (0, 1))
+
+    def test_get_sentiment_group(self):
+        self.assertEqual(get_sentiment_group((2, 2)), 0)
+        self.assertEqual(get_sentiment_group((3, 0)), 1)
+        self.assertEqual(get_sentiment_group((5, 0)), 2)
+        self.assertEqual(get_sentiment_group((0, 0)), 0)
+
+
+# Tests for select_representative_reviews
+@patch("review_summarizer.get_encoding", return_value=None)
+class TestSelectRepresentativeReviews(unittest.TestCase):
+    def test_reviews_within_budget_are_all_returned(self, _):
+        reviews = [make_review("Works well."), make_review("Broke.", 1.0, -0.5)]
+        self.assertEqual(select_representative_reviews(reviews, max_tokens=1000), reviews)
+
+    def test_selection_fits_budget_and_keeps_order(self, _):
+        reviews = [make_review(f"Great blender number {i}, smoothies are perfect.") for i in range(100)]
+        selected = select_representative_reviews(reviews, max_tokens=200)
+
+        self.assertTrue(selected)
+        self.assertLessEqual(count_tokens(format_reviews_for_prompt(selected)), 200)
+        positions = [reviews.index(review) for review in selected]
+        self.assertEqual(positions, sorted(positions))
+
+    def test_rare_complaints_are_selected(self, _):
+        with open(os.path.join(FIXTURES_DIR, "review_sets.json"), encoding="utf-8") as fixture:
+            review_sets = json.load(fixture)
+
+        for review_set in review_sets.values():
+            selected = select_representative_reviews(review_set["reviews"], max_tokens=3000, per_cluster=3)
+            self.assertLess(len(selected), len(review_set["reviews"]) / 5)
+            self.assertTrue(set(review_set["negative_themes"]) <= {review["theme"] for review in selected})
+
+    def test_review_longer_than_budget(self, _):
+        reviews = [make_review("long " * 100), make_review("longer " * 100)]
+        self.assertEqual(select_representative_reviews(reviews, max_tokens=10), [reviews[0]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+"""
+review_store_test.py: This script is for testing the class contained in review_store.py.
+"""
+
+import unittest
+
+import numpy as np
+
+from review_store import ReviewStore, SortedRangeIndex, as_positions
+
+
+# Tests for ReviewStore
+class TestReviewStore(unittest.TestCase):
+    def setUp(self):
+        self.reviews = [
+            {
+                "review_id": "R1",
+                "review_title": "Great",
+                "review_date": "Reviewed in the United States on April 20, 2023",
+                "review_stars": "5.0 out of 5 stars",
+                "review_text": "Love it",
+                "textblob_polarity": 0.5,
+                "textblob_subjectivity": 0.6,
+            },
+            {
+                "review_id": "R2",
+                "review_title": "Bad",
+                "review_date": "Reviewed in Germany on March 3, 2022",
+                "review_stars": "1,0 von 5 Sternen",
+                "review_text": "Broke quickly",
+                "textblob_polarity": -0.7,
+                "textblob_subjectivity": 0.9,
+            },
+            {
+                "review_id": "R3",
+                "review_title": "Fine",
+                "review_date": "No date",
+                "review_stars": "No rating",
+                "review_text": "It works",
+                "textblob_polarity": 0.0,
+                "textblob_subjectivity": 0.1,
+            },
+        ]
+        self.store = ReviewStore(self.reviews)
+
+    def test_columns(self):
+        self.assertEqual(len(self.store), 3)
+        np.testing.assert_array_equal(self.store.polarity, [0.5, -0.7, 0.0])
+        np.testing.assert_array_equal(self.store.subjectivity, [0.6, 0.9, 0.1])
+
+    def test_parsed_stars_and_dates(self):
+        np.testing.assert_array_equal(self.store.stars, [5.0, 1.0, np.nan])
+        self.assertEqual(str(self.store.dates[0])[:10], "2023-04-20")
+        self.assertEqual(str(self.store.dates[1])[:10], "2022-03-03")
+        self.assertTrue(np.isnat(self.store.dates[2]))
+
+    def test_filter(self):
+        np.testing.assert_array_equal(self.store.filter(), [0, 1, 2])
+        np.testing.assert_array_equal(self.store.filter(min_polarity=0.0), [0, 2])
+        np.testing.assert_array_equal(self.store.filter(max_subjectivity=0.6), [0, 2])
+        np.testing.assert_array_equal(self.store.filter(min_polarity=0.9), [])
+
+    def test_filter_bounds_are_inclusive(self):
+        np.testing.assert_array_equal(self.store.filter(min_polarity=0.5, max_polarity=0.5), [0])
+
+    def test_filter_by_stars_excludes_missing_ratings(self):
+        np.testing.assert_array_equal(self.store.filter(min_stars=1), [0, 1])
+        np.testing.assert_array_equal(self.store.filter(max_stars=4), [1])
+
+    def test_sort(self):
+        positions = np.arange(3)
+        np.testing.assert_array_equal(self.store.sort(positions, "stars"), [1, 0, 2])
+        np.testing.assert_array_equal(self.store.sort(positions, "stars", descending=True), [0, 1, 2])
+        np.testing.assert_array_equal(self.store.sort(positions, "date", descending=True), [0, 1, 2])
+        np.testing.assert_array_equal(self.store.sort(positions, "date"), [1, 0, 2])
+        np.testing.assert_array_equal(self.store.sort(positions, "polarity", descending=True), [0, 2, 1])
+        np.testing.assert_array_equal(self.store.sort(np.array([2, 1]), "polarity"), [1, 2])
+
+    def test_sort_keeps_order_of_equal_values(self):
+        store = ReviewStore([{"textblob_polarity": 0.5} for _ in range(4)])
+        np.testing.assert_array_equal(store.sort(np.array([3, 1, 2, 0]), "polarity", descending=True), [3, 1, 2, 0])
+
+    def test_sort_unknown_column(self):
+        with self.assertRaises(ValueError):
+            self.store.sort(np.arange(3), "title")
+
+    def test_get_review_ids(self):
+        self.assertEqual(self.store.get_review_ids(self.store.filter(min_polarity=0.0)), ["R1", "R3"])
+
+    def test_get_reviews(self):
+        self.assertEqual(self.store.get_reviews([1]), [self.reviews[1]])
+        self.assertEqual(self.store.get_reviews(), self.reviews)
+
+    def test_get_texts(self):
+        self.assertEqual(self.store.get_texts(), ["Love it", "Broke quickly", "It works"])
+        self.assertEqual(self.store.get_texts(np.array([2, 0])), ["It works", "Love it"])
+
+    def test_average_polarity(self):
+        self.assertAlmostEqual(self.store.average_polarity(), -0.2 / 3)
+        self.assertAlmostEqual(self.store.average_polarity(np.array([0, 2])), 0.25)
+
+    def test_missing_fields_use_defaults(self):
+        store = ReviewStore([{"review_title": "Sample Title", "review_text": "Sample Review Text"}])
+        review = store.get_reviews()[0]
+        self.assertEqual(review["review_stars"], "No rating")
+        self.assertEqual(review["textblob_polarity"], 0.0)
+
+    def test_extend(self):
+        store = ReviewStore(self.reviews[:1])
+        store.extend([])
+        store.extend(self.reviews[1:])
+
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.get_reviews(), self.store.get_reviews())
+        np.testing.assert_array_equal(store.stars, self.store.stars)
+        np.testing.assert_array_equal(store.dates, self.store.dates)
+        np.testing.assert_array_equal(store.filter(min_polarity=0.0), [0, 2])
+        np.testing.assert_array_equal(store.filter(min_stars=2), [0])
+
+    def test_empty_store(self):
+        store = ReviewStore()
+        self.assertEqual(len(store), 0)
+        self.assertEqual(len(store.filter()), 0)
+        self.assertEqual(store.average_polarity(), 0.0)
+        self.assertEqual(store.get_texts(), [])
+
+
+# Tests for SortedRangeIndex
+class TestSortedRangeIndex(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.polarity = rng.uniform(-1, 1, 1000)
+        self.stars = rng.integers(1, 6, 1000).astype(float)
+        self.stars[::10] = np.nan
+        self.index = SortedRangeIndex({"polarity": self.polarity, "stars": self.stars})
+
+    def test_same_result_as_a_scan(self):
+        for minimum, maximum, min_stars, max_stars in [
+            (-0.2, 0.3, 1, 5),
+            (0.9, 1, 4, 5),
+            (-1, 1, 3, 3),
+            (0.5, 0.4, 1, 5),
+        ]:
+            expected = np.flatnonzero(
+                (self.polarity >= minimum)
+                & (self.polarity <= maximum)
+                & (self.stars >= min_stars)
+                & (self.stars <= max_stars)
+            )
+            result = self.index.query({"polarity": (minimum, maximum), "stars": (min_stars, max_stars)})
+            np.testing.assert_array_equal(result, expected)
+
+    def test_nan_values_never_match(self):
+        result = self.index.query({"stars": (-np.inf, np.inf)})
+        self.assertEqual(len(result), 900)
+
+    def test_empty_query_returns_all_rows(self):
+        np.testing.assert_array_equal(self.index.query({}), np.arange(1000))
+
+    def test_extend_matches_a_new_index(self):
+        index = SortedRangeIndex({"polarity": self.polarity[:0], "stars": self.stars[:0]})
+        for end in (1, 300, 301, 1000):
+            index.extend({"polarity": self.polarity[:end], "stars": self.stars[:end]})
+
+        for name in ("polarity", "stars"):
+            np.testing.assert_array_equal(index.orders[name], self.index.orders[name])
+            np.testing.assert_array_equal(index.sorted_values[name], self.index.sorted_values[name])
+        np.testing.assert_array_equal(
+            index.query({"polarity": (-0.2, 0.3), "stars": (2, 4)}),
+            self.index.query({"polarity": (-0.2, 0.3), "stars": (2, 4)}),
+        )
+
+
+# Tests for as_positions
+class TestAsPositions(unittest.TestCase):
+    def test_conversion(self):
+        np.testing.assert_array_equal(as_positions(range(3)), [0, 1, 2])
+        positions = np.array([4, 2], dtype=np.int64)
+        self.assertIs(as_positions(positions), positions)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+review_summarizer_test.py: This script is for testing the functions contained in review_summarizer.py.
+"""
+
+import re
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from review_summarizer import (
+    CHUNK_INSTRUCTION,
+    COMBINE_INSTRUCTION,
+    condense_reviews,
+    count_tokens,
+    split_into_chunks,
+    truncate_to_tokens,
+)
+
+
+# A tokenizer counting each word and the whitespace after it as one token
+class FakeEncoding:
+    def encode(self, text):
+        return re.findall(r"\S+\s*", text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+# Build reviews whose formatted text has the given number of words
+def make_reviews(count, words=10):
+    return [
+        {"review_title": f"T{i}", "review_date": "D", "review_text": " ".join(["w"] * (words - 5))}
+        for i in range(count)
+    ]
+
+
+# Tests for the token counting functions
+class TestTokens(unittest.TestCase):
+    @patch("review_summarizer.get_encoding", return_value=FakeEncoding())
+    def test_tokenizer(self, _):
+        self.assertEqual(count_tokens("a b c"), 3)
+        self.assertEqual(truncate_to_tokens("a b c", 2), "a b ")
+        self.assertEqual(truncate_to_tokens("a b c", 3), "a b c")
+
+    @patch("review_summarizer.get_encoding", return_value=None)
+    def test_estimate_without_tokenizer(self, _):
+        self.assertEqual(count_tokens("abcdefg"), 3)
+        self.assertEqual(truncate_to_tokens("abcdefg", 2), "abcdef")
+
+
+# Tests for split_into_chunks
+@patch("review_summarizer.get_encoding", return_value=FakeEncoding())
+class TestSplitIntoChunks(unittest.TestCase):
+    def test_texts_are_packed_in_order(self, _):
+        self.assertEqual(split_into_chunks(["a b ", "c ", "d e f ", "g "], 4), ["a b c ", "d e f g "])
+
+    def test_long_text_is_truncated(self, _):
+        self.assertEqual(split_into_chunks(["a ", "b c d e f g "], 3), ["a ", "b c d "])
+
+    def test_no_texts(self, _):
+        self.assertEqual(split_into_chunks([], 3), [])
+
+
+# Tests for condense_reviews
+@patch("review_summarizer.get_encoding", return_value=FakeEncoding())
+class TestCondenseReviews(unittest.TestCase):
+    @patch("review_summarizer.request_chatgpt")
+    def test_short_reviews_are_returned_unchanged(self, mock_request_chatgpt, _):
+        reviews = make_reviews(3)
+        text = condense_reviews(reviews, max_tokens=100)
+        self.assertIn("Title: T2\nDate: D\nReview: w", text)
+        mock_request_chatgpt.assert_not_called()
+
+    @patch("review_summarizer.request_chatgpt")
+    def test_chunk_summaries_are_combined(self, mock_request_chatgpt, _):
+        def request_chatgpt(question):
+            return "chunk summary" if question.startswith(CHUNK_INSTRUCTION) else "combined summary"
+
+        mock_request_chatgpt.side_effect = request_chatgpt
+        # 40 reviews of 10 words make 20 chunks, whose 20 summaries make 2 groups to combine
+        text = condense_reviews(make_reviews(40), max_tokens=20)
+
+        questions = [call_args.args[0] for call_args in mock_request_chatgpt.call_args_list]
+        self.assertEqual(sum(question.startswith(CHUNK_INSTRUCTION) for question in questions), 20)
+        self.assertEqual(sum(question.startswith(COMBINE_INSTRUCTION) for question in questions), 2)
+        self.assertEqual(text, "combined summary\ncombined summary\n")
+        # Every review was sent in one of the chunks
+        for i in range(40):
+            self.assertTrue(any(f"Title: T{i}\n" in question for question in questions))
+
+    @patch("review_summarizer.request_chatgpt")
+    def test_concurrent_requests_are_limited(self, mock_request_chatgpt, _):
+        lock = threading.Lock()
+        running = []
+        peak = [0]
+
+        def request_chatgpt(question):
+            with lock:
+                running.append(question)
+                peak[0] = max(peak[0], len(running))
+            time.sleep(0.01)
+            with lock:
+                running.remove(question)
+            return "summary"
+
+        mock_request_chatgpt.side_effect = request_chatgpt
+        condense_reviews(make_reviews(20), max_tokens=20, max_workers=3)
+        self.assertGreater(peak[0], 1)
+        self.assertLessEqual(peak[0], 3)
+
+    @patch("review_summarizer.request_chatgpt")
+    def test_chunks_not_summarized_in_time_are_left_out(self, mock_request_chatgpt, _):
+        released = threading.Event()
+        self.addCleanup(released.set)
+
+        def request_chatgpt(question):
+            if "Title: T0\n" in question:
+                released.wait(timeout=5)
+                return "slow summary"
+            return "fast summary"
+
+        mock_request_chatgpt.side_effect = request_chatgpt
+        start = time.monotonic()
+        text = condense_reviews(make_reviews(4), max_tokens=20, max_workers=2, time_budget=0.2)
+
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(text, "fast summary\n")
+
+    @patch("review_summarizer.request_chatgpt")
+    def test_failed_chunks_are_left_out(self, mock_request_chatgpt, _):
+        mock_request_chatgpt.side_effect = lambda question: 1 / 0 if "Title: T0\n" in question else "summary"
+        self.assertEqual(condense_reviews(make_reviews(4), max_tokens=20), "summary\n")
+
+    @patch("review_summarizer.request_chatgpt", side_effect=Exception("Authentication error"))
+    def test_reviews_are_truncated_if_nothing_is_summarized(self, _, __):
+        text = condense_reviews(make_reviews(4), max_tokens=20)
+        self.assertEqual(count_tokens(text), 20)
+        self.assertTrue(text.startswith("Title: T0\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+"""
+review_viewer_test.py: This script is for testing the functions and classes contained in review_viewer.py.
+"""
+
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from review_store import ReviewStore
+from review_viewer import ReviewListView, format_review
+
+
+# Tests for format_review
+class TestFormatReview(unittest.TestCase):
+    def test_format(self):
+        review = {
+            "review_title": "Great",
+            "review_stars": "5.0 out of 5 stars",
+            "review_date": "Reviewed in the United States on April 20, 2023",
+            "textblob_polarity": 0.5,
+            "textblob_subjectivity": 0.25,
+            "review_text": "Love it",
+        }
+        self.assertEqual(
+            format_review(review),
+            "Title: Great\n"
+            "Rating: 5.0 out of 5 stars\n"
+            "Date: Reviewed in the United States on April 20, 2023\n"
+            "Polarity: 0.50, Subjectivity: 0.25\n"
+            "Review: Love it\n"
+            "---------------------------------------------\n",
+        )
+
+
+# Create a class to replace the text widget of a ReviewListView in tests
+class FakeText:
+    """
+    A text widget showing a fixed number of lines of LINE_HEIGHT pixels without wrapping them, supporting the
+    methods used by ReviewListView, so that scrolling can be tested without a display.
+
+    Arguments:
+    height (int): the number of visible lines.
+    """
+
+    LINE_HEIGHT = 10
+
+    def __init__(self, height=20):
+        self.height = height
+        self.lines = [""]
+        self.top = 0
+
+    def bind(self, sequence, function):
+        pass
+
+    def delete(self, first, last):
+        self.lines = [""]
+        self.top = 0
+
+    def insert(self, index, text):
+        self.lines = text.split("\n")
+
+    def get_visible_lines(self):
+        return self.lines[self.top : self.top + self.height]
+
+    def winfo_height(self):
+        return self.height * self.LINE_HEIGHT
+
+    def index(self, index):
+        row = min(int(index.split(",")[1]) // self.LINE_HEIGHT, self.height - 1)
+        return f"{min(self.top + row, len(self.lines) - 1) + 1}.0"
+
+    def yview(self, *args):
+        if not args:
+            return self.top / len(self.lines), min(self.top + self.height, len(self.lines)) / len(self.lines)
+        self._scroll_to(int(args[0].split(".")[0]) - 1)
+
+    def yview_scroll(self, number, what):
+        self._scroll_to(self.top + number)
+
+    def _scroll_to(self, top):
+        self.top = max(0, min(top, len(self.lines) - self.height))
+
+
+# Tests for ReviewListView
+class TestReviewListView(unittest.TestCase):
+    def setUp(self):
+        self.text_widget = MagicMock(wraps=FakeText())
+        self.scrollbar = MagicMock()
+        self.on_scroll = MagicMock()
+        self.view = ReviewListView(self.text_widget, self.scrollbar, window_size=3, on_scroll=self.on_scroll)
+        self.store = ReviewStore([{"review_text": f"Review {index}"} for index in range(50000)])
+
+    def shown_reviews(self):
+        text = self.text_widget.insert.call_args.args[1]
+        return [line[len("Review: ") :] for line in text.splitlines() if line.startswith("Review: ")]
+
+    def test_only_the_window_is_rendered(self):
+        self.view.set_reviews(self.store, np.arange(len(self.store)))
+
+        self.assertEqual(self.shown_reviews(), ["Review 0", "Review 1", "Review 2"])
+        self.text_widget.insert.assert_called_once()
+        self.scrollbar.set.assert_called_with(0.0, 3 / 50000)
+        self.on_scroll.assert_called_with(0, 3, 50000)
+
+    def test_scrollbar_commands(self):
+        self.view.set_reviews(self.store, np.arange(len(self.store)))
+
+        self.view.yview("scroll", 1, "units")
+        self.assertEqual(self.shown_reviews(), ["Review 1", "Review 2", "Review 3"])
+        self.view.yview("scroll", 2, "pages")
+        self.assertEqual(self.shown_reviews(), ["Review 7", "Review 8", "Review 9"])
+        self.view.yview("moveto", "0.5")
+        self.assertEqual(self.shown_reviews(), ["Review 25000", "Review 25001", "Review 25002"])
+
+    def test_scrolling_stops_at_both_ends(self):
+        self.view.set_reviews(self.store, np.arange(len(self.store)))
+
+        self.view.yview("moveto", "1.5")
+        self.assertEqual(self.shown_reviews(), ["Review 49997", "Review 49998", "Review 49999"])
+        self.scrollbar.set.assert_called_with(49997 / 50000, 1.0)
+
+        render_count = self.text_widget.insert.call_count
+        self.view.yview("scroll", 1, "units")
+        self.assertEqual(self.text_widget.insert.call_count, render_count)
+
+        # At the top of the text, scrolling up moves the window by one review
+        self.assertEqual(self.view.on_mouse_wheel(-3), "break")
+        self.assertEqual(self.shown_reviews(), ["Review 49996", "Review 49997", "Review 49998"])
+        self.view.yview("moveto", "0")
+        self.view.on_mouse_wheel(-3)
+        self.assertEqual(self.shown_reviews(), ["Review 0", "Review 1", "Review 2"])
+
+    def test_long_review_can_be_read_to_the_end(self):
+        long_text = "\n".join(f"Line {line}" for line in range(30))
+        store = ReviewStore(
+            [{"review_text": long_text}] + [{"review_text": f"Review {index}"} for index in range(1, 5)]
+        )
+        fake_text = self.text_widget._mock_wraps
+        fake_text.height = 10
+        self.view.set_reviews(store, np.arange(len(store)))
+        self.on_scroll.assert_called_with(0, 1, 5)
+
+        # The wheel scrolls through the lines of the long review without moving the window
+        seen_lines = set(fake_text.get_visible_lines())
+        while "Line 29" not in seen_lines:
+            self.view.on_mouse_wheel(3)
+            seen_lines.update(fake_text.get_visible_lines())
+            self.assertEqual(self.view.first, 0)
+        self.assertTrue({"Review: Line 0"} | {f"Line {line}" for line in range(1, 30)} <= seen_lines)
+        self.assertEqual(self.on_scroll.call_args.args[0], 0)
+
+        # At the bottom of the window, the window moves by one review and the visible lines stay in place
+        while fake_text.yview()[1] < 1.0:
+            self.view.on_mouse_wheel(3)
+        visible_lines = fake_text.get_visible_lines()
+        self.view.on_mouse_wheel(1)
+        self.assertEqual(self.view.first, 1)
+        # The empty last line of the text is followed by the first lines of the next review
+        self.assertEqual(visible_lines[-1], "")
+        self.assertEqual(fake_text.get_visible_lines(), visible_lines[1:-1] + ["Title: No title", "Rating: No rating"])
+        self.on_scroll.assert_called_with(1, 4, 5)
+        self.scrollbar.set.assert_called_with(1 / 5, 4 / 5)
+
+        # Scrolling back up moves the window back and shows the long review again
+        for _ in range(20):
+            self.view.on_mouse_wheel(-3)
+        self.assertEqual(self.view.first, 0)
+        self.assertEqual(fake_text.get_visible_lines()[0], "Title: No title")
+        self.on_scroll.assert_called_with(0, 1, 5)
+
+    def test_positions_set_the_order(self):
+        self.view.set_reviews(self.store, np.array([42, 7, 3, 1]))
+        self.assertEqual(self.shown_reviews(), ["Review 42", "Review 7", "Review 3"])
+
+    def test_keep_position(self):
+        self.view.set_reviews(self.store, np.arange(100))
+        self.view.scroll_to(40)
+
+        self.view.set_reviews(self.store, np.arange(200), keep_position=True)
+        self.assertEqual(self.view.first, 40)
+        self.view.set_reviews(self.store, np.arange(200))
+        self.assertEqual(self.view.first, 0)
+
+    def test_empty_list(self):
+        self.view.set_reviews(ReviewStore(), np.arange(0))
+
+        self.text_widget.insert.assert_called_with("1.0", "No reviews matching the filtering criteria.\n")
+        self.scrollbar.set.assert_called_with(0.0, 1.0)
+        self.on_scroll.assert_called_with(0, 0, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,38 +2,84 @@
 scraping_utils_test.py: This script is for testing the functions contained in scraping_utils.py.
 """
 
+import os
+import tempfile
+import threading
+import time
 import unittest
-from unittest.mock import MagicMock, call, patch
+from unittest.mock import call, patch
 
 import requests
 from bs4 import BeautifulSoup
+from lxml import html as lxml_html
 from textblob import TextBlob
 
+import data_analysis
+import http_client
 import scraping_utils
+from cache_utils import DiskCache
 from scraping_utils import (
+    DescriptionExtractor,
+    RateLimiter,
+    extract_reviews_from_html,
+    find_review_start,
+    get_parse_pool,
     get_number_stars,
     get_page_html,
     get_review_date,
+    get_review_elements,
     get_review_header,
+    get_review_id,
     get_review_text,
     get_reviews_from_html,
+    iter_amazon_reviews,
+    iter_scrape_data,
+    load_stored_reviews,
     orchestrate_data_gathering,
+    parse_review_page,
+    save_stored_reviews,
     scrape_amazon_reviews,
     scrape_data,
+    scrape_new_reviews,
+    score_reviews,
+    shutdown_parse_pool,
+    start_parse_pool,
 )
 
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Disable the sentiment and page caches, so that the tests neither use nor fill the caches of the user
+sentiment_cache_patcher = patch("data_analysis.get_sentiment_cache", return_value=None)
+http_cache_patcher = patch("http_client.get_http_cache", return_value=None)
+search_cache_patcher = patch("scraping_utils.get_search_cache", return_value=None)
+
+
+def setUpModule():
+    sentiment_cache_patcher.start()
+    http_cache_patcher.start()
+    search_cache_patcher.start()
+
+
+def tearDownModule():
+    sentiment_cache_patcher.stop()
+    http_cache_patcher.stop()
+    search_cache_patcher.stop()
+
 
 # Tests for get_page_html
 class TestGetPageHtml(unittest.TestCase):
-    @patch("scraping_utils.requests.get")
+    @patch("scraping_utils.fetch_url")
     def test_successful_html_retrieval(self, mock_get):
         # Simulate a successful response
-        mock_get.return_value = MagicMock(status_code=200, text="<html>Test</html>")
+        mock_get.return_value = "<html>Test</html>"
 
         result = get_page_html("http://test.com")
         self.assertEqual(result, "<html>Test</html>")
+        mock_get.assert_called_once_with(
+            "http://test.com", kind="reviews", force_refresh=False, before_request=scraping_utils.rate_limiter.wait
+        )
 
-    @patch("scraping_utils.requests.get")
+    @patch("scraping_utils.fetch_url")
     def test_http_error(self, mock_get):
         # Simulate an HTTP error
         mock_get.side_effect = requests.exceptions.HTTPError()
@@ -41,7 +87,7 @@ class TestGetPageHtml(unittest.TestCase):
         result = get_page_html("http://test.com")
         self.assertEqual(result, "")
 
-    @patch("scraping_utils.requests.get")
+    @patch("scraping_utils.fetch_url")
     def test_request_exception(self, mock_get):
         # Simulate a request exception, like a connection error
         mock_get.side_effect = requests.exceptions.RequestException()
@@ -50,6 +96,92 @@ class TestGetPageHtml(unittest.TestCase):
         self.assertEqual(result, "")
 
 
+# Tests for RateLimiter
+class TestRateLimiter(unittest.TestCase):
+    @patch("scraping_utils.time.sleep")
+    @patch("scraping_utils.time.monotonic", return_value=100.0)
+    def test_spaces_requests_to_same_host(self, mock_monotonic, mock_sleep):
+        limiter = RateLimiter(requests_per_second=2)
+        limiter.wait("https://www.amazon.com/page1")
+        limiter.wait("https://www.amazon.com/page2")
+        limiter.wait("https://www.amazon.com/page3")
+
+        # The first request is immediate, the following ones are half a second apart
+        mock_sleep.assert_has_calls([call(0.5), call(1.0)])
+
+    @patch("scraping_utils.time.sleep")
+    @patch("scraping_utils.time.monotonic", return_value=100.0)
+    def test_hosts_are_limited_independently(self, mock_monotonic, mock_sleep):
+        limiter = RateLimiter(requests_per_second=2)
+        limiter.wait("https://www.amazon.com/page1")
+        limiter.wait("https://www.amazon.de/page1")
+        mock_sleep.assert_not_called()
+
+    @patch("scraping_utils.time.sleep")
+    def test_zero_rate_disables_limit(self, mock_sleep):
+        limiter = RateLimiter(requests_per_second=0)
+        for _ in range(5):
+            limiter.wait("https://www.amazon.com/page")
+        mock_sleep.assert_not_called()
+
+
+# Tests for scraping pages that are all in the page cache
+class TestCachedScrape(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.cache = DiskCache(os.path.join(temp_dir.name, "http_cache.sqlite3"), max_bytes=10_000_000)
+        self.addCleanup(self.cache.close)
+
+        # A strict rate limiter, the page cache and a session failing the test if a request is sent
+        for patcher in (
+            patch("scraping_utils.rate_limiter", RateLimiter(requests_per_second=1)),
+            patch("http_client.get_http_cache", return_value=self.cache),
+            patch("http_client.get_session", side_effect=AssertionError("A cached page was downloaded")),
+            patch("scraping_utils.get_parse_pool", return_value=None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def cache_page(self, kind, url, page):
+        self.cache.set(f"{kind}:{http_client.normalize_url(url)}", page.encode("utf-8"))
+
+    @patch("scraping_utils.time.sleep")
+    @patch.object(RateLimiter, "wait")
+    def test_cached_review_pages_are_not_rate_limited(self, mock_wait, mock_sleep):
+        urls = [scraping_utils.get_review_page_url("B08L5V9T31", page) for page in range(1, 9)]
+        for page, url in enumerate(urls, 1):
+            self.cache_page(
+                "reviews",
+                url,
+                f'<div data-hook="review"><span class="review-date">Day {page}</span>'
+                f'<span data-hook="review-body">Review of page {page}</span></div>',
+            )
+
+        results = scrape_amazon_reviews(urls)
+
+        self.assertEqual([result["review_date"] for result in results], [f"Day {page}" for page in range(1, 9)])
+        mock_wait.assert_not_called()
+        mock_sleep.assert_not_called()
+
+    @patch("scraping_utils.time.sleep")
+    @patch.object(RateLimiter, "wait")
+    def test_cached_search_pages_are_not_rate_limited(self, mock_wait, mock_sleep):
+        for page in range(1, 4):
+            self.cache_page(
+                "search",
+                f"https://www.amazon.com/s?k=lamp&i=garden&page={page}",
+                f'<div data-asin="ASIN{page}"><span class="a-size-medium">Lamp {page}</span>'
+                f'<a class="a-link-normal" href="/dp/ASIN{page}/">Link</a></div>',
+            )
+
+        product_data = scraping_utils.get_amazon_product_data("lamp", "garden", num_pages=3)
+
+        self.assertEqual(product_data["ASIN"], ["ASIN1", "ASIN2", "ASIN3"])
+        mock_wait.assert_not_called()
+        mock_sleep.assert_not_called()
+
+
 # Test for get_reviews_from_html
 class TestGetReviewsFromHtml(unittest.TestCase):
     def test_reviews_with_data_hook(self):
@@ -99,6 +231,11 @@ class TestGetReviewDate(unittest.TestCase):
         extracted_date = get_review_date(soup)
         self.assertEqual(extracted_date, "")
 
+    def test_get_review_date_missing_element(self):
+        # Mock review HTML without a date element
+        soup = BeautifulSoup("<div><span>No date here</span></div>", "html.parser")
+        self.assertEqual(get_review_date(soup), "No date")
+
 
 # Tests for get_review_text
 class TestGetReviewText(unittest.TestCase):
@@ -197,6 +334,121 @@ class TestGetNumberStars(unittest.TestCase):
         self.assertEqual(star_rating, "No rating")
 
 
+# Tests for get_review_id
+class TestGetReviewId(unittest.TestCase):
+    def test_get_review_id_from_attribute(self):
+        mock_review_html = '<div id="R2XKJ3Q8L0ABCD" data-hook="review"><span data-hook="review-body">Good</span></div>'
+        review = BeautifulSoup(mock_review_html, "html.parser").div
+        self.assertEqual(get_review_id(review), "R2XKJ3Q8L0ABCD")
+
+    def test_get_review_id_fallback_is_stable(self):
+        mock_review_html = """
+        <div data-hook="review">
+            <a data-hook="review-title">Great</a>
+            <span data-hook="review-body">Works well.</span>
+            <span class="review-date">April 20, 2023</span>
+        </div>
+        """
+        first_id = get_review_id(BeautifulSoup(mock_review_html, "html.parser").div)
+        second_id = get_review_id(BeautifulSoup(mock_review_html, "html.parser").div)
+        other_id = get_review_id(BeautifulSoup(mock_review_html.replace("Great", "Bad"), "html.parser").div)
+
+        self.assertEqual(first_id, second_id)
+        self.assertNotEqual(first_id, other_id)
+
+
+# Tests for extract_reviews_from_html
+class TestExtractReviewsFromHtml(unittest.TestCase):
+    def test_same_output_as_beautifulsoup_path(self):
+        with open(os.path.join(FIXTURES_DIR, "review_page.html"), encoding="utf-8") as fixture:
+            page_html = fixture.read()
+
+        expected = [
+            {
+                "review_id": get_review_id(review),
+                "review_text": get_review_text(review),
+                "review_date": get_review_date(review),
+                "review_title": get_review_header(review),
+                "review_stars": get_number_stars(review),
+            }
+            for review in get_reviews_from_html(page_html)
+        ]
+        reviews = extract_reviews_from_html(page_html)
+
+        self.assertEqual(len(reviews), 10)
+        self.assertEqual(reviews, expected)
+
+    def test_preferred_selector_wins_over_document_order(self):
+        mock_html = """
+        <div data-hook="review">
+            <span data-hook="review-body">Fallback text</span>
+            <span class="a-size-base review-text review-text-content">Preferred text</span>
+        </div>
+        """
+        self.assertEqual(extract_reviews_from_html(mock_html)[0]["review_text"], "Preferred text")
+
+    def test_missing_fields_use_defaults(self):
+        review = extract_reviews_from_html('<div data-hook="review"><span>Nothing useful</span></div>')[0]
+        self.assertEqual(review["review_text"], "No review text")
+        self.assertEqual(review["review_date"], "No date")
+        self.assertEqual(review["review_title"], "No title")
+        self.assertEqual(review["review_stars"], "No rating")
+
+    def test_single_class_matches_any_element_with_that_class(self):
+        mock_html = '<div data-hook="review"><span class="a-size-base review-date">March 1, 2022</span></div>'
+        self.assertEqual(extract_reviews_from_html(mock_html)[0]["review_date"], "March 1, 2022")
+
+    def test_class_fallback_and_empty_page(self):
+        mock_html = """
+        <div>
+            <div class="a-section celwidget">Review 1</div>
+            <div class="a-section celwidget">Review 2</div>
+        </div>
+        """
+        self.assertEqual(len(get_review_elements(mock_html)), 2)
+        self.assertEqual(extract_reviews_from_html(""), [])
+
+    def test_parse_starts_at_first_review(self):
+        with open(os.path.join(FIXTURES_DIR, "review_page.html"), encoding="utf-8") as fixture:
+            page_html = fixture.read()
+
+        reviews = get_review_elements(page_html)
+        full_reviews = lxml_html.document_fromstring(page_html).xpath("//div[@data-hook='review']")
+
+        self.assertEqual(
+            [lxml_html.tostring(review, with_tail=False) for review in reviews],
+            [lxml_html.tostring(review, with_tail=False) for review in full_reviews],
+        )
+        # The review list container before the first review is not built
+        self.assertIsNone(reviews[0].getroottree().find(".//div[@id='cm_cr-review_list']"))
+
+    def test_review_tags_in_scripts_and_comments_are_skipped(self):
+        page_html = """
+        <html><head><script>var template = '<div class="x" data-hook="review"><span>';</script>
+        <!-- <div data-hook="review"> --></head>
+        <body><div id="cm_cr-review_list">
+            <div id="R1" data-hook="review"><span data-hook="review-body">First</span></div>
+            <div id="R2" data-hook="review"><span data-hook="review-body">Second</span></div>
+        </div></body></html>
+        """
+        self.assertEqual(find_review_start(page_html), page_html.index('<div id="R1"'))
+        self.assertEqual([review.get("id") for review in get_review_elements(page_html)], ["R1", "R2"])
+
+    def test_full_parse_if_partial_parse_finds_no_review(self):
+        # The review tag is in a script that is never closed, the reviews use the older layout
+        page_html = """
+        <div class="a-section celwidget"><span data-hook="review-body">First</span></div>
+        <div class="a-section celwidget"><span data-hook="review-body">Second</span></div>
+        <script>var template = '<div data-hook="review">';
+        """
+        self.assertEqual(find_review_start(page_html), -1)
+        self.assertEqual(len(get_review_elements(page_html)), 2)
+
+        with patch("scraping_utils.find_review_start", return_value=page_html.index("<script>")):
+            with self.assertLogs(level="WARNING"):
+                self.assertEqual(len(get_review_elements(page_html)), 2)
+
+
 # Tests for orchestrate_data_gathering
 class TestOrchestrateDataGathering(unittest.TestCase):
     def setUp(self):
@@ -219,22 +471,50 @@ class TestOrchestrateDataGathering(unittest.TestCase):
     @patch("scraping_utils.get_review_date")
     @patch("scraping_utils.get_review_header")
     @patch("scraping_utils.get_number_stars")
-    @patch("scraping_utils.analyze_sentiment_with_textblob")
+    @patch("scraping_utils.analyze_sentiments")
     def test_orchestrate_data_gathering(self, mock_analyze, mock_stars, mock_header, mock_date, mock_text):
         mock_text.return_value = "Test review text."
         mock_date.return_value = "April 18, 2023"
         mock_header.return_value = "Test Review Title"
         mock_stars.return_value = "5.0 out of 5 stars"
-        mock_analyze.return_value = TextBlob("Test review text.").sentiment
+        sentiment = TextBlob("Test review text.").sentiment
+        mock_analyze.return_value = [sentiment]
 
         result = orchestrate_data_gathering(self.soup)
 
+        mock_analyze.assert_called_once_with(["Test review text."], scraping_utils.SENTIMENT_ENGINE)
         self.assertEqual(result["review_text"], "Test review text.")
         self.assertEqual(result["review_date"], "April 18, 2023")
         self.assertEqual(result["review_title"], "Test Review Title")
         self.assertEqual(result["review_stars"], "5.0 out of 5 stars")
-        self.assertAlmostEqual(result["textblob_polarity"], mock_analyze.return_value.polarity)
-        self.assertAlmostEqual(result["textblob_subjectivity"], mock_analyze.return_value.subjectivity)
+        self.assertAlmostEqual(result["textblob_polarity"], sentiment.polarity)
+        self.assertAlmostEqual(result["textblob_subjectivity"], sentiment.subjectivity)
+
+
+# Tests for score_reviews
+class TestScoreReviews(unittest.TestCase):
+    def setUp(self):
+        self.reviews = [
+            {"review_id": "R1", "review_text": "Really enjoyed this product!"},
+            {"review_id": "R2", "review_text": "Terrible quality, it broke."},
+        ]
+
+    @patch("data_analysis.analyze_sentiment_with_textblob")
+    def test_batch_engine_analyzes_all_reviews_at_once(self, mock_analyze):
+        with patch("data_analysis.analyze_sentiment_batch", wraps=data_analysis.analyze_sentiment_batch) as mock_batch:
+            results = score_reviews(self.reviews, engine="batch")
+
+        mock_batch.assert_called_once_with(["Really enjoyed this product!", "Terrible quality, it broke."])
+        mock_analyze.assert_not_called()
+        self.assertEqual([result["review_id"] for result in results], ["R1", "R2"])
+        self.assertGreater(results[0]["textblob_polarity"], 0)
+        self.assertLess(results[1]["textblob_polarity"], 0)
+
+    def test_engines_give_close_scores(self):
+        textblob_results = score_reviews(self.reviews, engine="textblob")
+        batch_results = score_reviews(self.reviews, engine="batch")
+        for textblob_result, batch_result in zip(textblob_results, batch_results):
+            self.assertAlmostEqual(textblob_result["textblob_polarity"], batch_result["textblob_polarity"])
 
 
 # Tests for scrape_amazon_reviews
@@ -258,24 +538,145 @@ class TestScrapeAmazonReviews(unittest.TestCase):
         self.soup = BeautifulSoup(self.mock_html_content, "html.parser")
         self.mock_urls = ["http://amazon.com/product1", "http://amazon.com/product2"]
 
-    @patch("scraping_utils.orchestrate_data_gathering")
-    @patch("scraping_utils.get_reviews_from_html")
+    @patch("scraping_utils.score_reviews")
+    @patch("scraping_utils.extract_reviews_from_html")
     @patch("scraping_utils.get_page_html")
     def test_scrape_amazon_reviews(self, mock_get_html, mock_get_reviews, mock_orchestrate):
         # Set up the mock functions
-        mock_get_html.side_effect = lambda url: self.mock_html_content
-        mock_get_reviews.return_value = self.soup.find_all("div", {"data-hook": "review"})
-        mock_orchestrate.side_effect = lambda review: {"mocked_data": "data"}
+        mock_get_html.side_effect = lambda url, force_refresh: self.mock_html_content
+        mock_get_reviews.return_value = [{"review_text": "Really enjoyed"}, {"review_text": "Best purchase"}]
+        mock_orchestrate.side_effect = lambda reviews: [{"mocked_data": "data"} for _ in reviews]
 
         # Call the function to test
         results = scrape_amazon_reviews(self.mock_urls)
 
         # Assertions
         self.assertEqual(len(results), 4)  # Expecting 4 reviews (2 reviews per page * 2 URLs)
-        mock_get_html.assert_has_calls([call(url) for url in self.mock_urls], any_order=True)
+        mock_get_html.assert_has_calls([call(url, force_refresh=False) for url in self.mock_urls], any_order=True)
         mock_get_reviews.assert_called()
         mock_orchestrate.assert_called()
 
+    @patch("scraping_utils.rate_limiter", RateLimiter(0))
+    @patch("scraping_utils.get_page_html")
+    def test_results_keep_page_order(self, mock_get_html):
+        # Make the first pages the slowest to download, so that they finish last
+        def slow_page(url, force_refresh):
+            page = int(url.rsplit("=", 1)[1])
+            time.sleep(0.02 * (4 - page))
+            return (
+                f'<div data-hook="review"><span class="review-date">Day {page}</span>'
+                f'<span data-hook="review-body">Review of page {page}</span></div>'
+            )
+
+        mock_get_html.side_effect = slow_page
+        urls = [f"http://amazon.com/reviews?pageNumber={page}" for page in range(1, 5)]
+
+        results = scrape_amazon_reviews(urls, max_workers=4)
+
+        self.assertEqual([result["review_date"] for result in results], ["Day 1", "Day 2", "Day 3", "Day 4"])
+
+
+# Tests for iter_amazon_reviews
+class TestIterAmazonReviews(unittest.TestCase):
+    @staticmethod
+    def review_page(page):
+        return (
+            f'<div data-hook="review"><span class="review-date">Day {page}</span>'
+            f'<span data-hook="review-body">Review of page {page}</span></div>'
+        )
+
+    @patch("scraping_utils.rate_limiter", RateLimiter(0))
+    @patch("scraping_utils.get_page_html")
+    def test_first_page_is_yielded_before_later_pages_are_downloaded(self, mock_get_html):
+        first_page_received = threading.Event()
+
+        # The later pages can only be downloaded once the first page has reached the caller
+        def page_html(url, force_refresh):
+            page = int(url.rsplit("=", 1)[1])
+            if page > 1 and not first_page_received.wait(timeout=5):
+                raise AssertionError("The first page was not yielded before the later pages were downloaded")
+            return self.review_page(page)
+
+        mock_get_html.side_effect = page_html
+        urls = [f"http://amazon.com/reviews?pageNumber={page}" for page in range(1, 4)]
+
+        pages = []
+        for page_results in iter_amazon_reviews(urls, max_workers=3):
+            pages.append([review["review_date"] for review in page_results])
+            first_page_received.set()
+
+        self.assertEqual(pages, [["Day 1"], ["Day 2"], ["Day 3"]])
+
+    @patch("scraping_utils.rate_limiter", RateLimiter(0))
+    @patch("scraping_utils.get_parse_pool", return_value=None)
+    @patch("scraping_utils.get_page_html")
+    def test_closing_cancels_remaining_downloads(self, mock_get_html, _):
+        second_page_started = threading.Event()
+
+        # The second page is still being downloaded when the generator is closed
+        def page_html(url, force_refresh):
+            page = int(url.rsplit("=", 1)[1])
+            if page == 2:
+                second_page_started.set()
+                time.sleep(0.05)
+            return self.review_page(page)
+
+        mock_get_html.side_effect = page_html
+        urls = [f"http://amazon.com/reviews?pageNumber={page}" for page in range(1, 7)]
+
+        pages = iter_amazon_reviews(urls, max_workers=1)
+        self.assertEqual(next(pages)[0]["review_date"], "Day 1")
+        self.assertTrue(second_page_started.wait(timeout=5))
+        pages.close()
+
+        self.assertEqual(mock_get_html.call_count, 2)
+
+    def test_no_urls(self):
+        self.assertEqual(list(iter_amazon_reviews([])), [])
+
+
+# Tests for parse_review_page and the parse pool
+class TestParsePool(unittest.TestCase):
+    def setUp(self):
+        with open(os.path.join(FIXTURES_DIR, "review_page.html"), encoding="utf-8") as fixture:
+            self.page_html = fixture.read()
+
+    def test_parse_review_page(self):
+        reviews = parse_review_page(self.page_html)
+        self.assertEqual(len(reviews), 10)
+        self.assertEqual(reviews[0]["review_id"], "R2XKJ3Q8L0ABCD")
+        self.assertGreater(reviews[0]["textblob_polarity"], 0)
+        self.assertLess(reviews[1]["textblob_polarity"], 0)
+
+    def test_pool_disabled(self):
+        shutdown_parse_pool()
+        self.assertIsNone(get_parse_pool(workers=0))
+        with patch("scraping_utils.sys.platform", "win32"):
+            self.assertIsNone(get_parse_pool(workers=2))
+
+    def test_pool_is_not_forked_while_other_threads_run(self):
+        self.addCleanup(shutdown_parse_pool)
+        shutdown_parse_pool()
+        with patch("scraping_utils.threading.active_count", return_value=2):
+            self.assertIsNone(start_parse_pool(workers=2))
+
+    @patch("scraping_utils.rate_limiter", RateLimiter(0))
+    @patch("scraping_utils.get_page_html")
+    def test_pool_gives_same_results_as_scraping_thread(self, mock_get_html):
+        mock_get_html.side_effect = lambda url, force_refresh: self.page_html
+        urls = [f"http://amazon.com/reviews?pageNumber={page}" for page in range(1, 7)]
+        self.addCleanup(shutdown_parse_pool)
+
+        with patch("scraping_utils.get_parse_pool", return_value=None):
+            expected = scrape_amazon_reviews(urls)
+        shutdown_parse_pool()
+        if start_parse_pool(workers=2) is None:
+            self.skipTest("Worker processes are not used on this platform or while other threads run")
+        results = scrape_amazon_reviews(urls)
+
+        self.assertEqual(len(results), 60)
+        self.assertEqual(results, expected)
+
 
 # Tests for scrape_data
 class TestScrapeData(unittest.TestCase):
@@ -296,9 +697,132 @@ class TestScrapeData(unittest.TestCase):
         results = scrape_data(product_id, num_review_pages)
 
         # Assertions
-        mock_scrape_amazon_reviews.assert_called_once_with(expected_urls)
+        mock_scrape_amazon_reviews.assert_called_once_with(expected_urls, force_refresh=False)
         self.assertEqual(len(results), 6)  # As we have mocked to return 6 reviews
 
+    @patch("scraping_utils.scrape_amazon_reviews", return_value=[])
+    def test_scrape_data_force_refresh(self, mock_scrape_amazon_reviews):
+        scrape_data("B08L5V9T31", 1, force_refresh=True)
+        self.assertTrue(mock_scrape_amazon_reviews.call_args.kwargs["force_refresh"])
+
+
+# Tests for load_stored_reviews and save_stored_reviews
+class TestStoredReviews(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        patcher = patch("scraping_utils.REVIEW_STORE_DIR", os.path.join(self.temp_dir.name, "reviews"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def test_save_and_load(self):
+        reviews = [{"review_id": "R1", "review_text": "New"}, {"review_id": "R2", "review_text": "Old"}]
+        save_stored_reviews("B08L5V9T31", reviews)
+        self.assertEqual(load_stored_reviews("B08L5V9T31"), reviews)
+
+    def test_load_unknown_product(self):
+        self.assertEqual(load_stored_reviews("B000000000"), [])
+
+    @patch("scraping_utils.REVIEW_STORE_MAX_REVIEWS", 2)
+    def test_only_most_recent_reviews_are_stored(self):
+        reviews = [{"review_id": f"R{index}"} for index in range(5, 0, -1)]
+        save_stored_reviews("B08L5V9T31", reviews)
+        self.assertEqual(load_stored_reviews("B08L5V9T31"), reviews[:2])
+
+    def test_stores_of_old_products_are_deleted(self):
+        save_stored_reviews("B000000001", [{"review_id": "R1"}])
+        old_store = os.path.join(scraping_utils.REVIEW_STORE_DIR, "B000000001.json")
+        expired = time.time() - scraping_utils.REVIEW_STORE_MAX_AGE - 60
+        os.utime(old_store, (expired, expired))
+
+        save_stored_reviews("B000000002", [{"review_id": "R2"}])
+
+        self.assertEqual(load_stored_reviews("B000000001"), [])
+        self.assertEqual(load_stored_reviews("B000000002"), [{"review_id": "R2"}])
+
+
+# Tests for scrape_new_reviews and the incremental mode of scrape_data
+class TestIncrementalScraping(unittest.TestCase):
+    @staticmethod
+    def review_page(*review_ids):
+        return "".join(
+            f'<div id="{review_id}" data-hook="review"><span class="review-date">Today</span>'
+            f'<span data-hook="review-body">Review {review_id}</span></div>'
+            for review_id in review_ids
+        )
+
+    @patch("scraping_utils.fetch_page_html")
+    def test_stops_at_known_review(self, mock_fetch):
+        mock_fetch.side_effect = [self.review_page("R5", "R4", "R3"), self.review_page("R2", "R1")]
+
+        new_reviews = scrape_new_reviews("B08L5V9T31", 5, known_review_ids={"R3", "R2", "R1"})
+
+        self.assertEqual([review["review_id"] for review in new_reviews], ["R5", "R4"])
+        mock_fetch.assert_called_once()
+        self.assertIn("sortBy=recent", mock_fetch.call_args.args[0])
+        self.assertTrue(mock_fetch.call_args.kwargs["force_refresh"])
+
+    @patch("scraping_utils.fetch_page_html")
+    def test_stops_at_last_page(self, mock_fetch):
+        mock_fetch.side_effect = [self.review_page("R3", "R2"), self.review_page("R1"), ""]
+
+        new_reviews = scrape_new_reviews("B08L5V9T31", 5, known_review_ids=set())
+
+        self.assertEqual(len(new_reviews), 3)
+        self.assertEqual(mock_fetch.call_count, 3)
+
+    @patch("scraping_utils.save_stored_reviews")
+    @patch("scraping_utils.load_stored_reviews")
+    @patch("scraping_utils.scrape_new_reviews")
+    def test_scrape_data_merges_new_reviews(self, mock_scrape_new, mock_load, mock_save):
+        mock_load.return_value = [{"review_id": "R2"}, {"review_id": "R1"}]
+        mock_scrape_new.return_value = [{"review_id": "R3"}]
+
+        results = scrape_data("B08L5V9T31", 3, incremental=True)
+
+        self.assertEqual([review["review_id"] for review in results], ["R3", "R2", "R1"])
+        mock_scrape_new.assert_called_once_with("B08L5V9T31", 3, {"R1", "R2"})
+        mock_save.assert_called_once_with("B08L5V9T31", results)
+
+    @patch("scraping_utils.save_stored_reviews")
+    @patch("scraping_utils.load_stored_reviews", return_value=[])
+    @patch("scraping_utils.scrape_amazon_reviews", return_value=[{"review_id": "R1"}])
+    def test_scrape_data_without_stored_reviews(self, mock_scrape_amazon_reviews, mock_load, mock_save):
+        results = scrape_data("B08L5V9T31", 2, incremental=True)
+
+        urls = mock_scrape_amazon_reviews.call_args.args[0]
+        self.assertEqual(len(urls), 2)
+        self.assertTrue(all("sortBy=recent" in url for url in urls))
+        mock_save.assert_called_once_with("B08L5V9T31", results)
+
+
+# Tests for iter_scrape_data
+class TestIterScrapeData(unittest.TestCase):
+    @patch("scraping_utils.iter_amazon_reviews")
+    def test_yields_pages(self, mock_iter_amazon_reviews):
+        mock_iter_amazon_reviews.return_value = iter([[{"review_id": "R1"}], [{"review_id": "R2"}]])
+
+        pages = list(iter_scrape_data("B08L5V9T31", 2))
+
+        self.assertEqual(pages, [[{"review_id": "R1"}], [{"review_id": "R2"}]])
+        urls = mock_iter_amazon_reviews.call_args.args[0]
+        self.assertEqual(urls, [scraping_utils.get_review_page_url("B08L5V9T31", page) for page in (1, 2)])
+
+    @patch("scraping_utils.save_stored_reviews")
+    @patch("scraping_utils.load_stored_reviews")
+    @patch("scraping_utils.scrape_new_reviews")
+    def test_incremental_mode_saves_after_the_last_page(self, mock_scrape_new, mock_load, mock_save):
+        mock_load.return_value = [{"review_id": "R1"}]
+        mock_scrape_new.return_value = [{"review_id": "R2"}]
+
+        pages = iter_scrape_data("B08L5V9T31", 2, incremental=True)
+        self.assertEqual(next(pages), [{"review_id": "R2"}])
+        self.assertEqual(next(pages), [{"review_id": "R1"}])
+        mock_save.assert_not_called()
+
+        self.assertEqual(list(pages), [])
+        mock_save.assert_called_once_with("B08L5V9T31", [{"review_id": "R2"}, {"review_id": "R1"}])
+
 
 # Tests for get_amazon_product_data
 class TestGetAmazonProductData(unittest.TestCase):
@@ -321,13 +845,10 @@ class TestGetAmazonProductData(unittest.TestCase):
         """
 
     def test_get_amazon_product_data_success(self):
-        # Mock the requests.get call
-        with patch("scraping_utils.requests.get") as mock_get:
-            # Set up the mock response object with the mock_html_content
-            mock_response = unittest.mock.Mock()
-            mock_response.status_code = 200
-            mock_response.content = self.mock_html_content.encode()  # Encode to bytes
-            mock_get.return_value = mock_response
+        # Mock the fetch_url call
+        with patch("scraping_utils.fetch_url") as mock_get:
+            # Set up the mock to return the mock_html_content
+            mock_get.return_value = self.mock_html_content
 
             # Call the function to test
             product_data = scraping_utils.get_amazon_product_data("keyword", "search_param")
@@ -338,10 +859,165 @@ class TestGetAmazonProductData(unittest.TestCase):
             self.assertEqual(product_data["Product URL"][0], "https://www.amazon.com/dp/ASIN1/")
             self.assertEqual(product_data["ASIN"][0], "ASIN1")
 
+    @patch("scraping_utils.rate_limiter", RateLimiter(0))
+    def test_iter_amazon_product_pages_yields_each_page(self):
+        def fetch_url(url, kind, force_refresh, before_request):
+            if url.endswith("page=2"):
+                raise requests.exceptions.ConnectionError("Timeout")
+            return self.mock_html_content
+
+        with patch("scraping_utils.fetch_url", side_effect=fetch_url) as mock_get:
+            pages = list(scraping_utils.iter_amazon_product_pages("keyword", "search_param", num_pages=2))
+
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(pages[0]["ASIN"], ["ASIN1", "ASIN2"])
+        self.assertEqual(pages[1], {"Product Name": [], "Product URL": [], "ASIN": []})
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch("scraping_utils.rate_limiter", RateLimiter(0))
+    def test_pages_are_downloaded_concurrently_and_merged_in_order(self):
+        # The first page is only returned once all pages are being downloaded
+        all_started = threading.Barrier(3, timeout=5)
+
+        def fetch_url(url, kind, force_refresh, before_request):
+            all_started.wait()
+            page = int(url.rsplit("=", 1)[1])
+            # Every page lists a product of its own and the product of the previous page again
+            return f"""
+            <div data-asin="ASIN{page}"><span class="a-size-medium">Product {page}</span>
+                <a class="a-link-normal" href="/dp/ASIN{page}/">Link</a></div>
+            <div data-asin="ASIN{page - 1}"><span class="a-size-medium">Product {page - 1}</span>
+                <a class="a-link-normal" href="/dp/ASIN{page - 1}/">Link</a></div>
+            """
+
+        with patch("scraping_utils.fetch_url", side_effect=fetch_url):
+            pages = list(scraping_utils.iter_amazon_product_pages("keyword", "search_param", num_pages=3))
+
+        self.assertEqual([page["ASIN"] for page in pages], [["ASIN1", "ASIN0"], ["ASIN2"], ["ASIN3"]])
+        self.assertEqual(pages[1]["Product Name"], ["Product 2"])
+
+    def test_closing_cancels_remaining_search_pages(self):
+        second_page_started = threading.Event()
+
+        def get_search_page_products(keyword, search_param, page, force_refresh):
+            if page == 2:
+                second_page_started.set()
+                time.sleep(0.05)
+            return {"Product Name": [f"Product {page}"], "Product URL": ["url"], "ASIN": [f"ASIN{page}"]}
+
+        with patch("scraping_utils.get_search_page_products", side_effect=get_search_page_products) as mock_get:
+            pages = scraping_utils.iter_amazon_product_pages("keyword", "search_param", num_pages=6, max_workers=1)
+            self.assertEqual(next(pages)["ASIN"], ["ASIN1"])
+            self.assertTrue(second_page_started.wait(timeout=5))
+            pages.close()
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_remove_duplicate_products(self):
+        seen_asins = {"ASIN1"}
+        page_products = {"Product Name": ["One", "Two"], "Product URL": ["url1", "url2"], "ASIN": ["ASIN1", "ASIN2"]}
+        new_products = scraping_utils.remove_duplicate_products(page_products, seen_asins)
+
+        self.assertEqual(new_products, {"Product Name": ["Two"], "Product URL": ["url2"], "ASIN": ["ASIN2"]})
+        self.assertEqual(seen_asins, {"ASIN1", "ASIN2"})
+
+
+# Tests for get_products_from_search_page
+class TestGetProductsFromSearchPage(unittest.TestCase):
+    def test_search_page_fixture(self):
+        with open(os.path.join(FIXTURES_DIR, "search_page.html"), encoding="utf-8") as fixture:
+            products = scraping_utils.get_products_from_search_page(fixture.read())
+
+        self.assertEqual(len(products["ASIN"]), 48)
+        self.assertEqual(len(set(products["ASIN"])), 48)
+        for name, url, asin in zip(products["Product Name"], products["Product URL"], products["ASIN"]):
+            self.assertLessEqual(len(name), 70)
+            self.assertTrue(url.startswith("https://www.amazon.com/"))
+            self.assertIn(f"/dp/{asin}/", url)
+
+    def test_asin_is_read_from_the_data_asin_attribute(self):
+        html = """
+        <div data-asin="B000000001">
+            <span class="a-color-base a-size-medium">Lamp</span>
+            <a class="a-link-normal s-no-outline" href="/Lamp/dp/B000000001/ref=sr_1_1">Lamp</a>
+            <div data-asin="B000000001"><span class="a-size-base">Nested</span></div>
+        </div>
+        <div data-asin=""><span class="a-size-base">Results</span><a class="a-link-normal" href="/s?page=2">2</a></div>
+        <div data-asin="B000000002"><span class="a-size-medium">No link</span></div>
+        <div data-asin="B000000003"><a class="a-link-normal" href="/gp/product/B000000003">No name</a></div>
+        <div data-asin="B000000004">
+            <span class="a-size-medium">Chair</span><a class="a-link-normal" href="/gp/product/B000000004">Chair</a>
+        </div>
+        """
+        products = scraping_utils.get_products_from_search_page(html)
+
+        self.assertEqual(products["ASIN"], ["B000000001", "B000000004"])
+        self.assertEqual(products["Product Name"], ["Lamp Nested", "Chair"])
+        self.assertEqual(products["Product URL"][1], "https://www.amazon.com/gp/product/B000000004")
+
+    def test_empty_page(self):
+        self.assertEqual(
+            scraping_utils.get_products_from_search_page("<html></html>"),
+            {"Product Name": [], "Product URL": [], "ASIN": []},
+        )
+
+
+# Tests for the search cache
+class TestSearchCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = DiskCache(os.path.join(self.temp_dir.name, "search_cache.sqlite3"), max_bytes=1024 * 1024)
+        patcher = patch("scraping_utils.get_search_cache", return_value=self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+        self.addCleanup(self.cache.close)
+        self.page_html = """
+        <div data-asin="ASIN1">
+            <span class="a-size-medium">Product 1</span><a class="a-link-normal" href="/dp/ASIN1/">Link 1</a>
+        </div>
+        <div data-asin="ASIN2">
+            <span class="a-size-medium">Product 2</span><a class="a-link-normal" href="/dp/ASIN2/">Link 2</a>
+        </div>
+        """
+
+    @patch("scraping_utils.rate_limiter", RateLimiter(0))
+    @patch("scraping_utils.fetch_url")
+    def test_more_pages_only_download_the_new_pages(self, mock_fetch_url):
+        mock_fetch_url.return_value = self.page_html
+        first_pages = list(scraping_utils.iter_amazon_product_pages("Wireless  Earbuds", "aps", num_pages=1))
+        pages = list(scraping_utils.iter_amazon_product_pages(" wireless earbuds", "aps", num_pages=2))
+
+        self.assertEqual(pages[0], first_pages[0])
+        # The second page lists the same products as the first one
+        self.assertEqual(pages[1]["ASIN"], [])
+        urls = [fetch_call.args[0] for fetch_call in mock_fetch_url.call_args_list]
+        self.assertEqual([url[-6:] for url in urls], ["page=1", "page=2"])
+
+    @patch("scraping_utils.fetch_url")
+    def test_force_refresh_and_empty_pages_are_downloaded_again(self, mock_fetch_url):
+        mock_fetch_url.return_value = "<html></html>"
+        list(scraping_utils.iter_amazon_product_pages("earbuds", "aps"))
+        mock_fetch_url.return_value = self.page_html
+        list(scraping_utils.iter_amazon_product_pages("earbuds", "aps"))
+        list(scraping_utils.iter_amazon_product_pages("earbuds", "aps", force_refresh=True))
+
+        self.assertEqual(mock_fetch_url.call_count, 3)
+
+    def test_cache_key(self):
+        self.assertEqual(
+            scraping_utils.get_search_cache_key("Wireless  Earbuds ", "electronics-intl-ship", 2),
+            scraping_utils.get_search_cache_key("wireless earbuds", "electronics-intl-ship", 2),
+        )
+        self.assertNotEqual(
+            scraping_utils.get_search_cache_key("earbuds", "aps", 1),
+            scraping_utils.get_search_cache_key("earbuds", "stripbooks-intl-ship", 1),
+        )
+
 
 # Tests for scrape_amazon_product_description
 class TestScrapeAmazonProductDescription(unittest.TestCase):
-    @patch("scraping_utils.requests.get")
+    @patch("scraping_utils.fetch_url")
     def test_version_1(self, mock_get):
         # Mock HTML content for version 1
         mock_html = """
@@ -352,12 +1028,12 @@ class TestScrapeAmazonProductDescription(unittest.TestCase):
             </ul>
         </div>
         """
-        mock_get.return_value = unittest.mock.Mock(status_code=200, content=mock_html.encode())
+        mock_get.return_value = mock_html
         description = scraping_utils.scrape_amazon_product_description("http://amazon.com/product1")
         self.assertIn("First feature", description)
         self.assertIn("Second feature", description)
 
-    @patch("scraping_utils.requests.get")
+    @patch("scraping_utils.fetch_url")
     def test_version_2(self, mock_get):
         # Mock HTML content for version 2
         mock_html = """
@@ -368,12 +1044,12 @@ class TestScrapeAmazonProductDescription(unittest.TestCase):
             </ul>
         </div>
         """
-        mock_get.return_value = unittest.mock.Mock(status_code=200, content=mock_html.encode())
+        mock_get.return_value = mock_html
         description = scraping_utils.scrape_amazon_product_description("http://amazon.com/product2")
         self.assertIn("Detail 1", description)
         self.assertIn("Detail 2", description)
 
-    @patch("scraping_utils.requests.get")
+    @patch("scraping_utils.fetch_url")
     def test_version_3(self, mock_get):
         # Mock HTML content for version 3
         mock_html = """
@@ -381,11 +1057,11 @@ class TestScrapeAmazonProductDescription(unittest.TestCase):
             <span>Description content here.</span>
         </div>
         """
-        mock_get.return_value = unittest.mock.Mock(status_code=200, content=mock_html.encode())
+        mock_get.return_value = mock_html
         description = scraping_utils.scrape_amazon_product_description("http://amazon.com/product3")
         self.assertIn("Description content here", description)
 
-    @patch("scraping_utils.requests.get")
+    @patch("scraping_utils.fetch_url")
     def test_version_4(self, mock_get):
         # Mock HTML content for version 4
         mock_html = """
@@ -394,19 +1070,64 @@ class TestScrapeAmazonProductDescription(unittest.TestCase):
             <p>Product description paragraph 2.</p>
         </div>
         """
-        mock_get.return_value = unittest.mock.Mock(status_code=200, content=mock_html.encode())
+        mock_get.return_value = mock_html
         description = scraping_utils.scrape_amazon_product_description("http://amazon.com/product4")
         self.assertIn("Product description paragraph 1", description)
         self.assertIn("Product description paragraph 2", description)
 
-    @patch("scraping_utils.requests.get")
+    @patch("scraping_utils.fetch_url")
     def test_no_description(self, mock_get):
         # Mock HTML content with no product description
         mock_html = "<div>No description available</div>"
-        mock_get.return_value = unittest.mock.Mock(status_code=200, content=mock_html.encode())
+        mock_get.return_value = mock_html
         description = scraping_utils.scrape_amazon_product_description("http://amazon.com/product5")
         self.assertIsNone(description)
 
 
+# Tests for DescriptionExtractor
+class TestDescriptionExtractor(unittest.TestCase):
+    def setUp(self):
+        self.extractor = DescriptionExtractor()
+
+    def load_fixture(self, file_name):
+        with open(os.path.join(FIXTURES_DIR, file_name), encoding="utf-8") as fixture:
+            return fixture.read()
+
+    def test_electronics_page(self):
+        with self.assertLogs(level="INFO") as logs:
+            description = self.extractor.extract(self.load_fixture("product_page_electronics.html"))
+        self.assertEqual(len(description.split("\n")), 5)
+        self.assertTrue(description.startswith("Immersive sound: 12 mm drivers"))
+        self.assertIn("Description layout: feature-bullets", logs.output[0])
+
+    def test_book_page(self):
+        description = self.extractor.extract(self.load_fixture("product_page_book.html"))
+        self.assertTrue(description.startswith("A NEW YORK TIMES BESTSELLER\nWhen the lighthouse keeper"))
+        self.assertIn("a town keeping its secrets", description)
+
+    def test_layouts_follow_fixed_precedence(self):
+        description_only = '<div id="productDescription"><p>From the publisher.</p></div>'
+        with_bullets = (
+            '<div id="feature-bullets"><ul class="a-unordered-list"><li><span class="a-list-item">Bullet</span>'
+            f"</li></ul></div>{description_only}"
+        )
+        self.assertEqual(self.extractor.extract(description_only), "From the publisher.")
+        # The pages scraped before do not change which layout describes a page showing several layouts
+        for _ in range(3):
+            self.assertEqual(self.extractor.extract(with_bullets), "Bullet")
+            self.assertEqual(DescriptionExtractor().extract(with_bullets), "Bullet")
+
+    def test_page_without_description(self):
+        with self.assertLogs(level="INFO") as logs:
+            self.assertIsNone(self.extractor.extract("<div>No description available</div>"))
+        self.assertIn("Description layout: None", logs.output[0])
+
+    @patch("scraping_utils.fetch_url", side_effect=requests.exceptions.ConnectionError("Timeout"))
+    def test_request_error_is_logged(self, _):
+        with self.assertLogs(level="ERROR") as logs:
+            self.assertIsNone(scraping_utils.scrape_amazon_product_description("http://amazon.com/product1"))
+        self.assertIn("Request error: Timeout", logs.output[0])
+
+
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
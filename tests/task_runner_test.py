@@ -0,0 +1,108 @@
+"""
+task_runner_test.py: This script is for testing the classes contained in task_runner.py.
+"""
+
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from task_runner import TaskRunner
+
+
+# Tests for TaskRunner
+class TestTaskRunner(unittest.TestCase):
+    def setUp(self):
+        self.root = MagicMock()
+        self.runner = TaskRunner(self.root, max_workers=2, poll_interval_ms=20)
+        self.addCleanup(self.runner.shutdown)
+
+    def test_callbacks_run_in_polling_thread(self):
+        callback_threads = []
+        results = []
+
+        def on_done(result):
+            callback_threads.append(threading.current_thread())
+            results.append(result)
+
+        self.runner.submit("Adding", lambda first, second: first + second, 1, 2, on_done=on_done)
+        self.assertTrue(self.runner.process_until_idle())
+
+        self.assertEqual(results, [3])
+        self.assertEqual(callback_threads, [threading.current_thread()])
+
+    def test_results_wait_for_the_poll(self):
+        finished = threading.Event()
+        on_done = MagicMock()
+
+        def work():
+            finished.set()
+            return "result"
+
+        self.runner.submit("Working", work, on_done=on_done)
+        self.assertTrue(finished.wait(timeout=5))
+        on_done.assert_not_called()
+
+        self.assertTrue(self.runner.process_until_idle())
+        on_done.assert_called_once_with("result")
+
+    def test_progress_is_reported_in_order_before_the_result(self):
+        events = []
+
+        def work(pages, report_progress):
+            for page in range(1, pages + 1):
+                report_progress(page)
+            return "finished"
+
+        self.runner.submit(
+            "Scraping",
+            work,
+            3,
+            on_progress=lambda page: events.append(page),
+            on_done=lambda result: events.append(result),
+        )
+        self.assertTrue(self.runner.process_until_idle())
+        self.assertEqual(events, [1, 2, 3, "finished"])
+
+    def test_errors_are_passed_to_on_error(self):
+        on_done = MagicMock()
+        on_error = MagicMock()
+
+        def work():
+            raise ValueError("Broken page")
+
+        task = self.runner.submit("Failing", work, on_done=on_done, on_error=on_error)
+        self.assertTrue(self.runner.process_until_idle())
+
+        on_done.assert_not_called()
+        self.assertIsInstance(on_error.call_args.args[0], ValueError)
+        self.assertEqual(task.status, "failed")
+        self.assertIs(task.error, on_error.call_args.args[0])
+
+    def test_failing_callback_does_not_stop_other_callbacks(self):
+        on_done = MagicMock()
+        self.runner.call_soon(lambda: 1 / 0)
+        self.runner.submit("Working", lambda: "result", on_done=on_done)
+
+        self.assertTrue(self.runner.process_until_idle())
+        on_done.assert_called_once_with("result")
+
+    def test_running_tasks_are_reported(self):
+        release = threading.Event()
+        changes = []
+        self.runner.on_change = lambda tasks: changes.append([task.name for task in tasks])
+
+        self.runner.submit("Searching Amazon", release.wait, 5)
+        self.assertEqual([task.name for task in self.runner.get_running_tasks()], ["Searching Amazon"])
+
+        release.set()
+        self.assertTrue(self.runner.process_until_idle())
+        self.assertEqual(changes, [["Searching Amazon"], []])
+        self.assertEqual(self.runner.get_running_tasks(), [])
+
+    def test_poll_reschedules_itself(self):
+        self.runner.poll()
+        self.root.after.assert_called_once_with(20, self.runner.poll)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+text_streamer_test.py: This script is for testing the class contained in text_streamer.py.
+"""
+
+import threading
+import tkinter as tk
+import unittest
+from unittest.mock import MagicMock, call
+
+from text_streamer import TextStreamer
+
+
+# Tests for TextStreamer
+class TestTextStreamer(unittest.TestCase):
+    def setUp(self):
+        self.text_widget = MagicMock()
+        self.callbacks = []
+        self.streamer = TextStreamer(self.text_widget, self.callbacks.append)
+
+    def run_callbacks(self):
+        while self.callbacks:
+            self.callbacks.pop(0)()
+
+    def test_pieces_are_inserted_in_one_batch(self):
+        for piece in ("The ", "sound ", "is ", "great."):
+            self.streamer.append(piece)
+        # Only one write is scheduled for all the pieces
+        self.assertEqual(len(self.callbacks), 1)
+        self.text_widget.insert.assert_not_called()
+
+        self.run_callbacks()
+        self.text_widget.insert.assert_called_once_with(tk.END, "The sound is great.")
+        self.text_widget.see.assert_called_once_with(tk.END)
+        self.assertEqual(self.streamer.inserts, 1)
+
+    def test_next_pieces_schedule_a_new_write(self):
+        self.streamer.append("first")
+        self.run_callbacks()
+        self.streamer.append(" second")
+        self.run_callbacks()
+        self.assertEqual(self.text_widget.insert.call_args_list, [call(tk.END, "first"), call(tk.END, " second")])
+
+    def test_first_piece_replaces_the_placeholder(self):
+        self.streamer.reset("Generating...")
+        self.text_widget.insert.assert_called_once_with(tk.INSERT, "Generating...")
+        self.text_widget.reset_mock()
+
+        self.streamer.append("first")
+        self.run_callbacks()
+        self.streamer.append(" second")
+        self.run_callbacks()
+        self.text_widget.delete.assert_called_once_with("1.0", tk.END)
+
+    def test_reset_drops_pending_pieces(self):
+        self.streamer.append("old answer")
+        self.streamer.reset("Generating...")
+        self.run_callbacks()
+        self.text_widget.insert.assert_called_once_with(tk.INSERT, "Generating...")
+
+    def test_text_of_previous_generation_is_dropped(self):
+        old_generation = self.streamer.reset("Generating...")
+        self.streamer.append("old ", old_generation)
+        new_generation = self.streamer.reset("Generating...")
+        self.assertEqual(new_generation, old_generation + 1)
+        self.text_widget.reset_mock()
+
+        # The previous worker is still streaming while the new answer arrives
+        self.streamer.append("new ", new_generation)
+        self.streamer.append("answer", old_generation)
+        self.streamer.append("answer", new_generation)
+        self.run_callbacks()
+        self.text_widget.insert.assert_called_once_with(tk.END, "new answer")
+
+        self.streamer.set_text("Old complete answer.", old_generation)
+        self.streamer.set_text("New complete answer.", new_generation)
+        self.text_widget.insert.assert_called_with(tk.INSERT, "New complete answer.")
+        self.assertEqual(self.text_widget.insert.call_count, 2)
+
+    def test_set_text_drops_pending_pieces(self):
+        self.streamer.append("piece")
+        self.streamer.set_text("Complete answer.")
+        self.run_callbacks()
+        self.text_widget.insert.assert_called_once_with(tk.INSERT, "Complete answer.")
+
+    def test_pieces_from_several_threads(self):
+        def append_pieces(name):
+            for index in range(200):
+                self.streamer.append(f"{name}{index} ")
+
+        threads = [threading.Thread(target=append_pieces, args=(name,)) for name in "abc"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.run_callbacks()
+
+        text = "".join(call_args.args[1] for call_args in self.text_widget.insert.call_args_list)
+        for name in "abc":
+            pieces = [piece for piece in text.split() if piece.startswith(name)]
+            self.assertEqual(pieces, [f"{name}{index}" for index in range(200)])
+        self.assertLess(self.streamer.inserts, 600)
+
+
+if __name__ == "__main__":
+    unittest.main()